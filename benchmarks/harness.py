@@ -0,0 +1,170 @@
+import os
+import sys
+import json
+import time
+import platform
+import resource
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from integrations.config import ROOT_DIR
+
+
+DEFAULT_RESULTS_DIR = os.path.join(ROOT_DIR, ".specify", "benchmarks")
+DEFAULT_BASELINE = os.path.join(ROOT_DIR, "benchmarks", "baseline.json")
+
+HIGHER_IS_BETTER = "higher"
+LOWER_IS_BETTER = "lower"
+
+# metrics compared against the baseline; anything else in a scenario is informational
+DIRECTIONS = {
+    "rps": HIGHER_IS_BETTER,
+    "ops_per_s": HIGHER_IS_BETTER,
+    "p50_ms": LOWER_IS_BETTER,
+    "p95_ms": LOWER_IS_BETTER,
+    "p99_ms": LOWER_IS_BETTER,
+    "us_per_op": LOWER_IS_BETTER,
+    "server_peak_rss_mb": LOWER_IS_BETTER,
+    "telemetry_bytes_per_call": LOWER_IS_BETTER,
+}
+
+# tail percentiles rest on a handful of samples, so they get a wider band
+TOLERANCE_SCALE = {"p95_ms": 1.5, "p99_ms": 2.0}
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list (`q` in 0..100)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def latency_summary(latencies_s: Iterable[float], duration_s: float, errors: int = 0) -> Dict[str, Any]:
+    values = sorted(v * 1000 for v in latencies_s)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "duration_s": round(duration_s, 3),
+        "rps": round(len(values) / duration_s, 1) if duration_s else 0.0,
+        "p50_ms": round(percentile(values, 50), 3),
+        "p95_ms": round(percentile(values, 95), 3),
+        "p99_ms": round(percentile(values, 99), 3),
+        "max_ms": round(values[-1], 3) if values else 0.0,
+    }
+
+
+def proc_memory_mb(pid: int) -> Dict[str, Optional[float]]:
+    """Current and peak RSS of `pid` from /proc (None where /proc is unavailable)."""
+    out: Dict[str, Optional[float]] = {"rss_mb": None, "peak_rss_mb": None}
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("VmRSS", "VmHWM"):
+                    mb = round(int(value.split()[0]) / 1024, 1)
+                    out["rss_mb" if key == "VmRSS" else "peak_rss_mb"] = mb
+    except OSError:
+        pass
+    return out
+
+
+def self_peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def new_result(config: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "timestamp": datetime.utcnow().replace(microsecond=0).isoformat() + "Z",
+        "environment": environment(),
+        "config": config,
+        "scenarios": {},
+    }
+
+
+def save(result: Dict[str, Any], path: Optional[str] = None) -> str:
+    if path is None:
+        stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+        path = os.path.join(DEFAULT_RESULTS_DIR, f"bench-{stamp}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, sort_keys=True)
+        f.write("\n")
+    return path
+
+
+def load(path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.25) -> List[Dict[str, Any]]:
+    """Metrics that got worse than the baseline by more than `tolerance` (a fraction).
+
+    p95/p99 are allowed `TOLERANCE_SCALE` times more slack than the rest.
+    Only scenarios and metrics present in both runs are compared, so adding a
+    scenario never fails against an older baseline.
+    """
+    regressions = []
+    for name, current in result.get("scenarios", {}).items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        for metric, direction in DIRECTIONS.items():
+            old, new = before.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            allowed = tolerance * TOLERANCE_SCALE.get(metric, 1.0)
+            worse = change > allowed if direction == LOWER_IS_BETTER else change < -allowed
+            if worse:
+                regressions.append({
+                    "scenario": name,
+                    "metric": metric,
+                    "baseline": old,
+                    "current": new,
+                    "change": round(change, 3),
+                })
+    return regressions
+
+
+def format_table(result: Dict[str, Any]) -> str:
+    columns = ["rps", "ops_per_s", "p50_ms", "p95_ms", "p99_ms", "us_per_op", "overhead_us",
+               "server_peak_rss_mb", "telemetry_bytes_per_call", "errors"]
+    scenarios = result.get("scenarios", {})
+    used = [c for c in columns if any(c in s for s in scenarios.values())]
+    width = max([len("scenario")] + [len(n) for n in scenarios])
+    lines = ["  ".join(["scenario".ljust(width)] + [c.rjust(12) for c in used])]
+    for name, s in scenarios.items():
+        cells = [("" if s.get(c) is None else str(s[c])).rjust(12) for c in used]
+        lines.append("  ".join([name.ljust(width)] + cells))
+    return "\n".join(lines)
+
+
+__all__ = [
+    "DIRECTIONS",
+    "TOLERANCE_SCALE",
+    "DEFAULT_BASELINE",
+    "DEFAULT_RESULTS_DIR",
+    "percentile",
+    "latency_summary",
+    "proc_memory_mb",
+    "self_peak_rss_mb",
+    "new_result",
+    "save",
+    "load",
+    "compare",
+    "format_table",
+]
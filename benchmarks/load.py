@@ -0,0 +1,265 @@
+import os
+import sys
+import json
+import time
+import uuid
+import socket
+import asyncio
+import tempfile
+import threading
+import subprocess
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import httpx
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+from integrations.config import ROOT_DIR
+from benchmarks.harness import latency_summary, proc_memory_mb
+
+
+BENCH_OPENCLAW_CONFIG = os.path.join(ROOT_DIR, "benchmarks", "openclaw_bench.yaml")
+
+
+def _text(size: int) -> str:
+    words = ("alpha ", "bravo ", "charlie ", "delta ", "echo ")
+    out = "".join(words[i % len(words)] for i in range(size // 6 + 1))
+    return out[:size]
+
+
+# tool name -> arguments for a payload of roughly `size` bytes
+TOOL_ARGS: Dict[str, Callable[[int], Dict[str, Any]]] = {
+    "openclaw_invoke": lambda size: {"endpoint": "/analyze", "payload": {"text": _text(size), "meta": {}}},
+    "openclaw_predict": lambda size: {"endpoint": "/analyze", "payload": {"text": _text(size), "meta": {}}},
+    "planner_agent": lambda size: {"task": _text(size)},
+    "executor_agent": lambda size: {"task": _text(size)},
+}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def mock_openclaw(port: Optional[int] = None, startup_timeout: float = 30.0) -> Iterator[str]:
+    """Run `integrations/openclaw_api.py` under uvicorn in a child process; yields its base URL."""
+    port = port or free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "integrations.openclaw_api:app",
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning", "--no-access-log"],
+        cwd=ROOT_DIR,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            try:
+                if httpx.get(f"{base_url}/health", timeout=1.0).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if proc.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError("mock OpenClaw API did not start")
+            time.sleep(0.1)
+        yield base_url
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+class TelemetrySink:
+    """Local stand-in for the telemetry proxy: accepts every batch and counts bytes and events."""
+
+    def __init__(self):
+        sink = self
+        self.requests = 0
+        self.bytes = 0
+        self.events = 0
+        self._lock = threading.Lock()
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                try:
+                    events = len(json.loads(body)) if self.headers.get("Content-Encoding") != "gzip" else 0
+                except ValueError:
+                    events = 0
+                with sink._lock:
+                    sink.requests += 1
+                    sink.bytes += len(body)
+                    sink.events += events
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"{}")
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}/telemetry"
+        threading.Thread(target=self._server.serve_forever, name="telemetry-sink", daemon=True).start()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests = self.bytes = self.events = 0
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def _server_pid(parent: int, script: str) -> Optional[int]:
+    """PID of our child process running `script` (Linux /proc; None elsewhere)."""
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return None
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            if ppid != parent:
+                continue
+            with open(f"/proc/{entry}/cmdline", "rb") as f:
+                if script.encode() in f.read():
+                    return int(entry)
+        except (OSError, ValueError, IndexError):
+            continue
+    return None
+
+
+def _tool_metrics(result: Any, tool: str) -> Dict[str, Any]:
+    data = getattr(result, "structuredContent", None)
+    if not data:
+        try:
+            data = json.loads(result.content[0].text)
+        except (AttributeError, IndexError, ValueError):
+            return {}
+    tools = data.get("tools", {}) if isinstance(data, dict) else {}
+    return tools.get(tool, {}) if isinstance(tools, dict) else {}
+
+
+async def _drive(session: ClientSession, tool: str, args: Dict[str, Any], requests: int, concurrency: int):
+    latencies: List[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                result = await session.call_tool(tool, args)
+                failed = bool(result.isError)
+            except Exception:
+                failed = True
+            latencies.append(time.perf_counter() - started)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    return latencies, errors, time.perf_counter() - started
+
+
+async def run_scenario(
+    tool: str,
+    concurrency: int,
+    payload_bytes: int,
+    requests: int,
+    base_url: str,
+    sink: Optional[TelemetrySink] = None,
+    warmup: int = 10,
+    openclaw_config: str = BENCH_OPENCLAW_CONFIG,
+) -> Dict[str, Any]:
+    """Start `main.py` over stdio, drive `tool` with `concurrency` callers, and stop it again.
+
+    A fresh server per scenario keeps peak RSS and telemetry counts attributable.
+    """
+    if tool not in TOOL_ARGS:
+        raise ValueError(f"no argument builder for tool {tool!r}; known: {', '.join(TOOL_ARGS)}")
+    args = TOOL_ARGS[tool](payload_bytes)
+    with tempfile.TemporaryDirectory(prefix="chimera-bench-") as scratch:
+        env = dict(os.environ)
+        env.update({
+            "OPENCLAW_BASE_URL": base_url,
+            "OPENCLAW_CONFIG": openclaw_config,
+            "MCP_SESSION_ID": f"bench-{uuid.uuid4().hex[:12]}",
+            "MCP_TASK_DB": os.path.join(scratch, "tasks.db"),
+            "MCP_TELEMETRY_SPOOL_DIR": os.path.join(scratch, "spool"),
+            # never send benchmark traffic to the real telemetry proxy
+            "MCP_TELEMETRY_URL": sink.url if sink is not None else "http://127.0.0.1:9/disabled",
+        })
+        if sink is not None:
+            sink.reset()
+        params = StdioServerParameters(command=sys.executable, args=["main.py"], env=env, cwd=ROOT_DIR)
+        with open(os.devnull, "w") as errlog:
+            async with stdio_client(params, errlog=errlog) as (read, write):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    pid = _server_pid(os.getpid(), "main.py")
+                    await _drive(session, tool, args, warmup, min(concurrency, warmup or 1))
+                    latencies, errors, duration = await _drive(session, tool, args, requests, concurrency)
+                    memory = proc_memory_mb(pid) if pid else {}
+                    server = _tool_metrics(await session.call_tool("metrics", {}), tool)
+
+    out = latency_summary(latencies, duration, errors)
+    out.update({"tool": tool, "concurrency": concurrency, "payload_bytes": payload_bytes})
+    out["server_rss_mb"] = memory.get("rss_mb")
+    out["server_peak_rss_mb"] = memory.get("peak_rss_mb")
+    wall = server.get("wall_ms") or {}
+    out["server_p50_ms"] = round(wall["p50"], 3) if "p50" in wall else None
+    out["server_p99_ms"] = round(wall["p99"], 3) if "p99" in wall else None
+    if sink is not None:
+        # the server flushes telemetry on shutdown, so the sink totals are final here
+        calls = requests + warmup
+        out["telemetry_events"] = sink.events
+        out["telemetry_bytes_per_call"] = round(sink.bytes / calls, 1) if calls else 0.0
+    return out
+
+
+def scenario_name(tool: str, concurrency: int, payload_bytes: int) -> str:
+    return f"mcp.{tool}[c={concurrency},bytes={payload_bytes}]"
+
+
+def run_load(
+    tools: List[str],
+    concurrency: List[int],
+    payload_bytes: List[int],
+    requests: int = 500,
+    warmup: int = 10,
+    base_url: Optional[str] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """Every tool x concurrency x payload combination; starts the mock API unless `base_url` is given."""
+    results: Dict[str, Dict[str, Any]] = {}
+    sink = TelemetrySink()
+    try:
+        with (mock_openclaw() if base_url is None else _given(base_url)) as url:
+            for tool in tools:
+                for c in concurrency:
+                    for size in payload_bytes:
+                        results[scenario_name(tool, c, size)] = asyncio.run(
+                            run_scenario(tool, c, size, requests, url, sink=sink, warmup=warmup)
+                        )
+    finally:
+        sink.close()
+    return results
+
+
+@contextmanager
+def _given(base_url: str) -> Iterator[str]:
+    yield base_url
+
+
+__all__ = ["TOOL_ARGS", "TelemetrySink", "mock_openclaw", "run_scenario", "run_load", "scenario_name", "free_port"]
@@ -0,0 +1,183 @@
+import re
+import time
+import random
+import threading
+from typing import Any, Callable, Dict, List, Tuple
+
+import httpx
+
+from integrations.mcp_telemetry import TelemetryClient
+from integrations.telemetry_sampling import TelemetrySampler
+from integrations.openclaw_integration import OpenClawClient
+from orchestrator.policy import PolicyEngine
+
+
+_ANALYZE_RESPONSE = {"summary": "ok", "tokens": 2, "insights": {"mock_label": "mock_insight"}}
+
+
+def _timed(*fns: Callable[[], Any], iterations: int, warmup: int, repeat: int = 5) -> List[float]:
+    """Seconds for `iterations` calls of each fn, from the fastest of `repeat` rounds (as `timeit` reports).
+
+    Rounds of the different functions are interleaved so that drift in machine
+    load affects them alike.
+    """
+    for fn in fns:
+        for _ in range(warmup):
+            fn()
+    rounds = max(1, iterations // repeat)
+    best = [float("inf")] * len(fns)
+    for _ in range(repeat):
+        for i, fn in enumerate(fns):
+            started = time.perf_counter()
+            for _ in range(rounds):
+                fn()
+            best[i] = min(best[i], time.perf_counter() - started)
+    return [b * iterations / rounds for b in best]
+
+
+def _summary(elapsed: float, iterations: int) -> Dict[str, Any]:
+    return {
+        "iterations": iterations,
+        "ops_per_s": round(iterations / elapsed, 1),
+        "us_per_op": round(elapsed / iterations * 1e6, 3),
+    }
+
+
+def bench_telemetry_track(iterations: int = 50000, payload_bytes: int = 256) -> Dict[str, Any]:
+    """Caller-side cost of `TelemetryClient.track` with the sender thread draining to a no-op transport.
+
+    Uses a default `TelemetrySampler` (keep everything, no aggregation) so the
+    full send path is measured; `bytes_per_event` shows the payload size cap.
+    """
+    received = [0]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        received[0] += len(request.content)
+        return httpx.Response(200, json={})
+
+    client = TelemetryClient(url="http://telemetry.bench", transport=httpx.MockTransport(handler),
+                             max_queue=max(10000, iterations), session_id="bench", sampler=TelemetrySampler())
+    payload = {"tool": "bench", "task": "x" * payload_bytes}
+    try:
+        elapsed, = _timed(lambda: client.track("bench.event", payload), iterations=iterations, warmup=1000)
+        client.flush()
+        out = _summary(elapsed, iterations)
+        stats = client.stats()
+        out["dropped"] = stats["dropped_oldest"] + stats["dropped_newest"]
+        out["bytes_per_event"] = round(received[0] / max(1, stats["sent"]), 1)
+        return out
+    finally:
+        client.close()
+
+
+def bench_openclaw_invoke(iterations: int = 5000, payload_bytes: int = 256) -> Dict[str, Any]:
+    """`OpenClawClient.invoke` against an in-process transport, and its overhead over a bare `httpx.Client`."""
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json=_ANALYZE_RESPONSE))
+    payload = {"text": "x" * payload_bytes, "meta": {}}
+    client = OpenClawClient(base_url="http://openclaw.bench", config={}, transport=transport)
+    raw = httpx.Client(transport=transport)
+    try:
+        elapsed, raw_elapsed = _timed(
+            lambda: client.invoke("/analyze", payload),
+            lambda: raw.post("http://openclaw.bench/analyze", json=payload).json(),
+            iterations=iterations, warmup=200, repeat=10,
+        )
+    finally:
+        client.close()
+        raw.close()
+    out = _summary(elapsed, iterations)
+    out["raw_us_per_op"] = round(raw_elapsed / iterations * 1e6, 3)
+    out["overhead_us"] = round(max(0.0, out["us_per_op"] - out["raw_us_per_op"]), 3)
+    return out
+
+
+def synthetic_transcript(
+    segments: int, rules: int = 200, words_per_segment: int = 30, hit_rate: float = 0.01, seed: int = 7
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """A rule set of `rules` rules (3 one- to three-word phrases each) and
+    transcript segments of common words, `hit_rate` of which quote a phrase."""
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+
+    def word(lo: int, hi: int) -> str:
+        return "".join(rng.choice(letters) for _ in range(rng.randint(lo, hi)))
+
+    vocabulary = [word(2, 9) for _ in range(2000)]
+    rule_set = [
+        {"id": f"rule.{i}", "weight": round(rng.uniform(0.2, 1.0), 2),
+         "phrases": [" ".join(word(5, 10) for _ in range(rng.randint(1, 3))) for _ in range(3)]}
+        for i in range(rules)
+    ]
+    out = []
+    for i in range(segments):
+        words = rng.choices(vocabulary, k=words_per_segment)
+        if rng.random() < hit_rate:
+            words.insert(rng.randrange(len(words)), rng.choice(rng.choice(rule_set)["phrases"]))
+        out.append({"id": i, "start": i * 5.0, "end": i * 5.0 + 5.0, "text": " ".join(words)})
+    return rule_set, out
+
+
+def bench_policy_evaluate(iterations: int = 10, segments: int = 10000, rules: int = 200) -> Dict[str, Any]:
+    """`PolicyEngine.evaluate` over a synthetic transcript, against one regex search per rule per segment."""
+    rule_set, transcript = synthetic_transcript(segments, rules)
+    engine = PolicyEngine(path="")
+    started = time.perf_counter()
+    engine.compile(rule_set, version="bench")
+    compile_ms = (time.perf_counter() - started) * 1000
+    patterns = [
+        re.compile(r"\b(?:" + "|".join(re.escape(p) for p in rule["phrases"]) + r")\b", re.IGNORECASE)
+        for rule in rule_set
+    ]
+
+    # the per-rule baseline is ~50x slower, so it runs on a sample and is scaled up
+    sample = transcript[:max(100, segments // 20)]
+
+    def per_rule_regex() -> List[int]:
+        return [s["id"] for s in sample if any(p.search(s["text"]) for p in patterns)]
+
+    elapsed, = _timed(lambda: engine.evaluate(transcript, rules=rule_set, version="bench"),
+                      iterations=iterations, warmup=1, repeat=iterations)
+    regex_elapsed, = _timed(per_rule_regex, iterations=1, warmup=0, repeat=1)
+    regex_elapsed *= len(transcript) / len(sample)
+    matched = [r["index"] for r in engine.evaluate(sample, rules=rule_set, version="bench")["results"]]
+    assert matched == per_rule_regex()
+
+    chars = sum(len(s["text"]) for s in transcript)
+    out = _summary(elapsed, iterations)
+    out.update({
+        "segments": segments,
+        "rules": rules,
+        "compile_ms": round(compile_ms, 3),
+        "segments_per_s": round(segments * iterations / elapsed, 1),
+        "mb_per_s": round(chars * iterations / elapsed / 1e6, 3),
+        "regex_us_per_op": round(regex_elapsed * 1e6, 3),
+        "speedup_vs_regex": round(regex_elapsed * iterations / elapsed, 2),
+    })
+    return out
+
+
+MICRO_BENCHMARKS = {
+    "micro.telemetry_track": bench_telemetry_track,
+    "micro.openclaw_invoke": bench_openclaw_invoke,
+    "micro.policy_evaluate": bench_policy_evaluate,
+}
+
+
+def run_micro(scale: float = 1.0) -> Dict[str, Dict[str, Any]]:
+    """Every micro-benchmark; `scale` shrinks or grows the iteration counts."""
+    results = {}
+    for name, bench in MICRO_BENCHMARKS.items():
+        defaults = bench.__defaults__ or ()
+        iterations = max(10, int(defaults[0] * scale)) if defaults else None
+        results[name] = bench(iterations) if iterations else bench()
+    return results
+
+
+__all__ = [
+    "bench_telemetry_track",
+    "bench_openclaw_invoke",
+    "bench_policy_evaluate",
+    "synthetic_transcript",
+    "MICRO_BENCHMARKS",
+    "run_micro",
+]
@@ -0,0 +1,88 @@
+"""Benchmark runner.
+
+    python -m benchmarks.run                      # micro + load, compared to benchmarks/baseline.json
+    python -m benchmarks.run --suite micro
+    python -m benchmarks.run --tools openclaw_invoke,planner_agent --concurrency 1,16,64 \\
+        --payload-bytes 256,65536 --requests 500
+    python -m benchmarks.run --save-baseline      # accept this run as the new baseline
+
+Results are written as JSON under `.specify/benchmarks/` (or `--out`). Exits 1
+when a metric regressed by more than `--tolerance` against the baseline.
+"""
+import sys
+import json
+import argparse
+from typing import List, Optional
+
+from benchmarks.harness import (
+    DEFAULT_BASELINE,
+    compare,
+    format_table,
+    load,
+    new_result,
+    save,
+    self_peak_rss_mb,
+)
+
+
+def _ints(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Throughput/latency benchmarks for the MCP server and OpenClaw path")
+    parser.add_argument("--suite", choices=("all", "micro", "load"), default="all")
+    parser.add_argument("--tools", default="openclaw_invoke,planner_agent")
+    parser.add_argument("--concurrency", type=_ints, default=[1, 16])
+    parser.add_argument("--payload-bytes", type=_ints, default=[256, 65536])
+    parser.add_argument("--requests", type=int, default=500, help="measured calls per load scenario")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--micro-scale", type=float, default=1.0, help="multiplier for micro-benchmark iterations")
+    parser.add_argument("--openclaw-url", help="use a running OpenClaw API instead of starting the mock")
+    parser.add_argument("--out", help="result file (default .specify/benchmarks/bench-<time>.json)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed fractional regression")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--json", action="store_true", help="print the result JSON instead of a table")
+    args = parser.parse_args(argv)
+
+    tools = [t.strip() for t in args.tools.split(",") if t.strip()]
+    result = new_result({
+        "suite": args.suite,
+        "tools": tools,
+        "concurrency": args.concurrency,
+        "payload_bytes": args.payload_bytes,
+        "requests": args.requests,
+        "micro_scale": args.micro_scale,
+    })
+    if args.suite in ("all", "micro"):
+        from benchmarks.micro import run_micro
+        result["scenarios"].update(run_micro(args.micro_scale))
+    if args.suite in ("all", "load"):
+        from benchmarks.load import run_load
+        result["scenarios"].update(run_load(tools, args.concurrency, args.payload_bytes, args.requests,
+                                            args.warmup, base_url=args.openclaw_url))
+    result["harness_peak_rss_mb"] = self_peak_rss_mb()
+
+    baseline = load(args.baseline)
+    regressions = compare(result, baseline, args.tolerance) if baseline else []
+    result["regressions"] = regressions
+    path = save(result, args.out)
+    if args.save_baseline:
+        save({k: v for k, v in result.items() if k != "regressions"}, args.baseline)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(format_table(result))
+        print(f"\nresults: {path}")
+        if baseline is None:
+            print(f"no baseline at {args.baseline}; run with --save-baseline to create one")
+        for r in regressions:
+            print(f"REGRESSION {r['scenario']} {r['metric']}: {r['baseline']} -> {r['current']} "
+                  f"({r['change']:+.0%})")
+    return 1 if regressions and not args.save_baseline else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
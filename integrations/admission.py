@@ -0,0 +1,315 @@
+import os
+import json
+import time
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Deque, Dict, Iterable, Optional, Tuple
+
+from mcp.server.fastmcp import FastMCP
+
+
+# reasons carried by OverloadedError
+QUEUE_FULL = "queue_full"
+DEADLINE = "deadline"
+TIMEOUT = "timeout"
+
+
+class OverloadedError(RuntimeError):
+    """A tool call was shed by admission control; the message is the JSON of `info()`."""
+
+    def __init__(self, tool: str, reason: str, retry_after: float, limit: int, in_flight: int, queued: int):
+        self.tool = tool
+        self.reason = reason
+        self.retry_after = retry_after
+        self.limit = limit
+        self.in_flight = in_flight
+        self.queued = queued
+        super().__init__(json.dumps(self.info(), separators=(",", ":")))
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "error": "overloaded",
+            "tool": self.tool,
+            "reason": self.reason,
+            "retry_after_ms": int(self.retry_after * 1000),
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+        }
+
+
+class AIMDLimit:
+    """Concurrency limit tuned by additive-increase / multiplicative-decrease on latency.
+
+    - A call slower than `latency_target` (or one that timed out) multiplies the
+      limit by `backoff`, at most once per `latency_target` so one burst of slow
+      completions counts as a single congestion signal.
+    - Otherwise, while at least half the limit is in use, each call adds
+      `1 / limit`: about +1 per limit's worth of completions.
+    - The limit stays within [`min_limit`, `max_limit`].
+    """
+
+    def __init__(
+        self,
+        initial: float = 16,
+        min_limit: int = 1,
+        max_limit: int = 256,
+        latency_target: float = 2.0,
+        backoff: float = 0.9,
+    ):
+        if not 0 < backoff < 1:
+            raise ValueError("backoff must be in (0, 1)")
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self._limit = float(min(self.max_limit, max(self.min_limit, initial)))
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self._last_decrease = float("-inf")
+
+    @property
+    def value(self) -> int:
+        return int(self._limit)
+
+    def on_sample(self, latency: float, in_flight: int, dropped: bool = False) -> None:
+        now = time.monotonic()
+        if dropped or latency > self.latency_target:
+            if now - self._last_decrease >= self.latency_target:
+                self._limit = max(self.min_limit, self._limit * self.backoff)
+                self._last_decrease = now
+        elif in_flight * 2 >= self._limit:
+            self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+
+
+class AdmissionController:
+    """Caps in-flight tool calls globally and per tool, with a bounded wait queue.
+
+    - A call runs when both the global limit (`AIMDLimit`, adapted from
+      observed latency) and its tool's cap in `tool_limits` have room.
+    - Otherwise it waits in one FIFO queue of at most `max_queue` calls; a
+      waiter whose tool is at its cap does not block the ones behind it.
+    - Each call has a deadline (`queue_timeout`, or a shorter one from the
+      caller). It is shed with `OverloadedError` at once when the queue is full
+      or the expected wait already exceeds the deadline, and otherwise when the
+      deadline passes while still queued.
+    - Shed counts per (tool, reason) go to telemetry as `admission.shed`, at
+      most once per `report_interval` seconds.
+    - Runs on one event loop (the MCP server's); `exempt` tools bypass it.
+    """
+
+    def __init__(
+        self,
+        limit: Optional[AIMDLimit] = None,
+        tool_limits: Optional[Dict[str, int]] = None,
+        max_queue: int = 64,
+        queue_timeout: float = 5.0,
+        exempt: Iterable[str] = ("metrics", "debug_profile"),
+        report_interval: float = 10.0,
+        telemetry=None,
+    ):
+        self.limit = limit or AIMDLimit()
+        self.tool_limits = dict(tool_limits or {})
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self.exempt = set(exempt)
+        self.report_interval = report_interval
+        self.telemetry = telemetry
+
+        self.in_flight = 0
+        self._tool_in_flight: Dict[str, int] = {}
+        self._waiters: Deque[Tuple[str, asyncio.Future]] = deque()
+        # smoothed service time, for estimating how long a new arrival would wait
+        self._latency = 0.0
+        self._counters = {"admitted": 0, "queued": 0, "completed": 0, "shed": 0}
+        self._shed_by: Dict[Tuple[str, str], int] = {}
+        self._unreported: Dict[Tuple[str, str], int] = {}
+        self._last_report = time.monotonic()
+
+    @classmethod
+    def from_env(cls, telemetry=None) -> "AdmissionController":
+        """Settings from `MCP_ADMISSION_*`; `MCP_TOOL_LIMITS` is `tool=n,tool=n`."""
+        tool_limits = {}
+        for item in os.getenv("MCP_TOOL_LIMITS", "").split(","):
+            name, _, value = item.partition("=")
+            if name.strip() and value.strip():
+                tool_limits[name.strip()] = int(value)
+        limit = AIMDLimit(
+            initial=float(os.getenv("MCP_ADMISSION_INITIAL_LIMIT", "16")),
+            min_limit=int(os.getenv("MCP_ADMISSION_MIN_LIMIT", "1")),
+            max_limit=int(os.getenv("MCP_ADMISSION_MAX_LIMIT", "256")),
+            latency_target=float(os.getenv("MCP_ADMISSION_LATENCY_TARGET_MS", "2000")) / 1000,
+        )
+        return cls(
+            limit,
+            tool_limits,
+            max_queue=int(os.getenv("MCP_ADMISSION_QUEUE", "64")),
+            queue_timeout=float(os.getenv("MCP_ADMISSION_TIMEOUT", "5")),
+            telemetry=telemetry,
+        )
+
+    # -- admission ------------------------------------------------------
+
+    def _has_room(self, tool: str) -> bool:
+        cap = self.tool_limits.get(tool)
+        return self.in_flight < self.limit.value and (cap is None or self._tool_in_flight.get(tool, 0) < cap)
+
+    def _take(self, tool: str) -> None:
+        self.in_flight += 1
+        self._tool_in_flight[tool] = self._tool_in_flight.get(tool, 0) + 1
+        self._counters["admitted"] += 1
+
+    def expected_wait(self, ahead: int) -> float:
+        """Rough wait for a call with `ahead` calls queued in front of it."""
+        return (ahead + 1) / max(1, self.limit.value) * self._latency
+
+    async def acquire(self, tool: str, deadline: Optional[float] = None) -> float:
+        """Wait for a slot; returns the admission time. Raises `OverloadedError` when shed."""
+        budget = self.queue_timeout if deadline is None else min(deadline, self.queue_timeout)
+        # `_wake` runs after every release, so queued calls never have room here:
+        # a call that does can start without jumping ahead of anyone who could
+        if self._has_room(tool):
+            self._take(tool)
+            return time.monotonic()
+        if len(self._waiters) >= self.max_queue:
+            raise self._shed(tool, QUEUE_FULL)
+        if self.expected_wait(len(self._waiters)) > budget:
+            raise self._shed(tool, DEADLINE)
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (tool, future)
+        self._waiters.append(entry)
+        self._counters["queued"] += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(future), budget)
+        except asyncio.TimeoutError:
+            pass
+        except asyncio.CancelledError:
+            self._abandon(entry)
+            raise
+        if future.done():
+            # granted by `_wake` (which already counted the slot as taken)
+            return time.monotonic()
+        self._abandon(entry)
+        raise self._shed(tool, TIMEOUT)
+
+    def _abandon(self, entry: Tuple[str, asyncio.Future]) -> None:
+        tool, future = entry
+        if future.done():
+            self.release(tool, 0.0, sample=False)
+            return
+        future.cancel()
+        try:
+            self._waiters.remove(entry)
+        except ValueError:
+            pass
+
+    def _wake(self) -> None:
+        for entry in list(self._waiters):
+            if self.in_flight >= self.limit.value:
+                return
+            tool, future = entry
+            if future.done():
+                self._waiters.remove(entry)
+            elif self._has_room(tool):
+                self._waiters.remove(entry)
+                self._take(tool)
+                future.set_result(True)
+
+    def release(self, tool: str, latency: float, dropped: bool = False, sample: bool = True) -> None:
+        in_flight = self.in_flight
+        self.in_flight -= 1
+        self._tool_in_flight[tool] -= 1
+        if sample:
+            self._counters["completed"] += 1
+            self._latency = latency if not self._latency else 0.8 * self._latency + 0.2 * latency
+            self.limit.on_sample(latency, in_flight, dropped)
+        self._wake()
+
+    @asynccontextmanager
+    async def admit(self, tool: str, deadline: Optional[float] = None):
+        if tool in self.exempt:
+            yield
+            return
+        started = await self.acquire(tool, deadline)
+        dropped = False
+        try:
+            yield
+        except (asyncio.TimeoutError, TimeoutError):
+            dropped = True
+            raise
+        finally:
+            self.release(tool, time.monotonic() - started, dropped)
+
+    # -- reporting ------------------------------------------------------
+
+    def _shed(self, tool: str, reason: str) -> OverloadedError:
+        key = (tool, reason)
+        self._counters["shed"] += 1
+        self._shed_by[key] = self._shed_by.get(key, 0) + 1
+        self._unreported[key] = self._unreported.get(key, 0) + 1
+        self.report()
+        retry_after = max(0.05, self.expected_wait(len(self._waiters)))
+        return OverloadedError(tool, reason, retry_after, self.limit.value, self.in_flight, len(self._waiters))
+
+    def report(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not self._unreported or (not force and now - self._last_report < self.report_interval):
+            return
+        counts, self._unreported = self._unreported, {}
+        self._last_report = now
+        if self.telemetry is None:
+            return
+        try:
+            self.telemetry.track("admission.shed", {
+                "shed": [{"tool": t, "reason": r, "count": n} for (t, r), n in sorted(counts.items())],
+                "limit": self.limit.value,
+                "in_flight": self.in_flight,
+                "queued": len(self._waiters),
+            })
+        except Exception:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        shed: Dict[str, Dict[str, int]] = {}
+        for (tool, reason), n in self._shed_by.items():
+            shed.setdefault(tool, {})[reason] = n
+        return {
+            **self._counters,
+            "limit": self.limit.value,
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "latency_ms": round(self._latency * 1000, 3),
+            "tool_limits": dict(self.tool_limits),
+            "shed_by_tool": shed,
+        }
+
+
+def _call_deadline(arguments: Dict[str, Any]) -> Optional[float]:
+    # tools that take `timeout_seconds` bound their own queueing by it too
+    value = arguments.get("timeout_seconds") if isinstance(arguments, dict) else None
+    return float(value) if isinstance(value, (int, float)) and value > 0 else None
+
+
+class AdmittingFastMCP(FastMCP):
+    """`FastMCP` whose tool dispatch goes through an `AdmissionController`."""
+
+    def __init__(self, *args: Any, admission: Optional[AdmissionController] = None, **kwargs: Any):
+        self.admission = admission
+        super().__init__(*args, **kwargs)
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]):
+        if self.admission is None:
+            return await super().call_tool(name, arguments)
+        async with self.admission.admit(name, _call_deadline(arguments)):
+            return await super().call_tool(name, arguments)
+
+
+__all__ = [
+    "AIMDLimit",
+    "AdmissionController",
+    "AdmittingFastMCP",
+    "OverloadedError",
+    "QUEUE_FULL",
+    "DEADLINE",
+    "TIMEOUT",
+]
@@ -0,0 +1,298 @@
+import os
+import json
+import mmap
+import time
+import uuid
+import shutil
+import sqlite3
+import hashlib
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from integrations.config import ROOT_DIR
+
+
+DEFAULT_ARTIFACT_DIR = os.path.join(ROOT_DIR, ".specify", "artifacts")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    checksum    TEXT PRIMARY KEY,
+    size        INTEGER NOT NULL,
+    refcount    INTEGER NOT NULL DEFAULT 0,
+    created_at  TEXT NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_blobs_evictable ON blobs (refcount, last_access);
+CREATE TABLE IF NOT EXISTS artifacts (
+    id          TEXT PRIMARY KEY,
+    source      TEXT,
+    source_url  TEXT,
+    checksum    TEXT NOT NULL REFERENCES blobs (checksum),
+    metadata    TEXT,
+    created_at  TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_artifacts_source_url ON artifacts (source_url);
+"""
+
+_CHUNK = 1024 * 1024
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat() + "Z"
+
+
+def _digest(checksum: str) -> str:
+    return checksum.split(":")[-1].lower()
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ArtifactStore:
+    """Local content-addressed blob store, a stand-in for the object store behind `artifacts`.
+
+    - Blobs live at `<root>/blobs/<aa>/<sha256>` and are read-only; an index in
+      `<root>/index.db` (SQLite, WAL) maps artifacts and source URLs to them.
+    - `fetch()` skips the download when the URL (or expected checksum) is
+      already stored; identical content from different URLs shares one blob.
+    - New files are hardlinked into place when possible, copied otherwise.
+    - `open()` maps a blob read-only, so readers get zero-copy buffers.
+    - Blobs are reference-counted by artifacts; once unreferenced they stay as
+      cache until `max_bytes` is exceeded, then go least recently used first.
+    """
+
+    def __init__(self, root: Optional[str] = None, max_bytes: Optional[int] = None, busy_timeout: float = 5.0):
+        self.root = root or os.getenv("MCP_ARTIFACT_DIR") or DEFAULT_ARTIFACT_DIR
+        env_max = os.getenv("MCP_ARTIFACT_MAX_BYTES")
+        self.max_bytes = max_bytes if max_bytes is not None else (int(env_max) if env_max else None)
+        self.busy_timeout = busy_timeout
+        self.db_path = os.path.join(self.root, "index.db")
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    # -- index ----------------------------------------------------------
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.join(self.root, "blobs"), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._init_lock:
+                if not self._initialized:
+                    conn.executescript(_SCHEMA)
+                    self._initialized = True
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _write(self):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def blob_path(self, checksum: str) -> str:
+        digest = _digest(checksum)
+        return os.path.join(self.root, "blobs", digest[:2], digest)
+
+    def _artifact(self, row: sqlite3.Row) -> Dict[str, Any]:
+        out = dict(row)
+        out["metadata"] = json.loads(out["metadata"]) if out["metadata"] else {}
+        out["media_uri"] = self.blob_path(out["checksum"])
+        out["checksum"] = f"sha256:{out['checksum']}"
+        return out
+
+    # -- lookups --------------------------------------------------------
+
+    def get(self, artifact_id: str) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute("SELECT * FROM artifacts WHERE id = ?", (artifact_id,)).fetchone()
+        return self._artifact(row) if row is not None else None
+
+    def lookup(self, source_url: str) -> Optional[Dict[str, Any]]:
+        """Newest artifact stored for `source_url`, if its blob is still on disk."""
+        row = self._conn().execute(
+            "SELECT * FROM artifacts WHERE source_url = ? ORDER BY created_at DESC LIMIT 1", (source_url,)
+        ).fetchone()
+        if row is None or not os.path.exists(self.blob_path(row["checksum"])):
+            return None
+        return self._artifact(row)
+
+    def has(self, checksum: str) -> bool:
+        row = self._conn().execute("SELECT 1 FROM blobs WHERE checksum = ?", (_digest(checksum),)).fetchone()
+        return row is not None and os.path.exists(self.blob_path(checksum))
+
+    # -- writes ---------------------------------------------------------
+
+    def _ingest(self, path: str, digest: str) -> None:
+        dest = self.blob_path(digest)
+        if os.path.exists(dest):
+            return
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        tmp = f"{dest}.{uuid.uuid4().hex[:8]}.tmp"
+        try:
+            os.link(path, tmp)
+        except OSError:
+            # different filesystem (or no hardlink support): fall back to a copy
+            shutil.copyfile(path, tmp)
+        os.chmod(tmp, 0o444)
+        os.replace(tmp, dest)
+
+    def put_file(
+        self,
+        path: str,
+        source_url: Optional[str] = None,
+        source: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        checksum: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Record a new artifact for the file at `path`, reusing the blob if the content is known."""
+        digest = _digest(checksum) if checksum else file_sha256(path)
+        self._ingest(path, digest)
+        return self._link(digest, source_url, source, metadata, path)
+
+    def _link(self, digest: str, source_url: Optional[str], source: Optional[str],
+              metadata: Optional[Dict[str, Any]], path: Optional[str] = None) -> Dict[str, Any]:
+        """Reference the blob for `digest`; raises FileNotFoundError if it is gone and `path` can't restore it."""
+        artifact_id = str(uuid.uuid4())
+        blob = self.blob_path(digest)
+        with self._write() as conn:
+            # evict() unlinks under this same write lock, so a blob seen here stays
+            if not os.path.exists(blob):
+                # evicted since the caller checked: bring the content back from `path`
+                if path is None or not os.path.exists(path):
+                    raise FileNotFoundError(blob)
+                self._ingest(path, digest)
+            # blob row and reference in one transaction, so evict() never sees it unreferenced
+            conn.execute(
+                "INSERT INTO blobs (checksum, size, refcount, created_at, last_access) VALUES (?, ?, 1, ?, ?) "
+                "ON CONFLICT (checksum) DO UPDATE SET refcount = refcount + 1, last_access = excluded.last_access",
+                (digest, os.path.getsize(blob), _now(), time.time()),
+            )
+            conn.execute(
+                "INSERT INTO artifacts (id, source, source_url, checksum, metadata, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (artifact_id, source, source_url, digest, json.dumps(metadata or {}), _now()),
+            )
+        self.evict()
+        return self.get(artifact_id)
+
+    def fetch(
+        self,
+        source_url: str,
+        download: Callable[[str], Dict[str, Any]],
+        checksum: Optional[str] = None,
+        source: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Artifact for `source_url`, calling `download(url)` only when the content is not stored yet.
+
+        `download` returns at least `{"file_path"}` and may include `checksum`;
+        the downloaded file is ingested and then removed.
+        """
+        known = self.lookup(source_url)
+        if known is not None:
+            self.touch(known["checksum"])
+            return dict(known, cached=True)
+        if checksum and self.has(checksum):
+            try:
+                return dict(self._link(_digest(checksum), source_url, source, metadata), cached=True)
+            except FileNotFoundError:
+                pass    # evicted in the meantime: download it again
+        result = download(source_url)
+        try:
+            artifact = self.put_file(result["file_path"], source_url, source, metadata, result.get("checksum"))
+        finally:
+            if os.path.exists(result["file_path"]):
+                os.remove(result["file_path"])
+        return dict(artifact, cached=False)
+
+    def release(self, artifact_id: str) -> bool:
+        """Drop an artifact; its blob becomes evictable once nothing else references it."""
+        with self._write() as conn:
+            row = conn.execute("SELECT checksum FROM artifacts WHERE id = ?", (artifact_id,)).fetchone()
+            if row is None:
+                return False
+            conn.execute("DELETE FROM artifacts WHERE id = ?", (artifact_id,))
+            conn.execute("UPDATE blobs SET refcount = MAX(refcount - 1, 0) WHERE checksum = ?", (row["checksum"],))
+        self.evict()
+        return True
+
+    def touch(self, checksum: str) -> None:
+        with self._write() as conn:
+            conn.execute("UPDATE blobs SET last_access = ? WHERE checksum = ?", (time.time(), _digest(checksum)))
+
+    def evict(self, max_bytes: Optional[int] = None) -> int:
+        """Delete unreferenced blobs, least recently used first, until under `max_bytes`; returns bytes freed."""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        if limit is None:
+            return 0
+        freed = 0
+        with self._write() as conn:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+            if total <= limit:
+                return 0
+            victims = []
+            for row in conn.execute("SELECT checksum, size FROM blobs WHERE refcount = 0 ORDER BY last_access"):
+                if total - freed <= limit:
+                    break
+                victims.append(row["checksum"])
+                freed += row["size"]
+            conn.executemany("DELETE FROM blobs WHERE checksum = ?", [(v,) for v in victims])
+            # unlink before committing: a concurrent _link() either references the
+            # blob first (and it is no victim) or finds the file gone and restores it
+            for digest in victims:
+                try:
+                    os.remove(self.blob_path(digest))
+                except FileNotFoundError:
+                    pass
+        return freed
+
+    # -- reads ----------------------------------------------------------
+
+    @contextmanager
+    def open(self, checksum: str) -> Iterator[memoryview]:
+        """Read-only, zero-copy view of a blob (backed by `mmap`)."""
+        path = self.blob_path(checksum)
+        self.touch(checksum)
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield memoryview(b"")
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                view = memoryview(mm)
+                try:
+                    yield view
+                finally:
+                    view.release()
+
+    def stats(self) -> Dict[str, Any]:
+        conn = self._conn()
+        blobs, total, unreferenced = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(CASE WHEN refcount = 0 THEN size END), 0) FROM blobs"
+        ).fetchone()
+        artifacts = conn.execute("SELECT COUNT(*) FROM artifacts").fetchone()[0]
+        return {"blobs": blobs, "artifacts": artifacts, "bytes": total,
+                "unreferenced_bytes": unreferenced, "max_bytes": self.max_bytes}
+
+
+__all__ = ["ArtifactStore", "DEFAULT_ARTIFACT_DIR", "file_sha256"]
@@ -0,0 +1,95 @@
+import os
+import re
+import json
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TELEMETRY_CONFIG = os.path.join(ROOT_DIR, ".mcp", "telemetry.yaml")
+
+_ENV_REF = re.compile(r"\$\{([A-Za-z_][A-Za-z0-9_]*)(?::-([^}]*))?\}")
+
+
+def _expand(value: Any) -> Any:
+    """Resolve `${VAR:-default}` references the way the sample configs use them."""
+    if isinstance(value, str):
+        return _ENV_REF.sub(lambda m: os.getenv(m.group(1)) or (m.group(2) or ""), value)
+    if isinstance(value, dict):
+        return {k: _expand(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_expand(v) for v in value]
+    return value
+
+
+@lru_cache(maxsize=None)
+def load_env() -> bool:
+    """Load `.env` into `os.environ` once per process (python-dotenv is optional)."""
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return False
+    return load_dotenv()
+
+
+def load_yaml(path: str) -> Dict[str, Any]:
+    if not os.path.exists(path):
+        return {}
+    try:
+        # imported on first use: PyYAML is optional and costs ~20ms to import
+        import yaml
+    except ImportError:  # callers fall back to built-in defaults
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = yaml.safe_load(f) or {}
+    except Exception:
+        return {}
+    return _expand(data) if isinstance(data, dict) else {}
+
+
+@lru_cache(maxsize=None)
+def openclaw_config(path: Optional[str] = None) -> Dict[str, Any]:
+    """`openclaw_config.yaml` (or `OPENCLAW_CONFIG`), falling back to the checked-in sample."""
+    candidates = [path, os.getenv("OPENCLAW_CONFIG"), os.path.join(ROOT_DIR, "openclaw_config.yaml"),
+                  os.path.join(ROOT_DIR, "openclaw_config.yaml.sample")]
+    for candidate in candidates:
+        if candidate and os.path.exists(candidate):
+            return load_yaml(candidate)
+    return {}
+
+
+def telemetry_config(path: Optional[str] = None) -> Dict[str, Any]:
+    """`.mcp/telemetry.yaml` (or `MCP_TELEMETRY_CONFIG`); {} when missing."""
+    return load_yaml(path or os.getenv("MCP_TELEMETRY_CONFIG") or TELEMETRY_CONFIG)
+
+
+@lru_cache(maxsize=None)
+def vscode_mcp_url() -> Optional[str]:
+    """First server `url` in `.vscode/mcp.json`, read once per process."""
+    try:
+        with open(os.path.join(ROOT_DIR, ".vscode", "mcp.json"), "r", encoding="utf-8") as f:
+            servers = json.load(f).get("servers", {})
+    except (OSError, ValueError, AttributeError):
+        return None
+    for server in servers.values():
+        if isinstance(server, dict) and server.get("url"):
+            return server["url"]
+    return None
+
+
+def section(cfg: Dict[str, Any], key: str) -> Dict[str, Any]:
+    value = cfg.get(key)
+    return value if isinstance(value, dict) else {}
+
+
+__all__ = [
+    "ROOT_DIR",
+    "TELEMETRY_CONFIG",
+    "load_env",
+    "load_yaml",
+    "openclaw_config",
+    "telemetry_config",
+    "vscode_mcp_url",
+    "section",
+]
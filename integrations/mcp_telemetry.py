@@ -1,82 +1,352 @@
 import os
 import json
+import gzip
+import uuid
+import atexit
 import threading
-import time
+from collections import deque
 from datetime import datetime
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 
 import httpx
 
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-except Exception:
-    pass
-
-
-def _load_vscode_mcp_url() -> Optional[str]:
-    cfg_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), ".vscode", "mcp.json")
-    if not os.path.exists(cfg_path):
-        return None
-    try:
-        with open(cfg_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            servers = data.get("servers", {})
-            for v in servers.values():
-                url = v.get("url")
-                if url:
-                    return url
-    except Exception:
-        return None
-    return None
+from integrations.config import load_env, vscode_mcp_url
+from integrations.telemetry_sampling import COUNTERS_EVENT, TelemetrySampler
+from integrations.telemetry_spool import TelemetrySpool
+
+
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+
+# status codes worth retrying; any other 4xx means the proxy rejected the batch
+_RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+_MAX_REPLAY_BACKOFF = 300.0
 
 
 class TelemetryClient:
-    """Non-blocking telemetry sender with simple retries/backoff.
+    """Batched, non-blocking telemetry sender.
 
-    - Sends events in background threads so callers never block.
-    - Retries up to `max_retries` with exponential backoff on failures.
+    - `track()` appends to a bounded in-memory ring buffer and returns at once.
+    - One long-lived background thread flushes when `batch_size` events are
+      queued or every `flush_interval` seconds, whichever comes first.
+    - Batches go out as a JSON-RPC 2.0 batch of `telemetry.emit` calls over a
+      single pooled `httpx.Client`, optionally gzip-compressed.
+    - When the buffer is full, `overflow="drop_oldest"` evicts the oldest queued
+      event and `overflow="drop_newest"` rejects the incoming one. Both are
+      counted in `stats()`.
+    - Retries up to `max_retries` with exponential backoff on the sender thread.
+      With a `TelemetrySpool` attached, failed batches (and bursts past half
+      the buffer) are appended to disk instead, and a replayer thread drains
+      the spool once the endpoint recovers.
+    - A `TelemetrySampler` (by default from `telemetry_sampling` in
+      `.mcp/telemetry.yaml`, read on the first `track()`) head-samples,
+      aggregates high-frequency types into `telemetry.counters` and caps
+      payload sizes on the sender thread before anything is sent or spooled.
     - If no URL is configured, `track()` is a no-op.
     """
 
-    def __init__(self, url: Optional[str] = None, headers: Optional[Dict[str, str]] = None, timeout: float = 5.0, max_retries: int = 3):
-        self.url = url or os.getenv("MCP_TELEMETRY_URL") or _load_vscode_mcp_url()
-        self.headers = headers or {"Content-Type": "application/json"}
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 5.0,
+        max_retries: int = 3,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        max_queue: int = 10000,
+        overflow: str = DROP_OLDEST,
+        compress: bool = False,
+        session_id: Optional[str] = None,
+        method: str = "telemetry.emit",
+        transport: Optional[httpx.BaseTransport] = None,
+        spool: Optional[TelemetrySpool] = None,
+        replay_interval: float = 5.0,
+        sampler: Optional[TelemetrySampler] = None,
+    ):
+        if overflow not in (DROP_OLDEST, DROP_NEWEST):
+            raise ValueError(f"overflow must be {DROP_OLDEST!r} or {DROP_NEWEST!r}")
+        load_env()
+        self.url = url or os.getenv("MCP_TELEMETRY_URL") or vscode_mcp_url()
+        self.session_id = session_id or os.getenv("MCP_SESSION_ID") or str(uuid.uuid4())
+        self.headers = {"Content-Type": "application/json", "X-Session-ID": self.session_id}
+        self.headers.update(headers or {})
         self.timeout = timeout
         self.max_retries = max_retries
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_queue = max(1, max_queue)
+        self.overflow = overflow
+        self.compress = compress
+        self.method = method
+        self._transport = transport
+        self._spool = spool
+        self.replay_interval = replay_interval
+        self._sampler = sampler
 
-    def _send_sync(self, event: Dict) -> None:
-        if not self.url:
+        self._buffer: deque = deque()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._replayer: Optional[threading.Thread] = None
+        self._degraded = threading.Event()
+        self._client: Optional[httpx.Client] = None
+        self._counters = {
+            "enqueued": 0,
+            "sent": 0,
+            "batches": 0,
+            "dropped_oldest": 0,
+            "dropped_newest": 0,
+            "failed": 0,
+            "rejected": 0,
+            "spooled": 0,
+            "replayed": 0,
+        }
+        if self._spool is not None and self.url:
+            # drain whatever a previous (possibly crashed) run left behind
+            self._start()
+
+    # -- public API -----------------------------------------------------
+
+    def track(self, event_type: str, payload: Optional[Dict] = None) -> None:
+        if not self.url or self._stop.is_set():
             return
-        attempt = 0
-        backoff = 0.5
-        while attempt <= self.max_retries:
-            try:
-                with httpx.Client(timeout=self.timeout) as client:
-                    client.post(self.url, json=event, headers=self.headers)
+        try:
+            payload = payload or {}
+            rate = (self._sampler or self._load_sampler()).admit(event_type, payload)
+            if rate is None:
+                # sampled out, or counted for the next `telemetry.counters`
+                if self._thread is None:
+                    self._start()
+                return
+            event = {
+                "type": event_type,
+                "timestamp": datetime.utcnow().isoformat() + "Z",
+                "payload": payload,
+            }
+            if rate < 1.0:
+                event["sample_rate"] = rate
+            with self._lock:
+                if len(self._buffer) >= self.max_queue:
+                    if self.overflow == DROP_NEWEST:
+                        self._counters["dropped_newest"] += 1
+                        return
+                    self._buffer.popleft()
+                    self._counters["dropped_oldest"] += 1
+                self._buffer.append(event)
+                self._counters["enqueued"] += 1
+                pending = len(self._buffer)
+            if self._thread is None:
+                self._start()
+            if pending >= self.batch_size:
+                self._wake.set()
+        except Exception:
+            # must not raise
+            return
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            out = dict(self._counters)
+            out["queued"] = len(self._buffer)
+        if self._sampler is not None:
+            out.update(self._sampler.stats())
+        return out
+
+    def flush(self) -> None:
+        """Send everything queued so far, pending counters included, from the calling thread."""
+        self._queue_counters(force=True)
+        self._send_queued()
+
+    def _load_sampler(self) -> TelemetrySampler:
+        # deferred to the first event, so importing and constructing stay cheap
+        sampler = TelemetrySampler.from_config()
+        with self._lock:
+            if self._sampler is None:
+                self._sampler = sampler
+            return self._sampler
+
+    def close(self) -> None:
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._wake.set()
+        for t in (self._thread, self._replayer):
+            if t is not None:
+                t.join(timeout=self.timeout + 1.0)
+        try:
+            self.flush()
+        finally:
+            if self._spool is not None:
+                self._spool.close()
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    # -- sender ---------------------------------------------------------
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
                 return
+            self._thread = threading.Thread(target=self._run, name="telemetry-sender", daemon=True)
+            self._thread.start()
+            if self._spool is not None:
+                self._replayer = threading.Thread(target=self._run_replayer, name="telemetry-replayer", daemon=True)
+                self._replayer.start()
+        atexit.register(self.close)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self._queue_counters()
+                self._send_queued()
             except Exception:
-                attempt += 1
-                time.sleep(backoff)
-                backoff *= 2
-        # swallow failures - telemetry must not raise
-        return
+                pass
 
-    def track(self, event_type: str, payload: Optional[Dict] = None) -> None:
-        payload = payload or {}
-        event = {
-            "type": event_type,
-            "timestamp": datetime.utcnow().isoformat() + "Z",
-            "payload": payload,
-        }
+    def _queue_counters(self, force: bool = False) -> None:
+        if self._sampler is None:
+            return
+        counters = self._sampler.take_counters(force)
+        if counters is not None:
+            event = {"type": COUNTERS_EVENT, "timestamp": datetime.utcnow().isoformat() + "Z", "payload": counters}
+            with self._lock:
+                self._buffer.append(event)
+                self._counters["enqueued"] += 1
+
+    def _send_queued(self) -> None:
+        while True:
+            batch = self._drain()
+            if not batch:
+                return
+            if self._sampler is not None:
+                for event in batch:
+                    event["payload"] = self._sampler.compact(event["type"], event["payload"])
+            self._deliver(batch)
+
+    def _drain(self) -> List[Dict]:
+        with self._lock:
+            n = min(self.batch_size, len(self._buffer))
+            return [self._buffer.popleft() for _ in range(n)]
+
+    def _http(self) -> httpx.Client:
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(timeout=self.timeout, transport=self._transport)
+            return self._client
 
-        # spawn background thread so caller is non-blocking
+    def _encode(self, batch: List[Dict]) -> bytes:
+        envelopes = [
+            {
+                "jsonrpc": "2.0",
+                "method": self.method,
+                "id": uuid.uuid4().hex,
+                "params": {"session": self.session_id, **event},
+            }
+            for event in batch
+        ]
+        body = json.dumps(envelopes, separators=(",", ":"), default=str).encode("utf-8")
+        if self.compress:
+            body = gzip.compress(body)
+        return body
+
+    def _post(self, body: bytes) -> Optional[int]:
+        headers = dict(self.headers)
+        if self.compress:
+            headers["Content-Encoding"] = "gzip"
         try:
-            t = threading.Thread(target=self._send_sync, args=(event,), daemon=True)
-            t.start()
+            resp = self._http().post(self.url, content=body, headers=headers)
         except Exception:
-            # must not raise
+            return None
+        return resp.status_code
+
+    def _deliver(self, batch: List[Dict]) -> None:
+        if self._spool is not None and (self._degraded.is_set() or self.stats()["queued"] >= self.max_queue // 2):
+            # endpoint down or burst in progress: a local append, no round trip
+            self._spill(batch)
+            return
+        body = self._encode(batch)
+        retries = 0 if self._spool is not None else self.max_retries
+        backoff = 0.5
+        for attempt in range(retries + 1):
+            status = self._post(body)
+            if status is not None and status < 400:
+                self._count(sent=len(batch), batches=1)
+                return
+            if status is not None and status not in _RETRYABLE_STATUS:
+                self._count(rejected=len(batch))
+                return
+            if attempt < retries and not self._stop.is_set():
+                self._stop.wait(backoff)
+                backoff *= 2
+        if self._spool is not None:
+            self._degraded.set()
+            self._spill(batch)
             return
+        # swallow failures - telemetry must not raise
+        self._count(failed=len(batch))
+
+    def _spill(self, batch: List[Dict]) -> None:
+        try:
+            # keep the originating session so replay from a later run still correlates
+            self._spool.append([{"session": self.session_id, **e} for e in batch])
+            self._count(spooled=len(batch))
+        except Exception:
+            self._count(failed=len(batch))
+
+    # -- replay ---------------------------------------------------------
+
+    def _run_replayer(self) -> None:
+        backoff = self.replay_interval
+        while not self._stop.wait(backoff):
+            try:
+                drained = self.replay()
+            except Exception:
+                drained = False
+            backoff = self.replay_interval if drained else min(backoff * 2, _MAX_REPLAY_BACKOFF)
+
+    def replay(self) -> bool:
+        """Drain spooled segments oldest-first; returns True once the spool is empty."""
+        spool = self._spool
+        if spool is None or not self.url:
+            return True
+        spool.prune()
+        if not spool.pending():
+            self._degraded.clear()
+            return True
+        spool.seal()
+        for path in spool.segments():
+            offset = spool.acked(path)
+            batch: List[Dict] = []
+            end = offset
+            for end, event in spool.read(path, offset):
+                batch.append(event)
+                if len(batch) >= self.batch_size:
+                    if not self._replay_batch(path, batch, end):
+                        return False
+                    batch = []
+            if batch and not self._replay_batch(path, batch, end):
+                return False
+            spool.remove(path)
+        self._degraded.clear()
+        return True
+
+    def _replay_batch(self, path: str, batch: List[Dict], end: int) -> bool:
+        status = self._post(self._encode(batch))
+        if status is None or status in _RETRYABLE_STATUS:
+            return False
+        if status < 400:
+            self._count(replayed=len(batch), batches=1)
+        else:
+            self._count(rejected=len(batch))
+        self._spool.ack(path, end)
+        return True
+
+    def _count(self, **deltas: int) -> None:
+        with self._lock:
+            for key, value in deltas.items():
+                self._counters[key] += value
 
 
-__all__ = ["TelemetryClient"]
+__all__ = ["TelemetryClient", "DROP_OLDEST", "DROP_NEWEST"]
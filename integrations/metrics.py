@@ -0,0 +1,343 @@
+import json
+import time
+import inspect
+import functools
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Dict, List, Any, Callable
+
+from integrations.profiling import PROFILER
+
+
+class _Shard:
+    __slots__ = ("counts", "total", "n", "lo", "hi")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.total = 0
+        self.n = 0
+        self.lo = None
+        self.hi = 0
+
+
+class LogHistogram:
+    """Fixed-memory, log-bucketed histogram (HDR-style) for non-negative ints.
+
+    - Each power of two is split into `2**sub_bits` linear sub-buckets, so any
+      reported percentile is within `1 / 2**sub_bits` of the true value.
+    - Values above `2**max_bits` are clamped into the top bucket.
+    - Every recording thread writes to its own shard, so `record()` takes no
+      lock; `snapshot()` merges the shards.
+    """
+
+    def __init__(self, sub_bits: int = 4, max_bits: int = 40):
+        self.sub_bits = sub_bits
+        self.sub = 1 << sub_bits
+        self.max_value = (1 << max_bits) - 1
+        self.size = self._index(self.max_value) + 1
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self._shards_lock = threading.Lock()
+
+    def _index(self, v: int) -> int:
+        if v < 2 * self.sub:
+            return v
+        shift = v.bit_length() - 1 - self.sub_bits
+        return shift * self.sub + (v >> shift)
+
+    def _bucket_value(self, idx: int) -> int:
+        if idx < 2 * self.sub:
+            return idx
+        shift = idx // self.sub - 1
+        m = idx - shift * self.sub
+        # midpoint of [m << shift, (m + 1) << shift)
+        return (m << shift) + (1 << (shift - 1))
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = _Shard(self.size)
+            with self._shards_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def record(self, value: float) -> None:
+        v = min(max(int(value), 0), self.max_value)
+        shard = self._shard()
+        shard.counts[self._index(v)] += 1
+        shard.total += v
+        shard.n += 1
+        if shard.lo is None or v < shard.lo:
+            shard.lo = v
+        if v > shard.hi:
+            shard.hi = v
+
+    @property
+    def count(self) -> int:
+        return sum(s.n for s in list(self._shards))
+
+    def snapshot(self, percentiles=(50, 90, 95, 99), scale: float = 1.0) -> Dict[str, float]:
+        shards = list(self._shards)
+        n = sum(s.n for s in shards)
+        if not n:
+            return {"count": 0}
+        merged = [0] * self.size
+        for s in shards:
+            for i, c in enumerate(s.counts):
+                if c:
+                    merged[i] += c
+        out = {
+            "count": n,
+            "min": min(s.lo for s in shards if s.lo is not None) / scale,
+            "max": max(s.hi for s in shards) / scale,
+            "mean": sum(s.total for s in shards) / n / scale,
+        }
+        targets = sorted(percentiles)
+        seen = 0
+        t = 0
+        for i, c in enumerate(merged):
+            if not c:
+                continue
+            seen += c
+            while t < len(targets) and seen >= n * targets[t] / 100.0:
+                out[f"p{targets[t]}"] = min(self._bucket_value(i), out["max"] * scale) / scale
+                t += 1
+            if t == len(targets):
+                break
+        return out
+
+
+class ShardedCounter:
+    """Monotonic counter with per-thread shards; `add()` takes no lock."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._cells: List[List[int]] = []
+        self._lock = threading.Lock()
+
+    def add(self, n: int = 1) -> None:
+        cell = getattr(self._local, "cell", None)
+        if cell is None:
+            cell = [0]
+            with self._lock:
+                self._cells.append(cell)
+            self._local.cell = cell
+        cell[0] += n
+
+    @property
+    def value(self) -> int:
+        return sum(c[0] for c in list(self._cells))
+
+
+# upstream HTTP microseconds accumulated by the tool call running in this context
+_upstream_us: ContextVar[Optional[List[int]]] = ContextVar("upstream_us", default=None)
+
+
+@contextmanager
+def upstream_timer():
+    """Charge the wrapped block's wall time to the current tool call's upstream time."""
+    acc = _upstream_us.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if acc is not None:
+            acc[0] += int((time.perf_counter() - start) * 1e6)
+
+
+def _payload_size(obj: Any) -> int:
+    if obj is None:
+        return 0
+    if isinstance(obj, (bytes, bytearray)):
+        return len(obj)
+    if isinstance(obj, str):
+        return len(obj.encode("utf-8"))
+    try:
+        return len(json.dumps(obj, separators=(",", ":"), default=str))
+    except Exception:
+        return 0
+
+
+class ToolStats:
+    def __init__(self):
+        self.wall_us = LogHistogram()
+        self.upstream_us = LogHistogram()
+        self.request_bytes = LogHistogram()
+        self.response_bytes = LogHistogram()
+        self.started = ShardedCounter()
+        self.errors = ShardedCounter()
+
+    @property
+    def in_flight(self) -> int:
+        return max(0, self.started.value - self.wall_us.count)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "calls": self.wall_us.count,
+            "errors": self.errors.value,
+            "in_flight": self.in_flight,
+            "wall_ms": self.wall_us.snapshot(scale=1000.0),
+            "upstream_ms": self.upstream_us.snapshot(scale=1000.0),
+            "request_bytes": self.request_bytes.snapshot(),
+            "response_bytes": self.response_bytes.snapshot(),
+        }
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._tools: Dict[str, ToolStats] = {}
+        self._lock = threading.Lock()
+
+    def tool(self, name: str) -> ToolStats:
+        stats = self._tools.get(name)
+        if stats is None:
+            with self._lock:
+                stats = self._tools.setdefault(name, ToolStats())
+        return stats
+
+    def in_flight(self) -> int:
+        return sum(s.in_flight for s in list(self._tools.values()))
+
+    def totals(self) -> Dict[str, int]:
+        """Finished calls and errors across all tools (monotonic counters)."""
+        tools = list(self._tools.values())
+        return {"calls": sum(s.wall_us.count for s in tools), "errors": sum(s.errors.value for s in tools)}
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"tools": {name: s.snapshot() for name, s in sorted(self._tools.items())}}
+
+
+REGISTRY = MetricsRegistry()
+
+
+class _Call:
+    __slots__ = ("stats", "tool", "telemetry", "start", "acc", "token")
+
+    def __init__(self, stats: ToolStats, tool: str, telemetry, kwargs: Dict[str, Any]):
+        self.stats = stats
+        self.tool = tool
+        self.telemetry = telemetry
+        stats.started.add()
+        stats.request_bytes.record(_payload_size(kwargs))
+        self.acc = [0]
+        self.token = _upstream_us.set(self.acc)
+        self.start = time.perf_counter()
+
+    def _close(self) -> None:
+        self.stats.wall_us.record((time.perf_counter() - self.start) * 1e6)
+        self.stats.upstream_us.record(self.acc[0])
+        try:
+            _upstream_us.reset(self.token)
+        except ValueError:
+            # finished in a different context (e.g. offloaded to a thread)
+            pass
+
+    def done(self, result: Any) -> None:
+        self.stats.response_bytes.record(_payload_size(result))
+        self._close()
+
+    def fail(self, exc: BaseException) -> None:
+        self.stats.errors.add()
+        self._close()
+        if self.telemetry is not None:
+            try:
+                self.telemetry.track("tool.invocation.error", {"tool": self.tool, "error": type(exc).__name__})
+            except Exception:
+                pass
+
+
+def instrument(name: Optional[str] = None, registry: Optional[MetricsRegistry] = None, telemetry=None) -> Callable:
+    """Record wall time, upstream HTTP time and payload sizes for a tool.
+
+    Apply beneath `@mcp.tool()`; the wrapper keeps the signature (via
+    `functools.wraps`) and the sync/async nature of the wrapped function.
+    Only failures are sent to telemetry per call; everything else is
+    aggregated and shipped by `MetricsReporter`. While a `debug_profile`
+    capture runs, matching calls are profiled (see `integrations.profiling`).
+    """
+    def decorate(fn: Callable) -> Callable:
+        tool = name or fn.__name__
+        reg = registry or REGISTRY
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                call = _Call(reg.tool(tool), tool, telemetry, kwargs)
+                capture = PROFILER.begin(tool, fn) if PROFILER.active else None
+                try:
+                    result = await fn(*args, **kwargs)
+                except BaseException as exc:
+                    call.fail(exc)
+                    raise
+                finally:
+                    if capture is not None:
+                        PROFILER.end(capture)
+                call.done(result)
+                return result
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            call = _Call(reg.tool(tool), tool, telemetry, kwargs)
+            capture = PROFILER.begin(tool, fn) if PROFILER.active else None
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as exc:
+                call.fail(exc)
+                raise
+            finally:
+                if capture is not None:
+                    PROFILER.end(capture)
+            call.done(result)
+            return result
+        return wrapper
+
+    return decorate
+
+
+class MetricsReporter:
+    """Ships `registry.snapshot()` as a `metrics.summary` telemetry event every `interval` seconds."""
+
+    def __init__(self, telemetry, registry: Optional[MetricsRegistry] = None, interval: float = 60.0):
+        self.telemetry = telemetry
+        self.registry = registry or REGISTRY
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "MetricsReporter":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="metrics-reporter", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.report()
+
+    def report(self) -> None:
+        snap = self.registry.snapshot()
+        if not snap["tools"]:
+            return
+        try:
+            self.telemetry.track("metrics.summary", snap)
+        except Exception:
+            pass
+
+    def stop(self) -> None:
+        self._stop.set()
+        self.report()
+
+
+__all__ = [
+    "LogHistogram",
+    "ShardedCounter",
+    "ToolStats",
+    "MetricsRegistry",
+    "MetricsReporter",
+    "REGISTRY",
+    "instrument",
+    "upstream_timer",
+]
@@ -0,0 +1,48 @@
+import os
+import asyncio
+import functools
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from integrations.profiling import PROFILER
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def executor() -> ThreadPoolExecutor:
+    """Shared, bounded pool for sync work that must not run on the server loop."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = int(os.getenv("MCP_OFFLOAD_WORKERS", "0")) or min(32, (os.cpu_count() or 1) + 4)
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mcp-offload")
+        return _executor
+
+
+async def run_sync(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking callable on the offload pool, keeping the caller's contextvars."""
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    if PROFILER.active:
+        # a trace capture of the calling tool follows it onto the pool thread
+        fn = PROFILER.bind(fn)
+    return await loop.run_in_executor(executor(), functools.partial(ctx.run, fn, *args, **kwargs))
+
+
+def offload(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Turn a blocking tool into an async one that runs on the offload pool.
+
+    Use for CPU-bound or legacy sync tools so they don't stall the FastMCP
+    event loop; stack it beneath `@instrument` / `@mcp.tool()`.
+    """
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        return await run_sync(fn, *args, **kwargs)
+    return wrapper
+
+
+__all__ = ["executor", "run_sync", "offload"]
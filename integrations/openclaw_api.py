@@ -1,6 +1,9 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict, List, Optional
+import codecs
+import json
 import uvicorn
 
 app = FastAPI(title="OpenClaw Mock API")
@@ -9,12 +12,10 @@ class AnalyzeRequest(BaseModel):
     text: str
     meta: Dict[str, Any] = {}
 
-@app.get("/health")
-def health():
-    return {"status": "ok"}
+class AnalyzeBatchRequest(BaseModel):
+    items: List[AnalyzeRequest]
 
-@app.post("/analyze")
-def analyze(req: AnalyzeRequest):
+def _analyze(req: AnalyzeRequest) -> Dict[str, Any]:
     text = req.text or ""
     tokens = len(text.split())
     return {
@@ -28,5 +29,137 @@ def analyze(req: AnalyzeRequest):
         }
     }
 
+class _StreamAnalyzer:
+    """Running `_analyze` counts over text that arrives in pieces.
+
+    Only counters and the first 200 characters are kept, so memory stays flat
+    however long the text is. A word split across two pieces counts once.
+    """
+
+    def __init__(self):
+        self.meta: Dict[str, Any] = {}
+        self.chunks = 0
+        self.length = 0
+        self.tokens = 0
+        self.head = ""
+        self._in_word = False
+
+    def feed(self, text: str) -> Optional[Dict[str, Any]]:
+        if not text:
+            return None
+        words = len(text.split())
+        if words and self._in_word and not text[0].isspace():
+            words -= 1    # continues the word the previous piece ended in
+        self._in_word = not text[-1].isspace()
+        self.chunks += 1
+        self.length += len(text)
+        self.tokens += words
+        if len(self.head) < 200:
+            self.head += text[:200 - len(self.head)]
+        return {
+            "chunk": self.chunks - 1,
+            "chunk_length": len(text),
+            "chunk_words": words,
+            "tokens": self.tokens,
+            "length": self.length,
+        }
+
+    def result(self) -> Dict[str, Any]:
+        return {
+            "done": True,
+            "input": {"meta": self.meta, "length": self.length},
+            "summary": self.head,
+            "tokens": self.tokens,
+            "chunks": self.chunks,
+            "insights": {
+                "length": self.length,
+                "word_count": self.tokens,
+                "mock_label": "mock_insight"
+            }
+        }
+
+class _DuplexStreamingResponse(StreamingResponse):
+    # the body generator reads the request stream itself; Starlette's default
+    # disconnect listener would compete with it for `receive` messages
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+
+# one NDJSON line (one uploaded chunk) may not exceed this
+_MAX_STREAM_LINE = 1 << 20
+
+def _feed_line(state: _StreamAnalyzer, line: bytes) -> Optional[Dict[str, Any]]:
+    if not line.strip():
+        return None
+    item = json.loads(line)
+    if not isinstance(item, dict):
+        raise ValueError("each line must be a JSON object")
+    state.meta.update(item.get("meta") or {})
+    return state.feed(item.get("text") or "")
+
+async def _stream_analyze(request: Request) -> AsyncIterator[Dict[str, Any]]:
+    # NDJSON upload ({"meta": {...}} / {"text": "..."} per line), or a raw text/plain body
+    state = _StreamAnalyzer()
+    ndjson = "ndjson" in request.headers.get("content-type", "")
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending = b""
+    async for body in request.stream():
+        if ndjson:
+            pending += body
+            *lines, pending = pending.split(b"\n")
+            if len(pending) > _MAX_STREAM_LINE:
+                raise ValueError(f"line longer than {_MAX_STREAM_LINE} bytes")
+            partials = [_feed_line(state, line) for line in lines]
+        else:
+            partials = [state.feed(decoder.decode(body))]
+        for partial in partials:
+            if partial:
+                yield partial
+    partial = _feed_line(state, pending) if ndjson else state.feed(decoder.decode(b"", final=True))
+    if partial:
+        yield partial
+    yield state.result()
+
+# last status published by each instance (see specs/openclaw_integration.md)
+_STATUS: Dict[str, Dict[str, Any]] = {}
+
+@app.get("/health")
+def health():
+    return {"status": "ok"}
+
+@app.post("/analyze")
+def analyze(req: AnalyzeRequest):
+    return _analyze(req)
+
+@app.post("/analyze/batch")
+def analyze_batch(req: AnalyzeBatchRequest):
+    return {"results": [_analyze(item) for item in req.items], "count": len(req.items)}
+
+@app.post("/analyze/stream")
+async def analyze_stream(request: Request):
+    sse = "text/event-stream" in request.headers.get("accept", "")
+
+    async def body():
+        try:
+            async for item in _stream_analyze(request):
+                line = json.dumps(item, separators=(",", ":"))
+                yield f"data: {line}\n\n" if sse else line + "\n"
+        except ValueError as exc:
+            error = json.dumps({"error": "invalid request stream", "detail": str(exc)})
+            yield f"event: error\ndata: {error}\n\n" if sse else error + "\n"
+
+    return _DuplexStreamingResponse(body(), media_type="text/event-stream" if sse else "application/x-ndjson")
+
+@app.post("/openclaw/status")
+def publish_status(payload: Dict[str, Any]):
+    instance_id = payload.get("instance_id")
+    if not instance_id:
+        raise HTTPException(status_code=422, detail="instance_id is required")
+    _STATUS[instance_id] = payload
+    return {"accepted": True, "instance_id": instance_id}
+
+@app.get("/openclaw/status")
+def list_status():
+    return {"instances": list(_STATUS.values()), "count": len(_STATUS)}
+
 if __name__ == "__main__":
-    uvicorn.run(app, host="127.0.0.1", port=9000)
\ No newline at end of file
+    uvicorn.run(app, host="127.0.0.1", port=9000)
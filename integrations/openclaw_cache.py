@@ -0,0 +1,293 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from integrations.offload import run_sync
+
+
+_MISSING = object()
+
+
+class _Flight:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class ResponseCache:
+    """TTL + LRU cache for idempotent OpenClaw responses.
+
+    - Keys are a SHA-256 over the canonical JSON of `(endpoint, payload)`.
+    - The memory tier holds at most `max_entries`, evicting least recently used.
+    - With `disk_dir`, entries are also written as JSON files and promoted back
+      into memory on a later miss (survives restarts). The disk tier keeps at
+      most `max_disk_entries` files and `max_disk_bytes`, evicting least
+      recently used; async callers do its file I/O on the offload pool.
+    - Concurrent identical misses are coalesced (singleflight): one caller hits
+      upstream, the rest wait for its result. Works for threads and coroutines;
+      for coroutines the upstream call runs as its own task, so cancelling
+      any one waiter (the one that started it included) leaves the others be.
+    - Cached values are shared between callers; treat them as read-only.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 300.0,
+        max_entries: int = 1024,
+        disk_dir: Optional[str] = None,
+        max_disk_entries: int = 10000,
+        max_disk_bytes: int = 256 * 1024 * 1024,
+    ):
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self.disk_dir = disk_dir
+        self.max_disk_entries = max(1, max_disk_entries)
+        self.max_disk_bytes = max(1, max_disk_bytes)
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+        self._aflights: Dict[Tuple[int, str], "asyncio.Task"] = {}
+        # disk files by key -> size, least recently used first; read from disk_dir on first use
+        self._disk: Optional["OrderedDict[str, int]"] = None
+        self._disk_bytes = 0
+        self._disk_lock = threading.Lock()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "coalesced": 0, "evictions": 0, "disk_evictions": 0}
+
+    @classmethod
+    def from_config(cls, cfg: Dict[str, Any]) -> Optional["ResponseCache"]:
+        if not cfg.get("enabled"):
+            return None
+        return cls(
+            ttl=float(cfg.get("ttl_seconds", 300)),
+            max_entries=int(cfg.get("max_entries", 1024)),
+            disk_dir=cfg.get("disk_dir") or None,
+            max_disk_entries=int(cfg.get("disk_max_entries", 10000)),
+            max_disk_bytes=int(cfg.get("disk_max_mb", 256) * 1024 * 1024),
+        )
+
+    @staticmethod
+    def key(endpoint: str, payload: Any) -> str:
+        canonical = json.dumps(
+            {"endpoint": "/" + endpoint.strip("/"), "payload": payload},
+            sort_keys=True,
+            separators=(",", ":"),
+            default=str,
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            out = dict(self._stats)
+            out["entries"] = len(self._entries)
+        if self._disk is not None:
+            with self._disk_lock:
+                out["disk_entries"] = len(self._disk)
+                out["disk_bytes"] = self._disk_bytes
+        return out
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self._stats[key] += n
+
+    # -- tiers ----------------------------------------------------------
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], key + ".json")
+
+    def get(self, key: str) -> Any:
+        """Return the cached value or `_MISSING`; does not touch the counters."""
+        value = self._get_memory(key)
+        if value is _MISSING and self.disk_dir:
+            value = self._get_disk(key)
+        return value
+
+    async def get_async(self, key: str) -> Any:
+        """`get()` that reads the disk tier on the offload pool."""
+        value = self._get_memory(key)
+        if value is _MISSING and self.disk_dir:
+            value = await run_sync(self._get_disk, key)
+        return value
+
+    def _get_memory(self, key: str) -> Any:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    return entry[1]
+                del self._entries[key]
+        return _MISSING
+
+    def _get_disk(self, key: str) -> Any:
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return _MISSING
+        if stored.get("expires", 0) <= time.time():
+            self._forget_disk(key)
+            return _MISSING
+        with self._disk_lock:
+            if self._disk is not None and key in self._disk:
+                self._disk.move_to_end(key)
+        self._remember(key, stored["value"], stored["expires"])
+        self._count("disk_hits")
+        return stored["value"]
+
+    def _remember(self, key: str, value: Any, expires: float) -> None:
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def put(self, key: str, value: Any) -> None:
+        expires = time.time() + self.ttl
+        self._remember(key, value, expires)
+        if self.disk_dir:
+            self._put_disk(key, value, expires)
+
+    async def put_async(self, key: str, value: Any) -> None:
+        """`put()` that writes the disk tier on the offload pool."""
+        expires = time.time() + self.ttl
+        self._remember(key, value, expires)
+        if self.disk_dir:
+            await run_sync(self._put_disk, key, value, expires)
+
+    def _disk_index(self) -> "OrderedDict[str, int]":
+        """Files already in `disk_dir`, oldest first; call with `_disk_lock` held."""
+        if self._disk is None:
+            files = []
+            for root, _, names in os.walk(self.disk_dir):
+                for name in names:
+                    if not name.endswith(".json"):
+                        continue
+                    try:
+                        st = os.stat(os.path.join(root, name))
+                    except OSError:
+                        continue
+                    files.append((st.st_mtime, name[:-len(".json")], st.st_size))
+            files.sort()
+            self._disk = OrderedDict((key, size) for _, key, size in files)
+            self._disk_bytes = sum(self._disk.values())
+        return self._disk
+
+    def _put_disk(self, key: str, value: Any, expires: float) -> None:
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"expires": expires, "value": value}, f, default=str)
+            size = os.path.getsize(tmp)
+            os.replace(tmp, path)
+        except (OSError, TypeError, ValueError):
+            return
+        evicted = []
+        with self._disk_lock:
+            index = self._disk_index()
+            self._disk_bytes += size - index.pop(key, 0)
+            index[key] = size
+            while len(index) > 1 and (len(index) > self.max_disk_entries or self._disk_bytes > self.max_disk_bytes):
+                old, old_size = index.popitem(last=False)
+                self._disk_bytes -= old_size
+                evicted.append(old)
+        for old in evicted:
+            try:
+                os.remove(self._disk_path(old))
+            except OSError:
+                pass
+        if evicted:
+            self._count("disk_evictions", len(evicted))
+
+    def _forget_disk(self, key: str) -> None:
+        try:
+            os.remove(self._disk_path(key))
+        except OSError:
+            pass
+        with self._disk_lock:
+            if self._disk is not None:
+                self._disk_bytes -= self._disk.pop(key, 0)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    # -- singleflight ---------------------------------------------------
+
+    def get_or_call(self, key: str, fn: Callable[[], Any]) -> Any:
+        value = self.get(key)
+        if value is not _MISSING:
+            self._count("hits")
+            return value
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self._stats["misses"] += 1
+            else:
+                self._stats["coalesced"] += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        try:
+            flight.value = fn()
+            self.put(key, flight.value)
+            return flight.value
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    async def get_or_call_async(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        value = await self.get_async(key)
+        if value is not _MISSING:
+            self._count("hits")
+            return value
+        loop = asyncio.get_running_loop()
+        fkey = (id(loop), key)
+        with self._lock:
+            task = self._aflights.get(fkey)
+            if task is None:
+                task = self._aflights[fkey] = loop.create_task(self._fill(fkey, fn))
+                task.add_done_callback(_observe)
+                self._stats["misses"] += 1
+            else:
+                self._stats["coalesced"] += 1
+        # shield: a cancelled waiter must not cancel the shared call
+        return await asyncio.shield(task)
+
+    async def _fill(self, fkey: Tuple[int, str], fn: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await fn()
+            await self.put_async(fkey[1], value)
+            return value
+        finally:
+            with self._lock:
+                self._aflights.pop(fkey, None)
+
+
+def _observe(task: "asyncio.Task") -> None:
+    # mark the error retrieved so a call whose waiters all left doesn't log a warning
+    if not task.cancelled():
+        task.exception()
+
+
+__all__ = ["ResponseCache"]
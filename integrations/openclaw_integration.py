@@ -1,16 +1,114 @@
-from typing import Optional, Any, Dict
+from typing import Optional, Any, AsyncIterable, AsyncIterator, Callable, Dict, Iterable, List, Tuple, Union
 import os
 import json
+import time
+import asyncio
+import threading
 import httpx
 
+from integrations.config import openclaw_config, section
+from integrations.metrics import instrument, upstream_timer
+from integrations.openclaw_cache import ResponseCache
+from integrations.rate_limit import RateLimiter
+from integrations.resilience import CircuitBreaker, RetryPolicy, expires_at, remaining
+
+# methods whose responses may be served from the cache
+_IDEMPOTENT_METHODS = {"GET", "HEAD"}
+
+
+def _error_info(exc: Exception) -> Dict[str, Any]:
+    info: Dict[str, Any] = {"type": type(exc).__name__, "message": str(exc)}
+    if isinstance(exc, httpx.HTTPStatusError):
+        info["status"] = exc.response.status_code
+    return info
+
+
+async def _text_pieces(text: Union[str, Iterable[str], AsyncIterable[str]], size: int) -> AsyncIterator[str]:
+    if isinstance(text, str):
+        text = (text,)
+    if hasattr(text, "__aiter__"):
+        async for part in text:
+            for i in range(0, len(part), size):
+                yield part[i:i + size]
+    else:
+        for part in text:
+            for i in range(0, len(part), size):
+                yield part[i:i + size]
+
+
+async def _ndjson_upload(
+    text: Union[str, Iterable[str], AsyncIterable[str]], meta: Optional[Dict[str, Any]], size: int
+) -> AsyncIterator[bytes]:
+    if meta:
+        yield json.dumps({"meta": meta}, separators=(",", ":")).encode("utf-8") + b"\n"
+    async for piece in _text_pieces(text, size):
+        yield json.dumps({"text": piece}, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def _stream_item(line: str) -> Optional[Dict[str, Any]]:
+    """One NDJSON line, or the payload of an SSE `data:` line; None for blanks and other SSE fields."""
+    line = line.strip()
+    if line.startswith("data:"):
+        line = line[5:].strip()
+    elif not line or line.startswith(("event:", "id:", "retry:", ":")):
+        return None
+    return json.loads(line)
+
+
+def _close_abandoned(client: httpx.AsyncClient) -> None:
+    """Close the pooled sockets of an `AsyncClient` whose event loop is gone.
+
+    `aclose()` needs that loop, so this goes to the connection pool directly;
+    best effort.
+    """
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    for conn in list(getattr(pool, "connections", ())):
+        stream = getattr(getattr(conn, "_connection", None), "_network_stream", None)
+        try:
+            sock = stream.get_extra_info("socket") if stream is not None else None
+            # asyncio hands out a TransportSocket view, which can't be closed itself
+            sock = getattr(sock, "_sock", sock)
+            if sock is not None:
+                sock.close()
+        except Exception:
+            pass
+
+
 class OpenClawClient:
     """
     OpenClaw client:
     - Reads `OPENCLAW_BASE_URL` and `OPENCLAW_API_KEY` from env when not provided.
     - Provides `invoke()` (generic) and `predict()` (convenience) helpers.
-    - Keeps async `analyze_async` for async callers.
+    - Keeps async `analyze_async` for async callers; `analyze_stream` uploads
+      large texts in chunks and yields partial results as they arrive.
+    - Owns long-lived keep-alive connection pools (one sync, one async per event
+      loop) sized from `rate_limits.concurrent_requests` in the OpenClaw config.
+    - Every request passes through a `RateLimiter` (token bucket for
+      `requests_per_minute` plus an in-flight cap shared by sync and async calls).
+    - With a `ResponseCache` (opt-in via `cache:` in the config), `predict`,
+      `analyze`/`analyze_async` and GET/HEAD `invoke` calls are cached and
+      coalesced; other methods always go upstream.
+    - Each endpoint has its own `CircuitBreaker`; failed attempts (transport
+      errors, 429/5xx) are retried per `retry_policy` with jittered backoff.
+      `deadline` (seconds) bounds a whole call, retries included. Breaker
+      transitions are reported as `openclaw.circuit.state` telemetry events.
     """
-    def __init__(self, base_url: Optional[str] = None, api_key: Optional[str] = None, timeout: float = 15.0):
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        timeout: float = 15.0,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: float = 30.0,
+        rate_limiter: Optional[RateLimiter] = None,
+        config: Optional[Dict[str, Any]] = None,
+        transport: Optional[httpx.BaseTransport] = None,
+        async_transport: Optional[httpx.AsyncBaseTransport] = None,
+        cache: Optional[ResponseCache] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        telemetry=None,
+    ):
         self.base_url = (base_url or os.getenv("OPENCLAW_BASE_URL") or "").rstrip("/")
         if not self.base_url:
             raise ValueError("OpenClaw base_url must be provided or set in OPENCLAW_BASE_URL")
@@ -20,55 +118,415 @@ class OpenClawClient:
         if self.api_key:
             self.headers["Authorization"] = f"Bearer {self.api_key}"
 
+        cfg = config if config is not None else openclaw_config()
+        rate_limits = section(cfg, "rate_limits")
+        self.rate_limiter = rate_limiter or RateLimiter.from_config(rate_limits)
+        self.cache = cache if cache is not None else ResponseCache.from_config(section(cfg, "cache"))
+        self.retry_policy = retry_policy or RetryPolicy.from_config(section(cfg, "retry_policy"))
+        self._breaker_config = section(cfg, "circuit_breaker")
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self.telemetry = telemetry
+        pool_size = max_connections or rate_limits.get("concurrent_requests") or 8
+        self.limits = httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=max_keepalive_connections or pool_size,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._transport = transport
+        self._async_transport = async_transport
+        self._lock = threading.Lock()
+        self._client: Optional[httpx.Client] = None
+        self._aclients: Dict[int, Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+
     def _url(self, endpoint: str) -> str:
         return f"{self.base_url}/{endpoint.lstrip('/')}"
 
-    def invoke(self, endpoint: str, payload: Dict[str, Any], method: str = "POST") -> Dict[str, Any]:
+    def _http(self) -> httpx.Client:
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(
+                    timeout=self.timeout, headers=self.headers, limits=self.limits, transport=self._transport
+                )
+            return self._client
+
+    def _ahttp(self) -> httpx.AsyncClient:
+        # httpx async pools are bound to the loop that created them
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            entry = self._aclients.get(id(loop))
+            if entry is not None and entry[0] is loop:
+                return entry[1]
+            # drop pools whose loops are gone (e.g. repeated asyncio.run calls)
+            stale = [c for lp, c in self._aclients.values() if lp.is_closed()]
+            self._aclients = {k: v for k, v in self._aclients.items() if not v[0].is_closed()}
+            if self._async_transport is None:
+                # a caller's transport may still serve live loops; ours only served that one
+                for old in stale:
+                    _close_abandoned(old)
+            client = httpx.AsyncClient(
+                timeout=self.timeout, headers=self.headers, limits=self.limits, transport=self._async_transport
+            )
+            self._aclients[id(loop)] = (loop, client)
+            return client
+
+    def _breaker(self, endpoint: str) -> CircuitBreaker:
+        name = "/" + endpoint.strip("/")
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(name)
+                if breaker is None:
+                    breaker = CircuitBreaker.from_config(name, self._breaker_config, on_state_change=self._on_breaker_change)
+                    self._breakers[name] = breaker
+        return breaker
+
+    def _on_breaker_change(self, name: str, old: str, new: str, info: Dict[str, Any]) -> None:
+        if self.telemetry is not None:
+            self.telemetry.track("openclaw.circuit.state", {"endpoint": name, "from": old, "to": new, **info})
+
+    def _attempt_failed(self, resp: Optional[httpx.Response]) -> bool:
+        # transport errors and retryable statuses (429, 5xx by default) count against
+        # the breaker; other statuses are the caller's fault
+        return resp is None or resp.status_code in self.retry_policy.status_forcelist
+
+    def _request(
+        self, endpoint: str, payload: Dict[str, Any], method: str = "POST", expires: Optional[float] = None
+    ) -> Dict[str, Any]:
+        url = self._url(endpoint)
+        breaker = self._breaker(endpoint)
+        attempt = 0
+        while True:
+            resp, error = None, None
+            with self.rate_limiter.limit():
+                # waiting on our own limiter is not upstream latency: take the
+                # breaker slot and start the clock only once it lets us through
+                timeout = remaining(expires, self.timeout)
+                breaker.before_call()
+                start = time.monotonic()
+                try:
+                    with upstream_timer():
+                        resp = self._http().request(method, url, json=payload, timeout=timeout)
+                except httpx.TransportError as exc:
+                    error = exc
+                except BaseException:
+                    # abandoned (cancelled, deadline, ...), not failed: free the slot
+                    breaker.release()
+                    raise
+                breaker.record(not self._attempt_failed(resp), time.monotonic() - start)
+            if resp is not None and resp.status_code not in self.retry_policy.status_forcelist:
+                resp.raise_for_status()
+                return resp.json()
+            delay = self._next_delay(attempt, expires)
+            if delay is None:
+                if resp is not None:
+                    resp.raise_for_status()
+                raise error
+            time.sleep(delay)
+            attempt += 1
+
+    async def _request_async(
+        self, endpoint: str, payload: Dict[str, Any], method: str = "POST", expires: Optional[float] = None
+    ) -> Dict[str, Any]:
         url = self._url(endpoint)
-        with httpx.Client(timeout=self.timeout, headers=self.headers) as client:
-            resp = client.request(method, url, json=payload)
-            resp.raise_for_status()
-            return resp.json()
+        breaker = self._breaker(endpoint)
+        attempt = 0
+        while True:
+            resp, error = None, None
+            async with self.rate_limiter.limit_async():
+                # waiting on our own limiter is not upstream latency: take the
+                # breaker slot and start the clock only once it lets us through
+                timeout = remaining(expires, self.timeout)
+                breaker.before_call()
+                start = time.monotonic()
+                try:
+                    with upstream_timer():
+                        resp = await self._ahttp().request(method, url, json=payload, timeout=timeout)
+                except httpx.TransportError as exc:
+                    error = exc
+                except BaseException:
+                    # abandoned (cancelled, deadline, ...), not failed: free the slot
+                    breaker.release()
+                    raise
+                breaker.record(not self._attempt_failed(resp), time.monotonic() - start)
+            if resp is not None and resp.status_code not in self.retry_policy.status_forcelist:
+                resp.raise_for_status()
+                return resp.json()
+            delay = self._next_delay(attempt, expires)
+            if delay is None:
+                if resp is not None:
+                    resp.raise_for_status()
+                raise error
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _next_delay(self, attempt: int, expires: Optional[float]) -> Optional[float]:
+        """Jittered backoff before the next attempt, or None when out of retries or time."""
+        if attempt >= self.retry_policy.max_retries:
+            return None
+        delay = self.retry_policy.backoff(attempt)
+        if expires is not None and time.monotonic() + delay >= expires:
+            return None
+        return delay
+
+    def _cached(
+        self, endpoint: str, payload: Dict[str, Any], method: str = "POST", expires: Optional[float] = None
+    ) -> Dict[str, Any]:
+        if self.cache is None:
+            return self._request(endpoint, payload, method, expires)
+        key = ResponseCache.key(f"{method} {endpoint}", payload)
+        return self.cache.get_or_call(key, lambda: self._request(endpoint, payload, method, expires))
+
+    async def _cached_async(
+        self, endpoint: str, payload: Dict[str, Any], method: str = "POST", expires: Optional[float] = None
+    ) -> Dict[str, Any]:
+        if self.cache is None:
+            return await self._request_async(endpoint, payload, method, expires)
+        key = ResponseCache.key(f"{method} {endpoint}", payload)
+        return await self.cache.get_or_call_async(key, lambda: self._request_async(endpoint, payload, method, expires))
 
-    def predict(self, payload: Dict[str, Any], endpoint: str = "/predict") -> Dict[str, Any]:
-        return self.invoke(endpoint, payload)
+    def invoke(
+        self, endpoint: str, payload: Dict[str, Any], method: str = "POST", deadline: Optional[float] = None
+    ) -> Dict[str, Any]:
+        method = method.upper()
+        if method in _IDEMPOTENT_METHODS:
+            return self._cached(endpoint, payload, method, expires_at(deadline))
+        return self._request(endpoint, payload, method, expires_at(deadline))
 
-    def analyze(self, endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
-        return self.invoke(endpoint, payload)
+    async def invoke_async(
+        self, endpoint: str, payload: Dict[str, Any], method: str = "POST", deadline: Optional[float] = None
+    ) -> Dict[str, Any]:
+        return await self._invoke_async(endpoint, payload, method, expires_at(deadline))
 
-    async def analyze_async(self, endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    async def _invoke_async(
+        self, endpoint: str, payload: Dict[str, Any], method: str, expires: Optional[float]
+    ) -> Dict[str, Any]:
+        method = method.upper()
+        if method in _IDEMPOTENT_METHODS:
+            return await self._cached_async(endpoint, payload, method, expires)
+        return await self._request_async(endpoint, payload, method, expires)
+
+    async def invoke_many_async(
+        self,
+        endpoint: str,
+        payloads: List[Dict[str, Any]],
+        method: str = "POST",
+        concurrency: Optional[int] = None,
+        deadline: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """Invoke `endpoint` once per payload concurrently; results keep input order.
+
+        Each item is `{"ok": True, "result": ...}` or `{"ok": False, "error": {...}}`,
+        so one failure never sinks the batch. Fan-out is bounded by the client's
+        rate limiter and, if given, `concurrency`. `deadline` covers the whole batch.
+        """
+        gate = asyncio.Semaphore(concurrency) if concurrency else None
+        expires = expires_at(deadline)
+
+        async def one(payload: Dict[str, Any]) -> Dict[str, Any]:
+            try:
+                if gate is None:
+                    result = await self._invoke_async(endpoint, payload, method, expires)
+                else:
+                    async with gate:
+                        result = await self._invoke_async(endpoint, payload, method, expires)
+                return {"ok": True, "result": result}
+            except Exception as exc:
+                return {"ok": False, "error": _error_info(exc)}
+
+        return list(await asyncio.gather(*(one(p) for p in payloads)))
+
+    def invoke_many(
+        self,
+        endpoint: str,
+        payloads: List[Dict[str, Any]],
+        method: str = "POST",
+        concurrency: Optional[int] = None,
+        deadline: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """Blocking wrapper around `invoke_many_async` for code without an event loop."""
+        async def run() -> List[Dict[str, Any]]:
+            try:
+                return await self.invoke_many_async(
+                    endpoint, payloads, method=method, concurrency=concurrency, deadline=deadline
+                )
+            finally:
+                # the loop ends with this call: close the pool made for it
+                await self.aclose()
+
+        return asyncio.run(run())
+
+    def predict(
+        self, payload: Dict[str, Any], endpoint: str = "/predict", deadline: Optional[float] = None
+    ) -> Dict[str, Any]:
+        return self._cached(endpoint, payload, expires=expires_at(deadline))
+
+    async def predict_async(
+        self, payload: Dict[str, Any], endpoint: str = "/predict", deadline: Optional[float] = None
+    ) -> Dict[str, Any]:
+        return await self._cached_async(endpoint, payload, expires=expires_at(deadline))
+
+    def analyze(self, endpoint: str, payload: Dict[str, Any], deadline: Optional[float] = None) -> Dict[str, Any]:
+        return self._cached(endpoint, payload, expires=expires_at(deadline))
+
+    async def analyze_async(
+        self, endpoint: str, payload: Dict[str, Any], deadline: Optional[float] = None
+    ) -> Dict[str, Any]:
+        return await self._cached_async(endpoint, payload, expires=expires_at(deadline))
+
+    async def analyze_stream(
+        self,
+        text: Union[str, Iterable[str], AsyncIterable[str]],
+        endpoint: str = "/analyze/stream",
+        meta: Optional[Dict[str, Any]] = None,
+        chunk_size: int = 64 * 1024,
+        deadline: Optional[float] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Upload `text` in chunks and yield results as the server produces them.
+
+        `text` may be a string or an (async) iterable of pieces, so a transcript
+        never has to be joined in memory; it goes up as chunked NDJSON of at most
+        `chunk_size` characters per line. Yields per-chunk partials (`chunk`,
+        running `tokens`, ...) and finally the full result with `done: True`.
+        Streams are not cached or retried; they hold one rate-limiter slot
+        throughout and count against the endpoint's breaker.
+        """
         url = self._url(endpoint)
-        async with httpx.AsyncClient(timeout=self.timeout, headers=self.headers) as client:
-            resp = await client.post(url, json=payload)
-            resp.raise_for_status()
-            return resp.json()
+        breaker = self._breaker(endpoint)
+        expires = expires_at(deadline)
+        breaker.before_call()
+        start = time.monotonic()
+        ok = False
+        try:
+            async with self.rate_limiter.limit_async():
+                with upstream_timer():
+                    request = self._ahttp().stream(
+                        "POST",
+                        url,
+                        content=_ndjson_upload(text, meta, chunk_size),
+                        headers={"Content-Type": "application/x-ndjson", "Accept": "application/x-ndjson"},
+                        timeout=remaining(expires, self.timeout),
+                    )
+                    async with request as resp:
+                        if resp.status_code >= 400:
+                            await resp.aread()
+                            ok = not self._attempt_failed(resp)
+                            resp.raise_for_status()
+                        async for line in resp.aiter_lines():
+                            item = _stream_item(line)
+                            if item is None:
+                                continue
+                            if "error" in item and not item.get("done"):
+                                ok = True    # the server is fine; the upload was rejected
+                                raise ValueError(f"{endpoint}: {item['error']}: {item.get('detail', '')}")
+                            yield item
+                            remaining(expires, self.timeout)
+                        ok = True
+        except GeneratorExit:
+            ok = True    # the caller stopped reading early
+            raise
+        finally:
+            breaker.record(ok, time.monotonic() - start)
+
+    def publish_status(self, payload: Dict[str, Any], deadline: Optional[float] = 5.0) -> Dict[str, Any]:
+        """POST an availability/heartbeat payload (see specs/openclaw_integration.md)."""
+        return self._request("/openclaw/status", payload, "POST", expires_at(deadline))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rate_limit": self.rate_limiter.stats(),
+            "cache": self.cache.stats() if self.cache is not None else None,
+            "circuits": {name: b.snapshot() for name, b in sorted(self._breakers.items())},
+        }
 
     def health(self) -> bool:
         try:
-            with httpx.Client(timeout=5.0, headers=self.headers) as client:
-                r = client.get(f"{self.base_url}/health")
-                return r.status_code == 200
+            with self.rate_limiter.limit(), upstream_timer():
+                r = self._http().get(f"{self.base_url}/health", timeout=5.0)
+            return r.status_code == 200
         except Exception:
             return False
 
+    async def health_async(self) -> bool:
+        try:
+            async with self.rate_limiter.limit_async():
+                with upstream_timer():
+                    r = await self._ahttp().get(f"{self.base_url}/health", timeout=5.0)
+            return r.status_code == 200
+        except Exception:
+            return False
+
+    def close(self) -> None:
+        with self._lock:
+            client, self._client = self._client, None
+            self._aclients.clear()
+        if client is not None:
+            client.close()
+
+    async def aclose(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            entry = self._aclients.pop(id(loop), None)
+        if entry is not None and entry[0] is loop:
+            await entry[1].aclose()
+
+    def __enter__(self) -> "OpenClawClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def register_openclaw_tools(mcp, client: Union[OpenClawClient, Callable[[], OpenClawClient]], telemetry=None):
+    # I/O-bound tools are async so a slow upstream call never blocks the
+    # FastMCP event loop; blocking work belongs behind `integrations.offload`.
+    # `client` may be a factory, so the server can start without OpenClaw
+    # configured and only builds the client on the first tool call.
+    get = client if callable(client) else (lambda: client)
+
+    @mcp.tool()
+    @instrument(telemetry=telemetry)
+    async def openclaw_invoke(
+        endpoint: str, payload: dict, method: str = "POST", timeout_seconds: Optional[float] = None
+    ) -> dict:
+        return await get().invoke_async(endpoint, payload, method=method, deadline=timeout_seconds)
+
+    @mcp.tool()
+    @instrument(telemetry=telemetry)
+    async def openclaw_predict(
+        payload: dict, endpoint: str = "/predict", timeout_seconds: Optional[float] = None
+    ) -> dict:
+        return await get().predict_async(payload, endpoint=endpoint, deadline=timeout_seconds)
 
-def register_openclaw_tools(mcp, client: OpenClawClient):
     @mcp.tool()
-    def openclaw_invoke(endpoint: str, payload: dict, method: str = "POST") -> dict:
-        return client.invoke(endpoint, payload, method=method)
+    @instrument(telemetry=telemetry)
+    async def openclaw_health() -> bool:
+        return await get().health_async()
 
     @mcp.tool()
-    def openclaw_predict(payload: dict, endpoint: str = "/predict") -> dict:
-        return client.predict(payload, endpoint=endpoint)
+    @instrument(telemetry=telemetry)
+    async def openclaw_batch_invoke(
+        endpoint: str,
+        payloads: List[dict],
+        method: str = "POST",
+        concurrency: Optional[int] = None,
+        timeout_seconds: Optional[float] = None,
+    ) -> List[dict]:
+        """Invoke `endpoint` for every payload concurrently; per-item `ok`/`error`, in input order."""
+        return await get().invoke_many_async(
+            endpoint, payloads, method=method, concurrency=concurrency, deadline=timeout_seconds
+        )
 
     @mcp.tool()
-    def openclaw_health() -> bool:
-        return client.health()
+    def openclaw_stats() -> dict:
+        """Rate limiter, response cache and circuit breaker state."""
+        return get().stats()
 
     return {
         "openclaw_invoke": openclaw_invoke,
         "openclaw_predict": openclaw_predict,
         "openclaw_health": openclaw_health,
+        "openclaw_batch_invoke": openclaw_batch_invoke,
+        "openclaw_stats": openclaw_stats,
     }
 
 
@@ -0,0 +1,265 @@
+import os
+import time
+import uuid
+import random
+import socket
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Iterable, Optional, Tuple, Union
+
+from integrations.metrics import REGISTRY, MetricsRegistry
+
+
+HEALTHY = "healthy"
+DEGRADED = "degraded"
+DRAINING = "draining"
+OFFLINE = "offline"
+
+SCHEMA_VERSION = "1.0"
+
+
+def _version() -> str:
+    try:
+        from importlib.metadata import version
+        return version("mcp-multi-agent")
+    except Exception:
+        return "0.1.0"
+
+
+def _instance_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+
+class StatusPublisher:
+    """Publishes this node's capacity and health to OpenClaw (specs/openclaw_integration.md).
+
+    - Every `interval` seconds it samples live counters: in-flight tool calls
+      from the metrics registry, `queue_depth()`, and the error rate over the
+      last `error_window` seconds.
+    - `degraded` when that error rate exceeds `error_threshold` (given at least
+      `min_calls` calls) or the queue has exceeded capacity for
+      `saturated_samples` samples in a row; `healthy` otherwise.
+    - Heartbeats are delta-suppressed: one is sent only when capacity, health
+      or capabilities changed, or `heartbeat` seconds passed since the last one.
+    - Failed publishes back off exponentially (jittered, at most `max_backoff`).
+    - `stop()` sends `draining` then `offline`.
+    """
+
+    def __init__(
+        self,
+        client,
+        capabilities: Union[Iterable[str], Callable[[], Iterable[str]], None] = None,
+        max_concurrent: int = 8,
+        queue_depth: Optional[Callable[[], int]] = None,
+        registry: Optional[MetricsRegistry] = None,
+        interval: float = 5.0,
+        heartbeat: float = 30.0,
+        error_threshold: float = 0.2,
+        error_window: float = 300.0,
+        min_calls: int = 10,
+        saturated_samples: int = 3,
+        max_backoff: float = 300.0,
+        service_name: str = "project-chimera",
+        instance_id: Optional[str] = None,
+        telemetry=None,
+    ):
+        self.client = client
+        self._capabilities = capabilities if callable(capabilities) else tuple(capabilities or ())
+        self.max_concurrent = max(1, max_concurrent)
+        self.queue_depth = queue_depth or (lambda: 0)
+        self.registry = registry or REGISTRY
+        self.interval = interval
+        self.heartbeat = heartbeat
+        self.error_threshold = error_threshold
+        self.error_window = error_window
+        self.min_calls = min_calls
+        self.saturated_samples = max(1, saturated_samples)
+        self.max_backoff = max_backoff
+        self.service_name = service_name
+        self.instance_id = instance_id or _instance_id()
+        self.version = _version()
+        self.telemetry = telemetry
+
+        self._started = time.monotonic()
+        self._samples: Deque[Tuple[float, int, int]] = deque()
+        self._saturated = 0
+        self._last_success: Optional[float] = None
+        self._last_sent: Optional[Tuple] = None
+        self._last_sent_at = float("-inf")
+        self._failures = 0
+        self._next_attempt = 0.0
+        self._draining = False
+        self._lock = threading.Lock()
+        self._publish_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"sent": 0, "suppressed": 0, "failed": 0}
+
+    @classmethod
+    def from_config(cls, client, cfg: Dict[str, Any], **kwargs: Any) -> Optional["StatusPublisher"]:
+        """Build from the `status:` section of the OpenClaw config; None unless `enabled`."""
+        if not cfg.get("enabled"):
+            return None
+        keys = {
+            "interval": "interval_seconds",
+            "heartbeat": "heartbeat_seconds",
+            "error_threshold": "error_threshold",
+            "error_window": "error_window_seconds",
+            "max_backoff": "max_backoff_seconds",
+            "service_name": "service_name",
+        }
+        for arg, key in keys.items():
+            if key in cfg and arg not in kwargs:
+                kwargs[arg] = cfg[key]
+        return cls(client, **kwargs)
+
+    # -- sampling -------------------------------------------------------
+
+    def capabilities(self):
+        caps = self._capabilities() if callable(self._capabilities) else self._capabilities
+        return sorted(caps)
+
+    def _error_rate(self, now: float) -> Tuple[Optional[float], int]:
+        totals = self.registry.totals()
+        if self._samples and (totals["calls"] - self._samples[-1][1]) > (totals["errors"] - self._samples[-1][2]):
+            self._last_success = now
+        self._samples.append((now, totals["calls"], totals["errors"]))
+        while len(self._samples) > 1 and self._samples[0][0] < now - self.error_window:
+            self._samples.popleft()
+        _, calls0, errors0 = self._samples[0]
+        calls, errors = totals["calls"] - calls0, totals["errors"] - errors0
+        return (errors / calls if calls else None), calls
+
+    def sample(self) -> Dict[str, Any]:
+        """Current `capacity` and `health` (also advances the rolling windows)."""
+        now = time.monotonic()
+        with self._lock:
+            in_flight = self.registry.in_flight()
+            try:
+                queued = int(self.queue_depth())
+            except Exception:
+                queued = 0
+            rate, calls = self._error_rate(now)
+            self._saturated = self._saturated + 1 if queued > self.max_concurrent else 0
+
+            reasons = []
+            if rate is not None and calls >= self.min_calls and rate > self.error_threshold:
+                reasons.append("error_rate")
+            if self._saturated >= self.saturated_samples:
+                reasons.append("queue_saturated")
+            if self._draining:
+                status = DRAINING
+            else:
+                status = DEGRADED if reasons else HEALTHY
+
+            details: Dict[str, Any] = {"in_flight": in_flight, "error_rate": round(rate, 4) if rate is not None else None}
+            if reasons:
+                details["reasons"] = reasons
+            if self._last_success is not None:
+                details["last_task_success_seconds"] = round(now - self._last_success, 1)
+            available = 0 if self._draining else max(0, self.max_concurrent - in_flight)
+            return {
+                "capacity": {"concurrent_tasks": available, "max_concurrent_tasks": self.max_concurrent,
+                             "queue_length": queued},
+                "health": {"status": status, "details": details},
+            }
+
+    def payload(self, state: Optional[Dict[str, Any]] = None, status: Optional[str] = None) -> Dict[str, Any]:
+        state = state or self.sample()
+        if status is not None:
+            state["health"]["status"] = status
+            if status in (DRAINING, OFFLINE):
+                state["capacity"]["concurrent_tasks"] = 0
+        return {
+            "schema_version": SCHEMA_VERSION,
+            "service_name": self.service_name,
+            "instance_id": self.instance_id,
+            "timestamp": datetime.utcnow().replace(microsecond=0).isoformat() + "Z",
+            "uptime_seconds": int(time.monotonic() - self._started),
+            "version": self.version,
+            "capabilities": self.capabilities(),
+            **state,
+        }
+
+    # -- publishing -----------------------------------------------------
+
+    def _track(self, event_type: str, payload: Dict[str, Any]) -> None:
+        if self.telemetry is not None:
+            try:
+                self.telemetry.track(event_type, payload)
+            except Exception:
+                pass
+
+    @staticmethod
+    def _fingerprint(payload: Dict[str, Any]) -> Tuple:
+        capacity = payload["capacity"]
+        return (
+            payload["health"]["status"],
+            capacity["concurrent_tasks"],
+            capacity["queue_length"],
+            tuple(payload["capabilities"]),
+        )
+
+    def publish(self, force: bool = False, status: Optional[str] = None) -> bool:
+        """Send a heartbeat if something changed (or `force`); returns True when one was sent."""
+        with self._publish_lock:
+            return self._publish(force, status)
+
+    def _publish(self, force: bool, status: Optional[str]) -> bool:
+        now = time.monotonic()
+        if not force and now < self._next_attempt:
+            return False
+        payload = self.payload(status=status)
+        fingerprint = self._fingerprint(payload)
+        if not force and fingerprint == self._last_sent and now - self._last_sent_at < self.heartbeat:
+            self.stats["suppressed"] += 1
+            return False
+        try:
+            self.client.publish_status(payload)
+        except Exception as exc:
+            self._failures += 1
+            self.stats["failed"] += 1
+            delay = min(self.max_backoff, self.interval * 2 ** self._failures)
+            self._next_attempt = now + random.uniform(delay / 2, delay)
+            self._track("openclaw.status.error", {"status": payload["health"]["status"],
+                                                  "error": type(exc).__name__, "message": str(exc),
+                                                  "retry_in": round(self._next_attempt - now, 1)})
+            return False
+        self._failures = 0
+        self._next_attempt = 0.0
+        self._last_sent, self._last_sent_at = fingerprint, now
+        self.stats["sent"] += 1
+        self._track("openclaw.status.published", {"status": payload["health"]["status"], **payload["capacity"]})
+        return True
+
+    def start(self) -> "StatusPublisher":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="openclaw-status", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        self.publish(force=True)
+        while not self._stop.wait(self.interval):
+            try:
+                self.publish()
+            except Exception:
+                pass
+
+    def drain(self) -> None:
+        """Advertise zero capacity from now on (status `draining`)."""
+        self._draining = True
+        self.publish(force=True)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self._draining = True
+        self.publish(force=True, status=DRAINING)
+        self.publish(force=True, status=OFFLINE)
+
+
+__all__ = ["StatusPublisher", "HEALTHY", "DEGRADED", "DRAINING", "OFFLINE", "SCHEMA_VERSION"]
@@ -0,0 +1,469 @@
+import os
+import sys
+import json
+import time
+import uuid
+import inspect
+import functools
+import threading
+from collections import Counter
+from contextvars import ContextVar
+from types import CodeType, FrameType
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from integrations.config import ROOT_DIR
+
+
+DEFAULT_PROFILE_DIR = os.path.join(ROOT_DIR, ".specify", "traces")
+
+SAMPLE = "sample"
+TRACE = "trace"
+MAX_DURATION = 600.0
+DEFAULT_DURATION = 30.0
+# how long a finishing trace capture waits for traced calls still running
+FINISH_GRACE = 2.0
+
+_frame_names: Dict[CodeType, str] = {}
+
+
+def _frame_name(code: CodeType) -> str:
+    name = _frame_names.get(code)
+    if name is None:
+        path = code.co_filename
+        if path.startswith(ROOT_DIR + os.sep):
+            path = os.path.relpath(path, ROOT_DIR)
+        else:
+            path = "/".join(path.replace(os.sep, "/").split("/")[-2:])
+        qualname = getattr(code, "co_qualname", code.co_name)
+        # `;` separates frames in collapsed-stack lines
+        name = f"{qualname} ({path}:{code.co_firstlineno})".replace(";", ":")
+        _frame_names[code] = name
+    return name
+
+
+def _stack(frame: Optional[FrameType], targets: Optional[FrozenSet[CodeType]]) -> Optional[Tuple[str, ...]]:
+    """Root-first frame names; with `targets`, cut to start at the outermost target frame (None if absent)."""
+    codes = []
+    while frame is not None:
+        codes.append(frame.f_code)
+        frame = frame.f_back
+    codes.reverse()
+    if targets is not None:
+        for i, code in enumerate(codes):
+            if code in targets:
+                codes = codes[i:]
+                break
+        else:
+            return None
+    return tuple(_frame_name(c) for c in codes) or None
+
+
+class ProfileSession:
+    """One capture and the stacks aggregated so far (weights: samples, or µs in trace mode)."""
+
+    def __init__(
+        self,
+        mode: str,
+        tool: Optional[str],
+        calls: Optional[int],
+        duration: float,
+        interval: float,
+        session_id: Optional[str],
+    ):
+        self.id = uuid.uuid4().hex[:12]
+        self.mode = mode
+        self.tool = tool
+        self.calls = calls
+        self.duration = duration
+        self.interval = interval
+        self.session_id = session_id
+        self.started_at = time.time()
+        self.deadline = time.monotonic() + duration
+        self.targets: FrozenSet[CodeType] = frozenset()
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started_calls = 0
+        self.invocations = 0
+        self.in_flight = 0
+        self.status = "running"
+        self.reason: Optional[str] = None
+        self.finished_at: Optional[float] = None
+        self.path: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @property
+    def unit(self) -> str:
+        return "us" if self.mode == TRACE else "samples"
+
+    def matches(self, tool: str) -> bool:
+        return self.status == "running" and (self.tool is None or tool == self.tool)
+
+    def merge(self, stacks: Counter, samples: int) -> None:
+        with self._lock:
+            self.stacks.update(stacks)
+            self.samples += samples
+
+    def top(self, n: int = 10) -> List[Dict[str, Any]]:
+        """Frames with the most self weight (the leaf of their stacks)."""
+        with self._lock:
+            stacks = list(self.stacks.items())
+        leaves: Counter = Counter()
+        for stack, weight in stacks:
+            leaves[stack[-1]] += weight
+        total = sum(leaves.values()) or 1
+        return [{"frame": f, "self": round(w, 1), "pct": round(100.0 * w / total, 1)} for f, w in leaves.most_common(n)]
+
+    def collapsed(self) -> List[str]:
+        with self._lock:
+            stacks = self.stacks.most_common()
+        return [f"{';'.join(stack)} {int(round(weight))}" for stack, weight in stacks if weight >= 0.5]
+
+    def summary(self) -> Dict[str, Any]:
+        end = self.finished_at or time.time()
+        return {
+            "id": self.id,
+            "session_id": self.session_id,
+            "status": self.status,
+            "reason": self.reason,
+            "mode": self.mode,
+            "tool": self.tool,
+            "calls": self.calls,
+            "duration_s": self.duration,
+            "interval_ms": round(self.interval * 1000, 3) if self.mode == SAMPLE else None,
+            "started_at": self.started_at,
+            "elapsed_s": round(end - self.started_at, 3),
+            "invocations": self.invocations,
+            "in_flight": self.in_flight,
+            "samples": self.samples,
+            "unit": self.unit,
+            "stacks": len(self.stacks),
+            "path": self.path,
+            "top": self.top(),
+        }
+
+
+class _Tracer:
+    """`sys.setprofile` hook charging the wall time between events to the stack current before it."""
+
+    def __init__(self, session: ProfileSession, prev: Optional[Callable]):
+        self.session = session
+        self.prev = prev
+        # set once the stacks went to the session; the hook then removes itself
+        self.detached = False
+        self.stacks: Counter = Counter()
+        self.events = 0
+        self.stack: Optional[Tuple[str, ...]] = None
+        self.last = time.perf_counter()
+
+    def __call__(self, frame: FrameType, event: str, arg: Any) -> None:
+        if self.detached:
+            sys.setprofile(self.prev)
+            return
+        now = time.perf_counter()
+        if self.stack is not None:
+            self.stacks[self.stack] += (now - self.last) * 1e6
+        if event == "return":
+            frame = frame.f_back
+        stack = _stack(frame, self.session.targets)
+        if stack is not None and event == "c_call":
+            stack += (f"{getattr(arg, '__qualname__', getattr(arg, '__name__', '?'))} (builtin)",)
+        self.stack = stack
+        self.events += 1
+        # leave our own bookkeeping out of the next interval
+        self.last = time.perf_counter()
+
+
+class _Capture:
+    __slots__ = ("session", "traced", "token")
+
+    def __init__(self, session: ProfileSession, traced: bool, token: Any):
+        self.session = session
+        self.traced = traced
+        self.token = token
+
+
+# trace-mode session of the tool call running in this context, for `bind()`
+_tracing: ContextVar[Optional[ProfileSession]] = ContextVar("profile_tracing", default=None)
+
+
+class Profiler:
+    """On-demand capture of where instrumented tool calls spend their time.
+
+    - Off by default: `instrument` reads `active` once per call and does
+      nothing else while no capture runs.
+    - `sample` mode: a thread snapshots every thread's stack each `interval`.
+      With a `tool`, only stacks under that tool's own function count, so
+      time spent awaiting I/O or queued on the loop is not sampled.
+    - `trace` mode: exact wall time per stack from `sys.setprofile` (the
+      hook cProfile is built on) on the threads running the tool, including
+      offload-pool threads (via `bind`). Much slower; meant for a few calls.
+    - A capture ends after `calls` invocations of `tool`, after `duration`
+      seconds, or on `stop()`. Stacks are written to
+      `<out_dir>/profile-<telemetry session>-<id>.collapsed` (flamegraph.pl /
+      speedscope input) with a `.json` summary next to it.
+    - One capture at a time.
+    """
+
+    def __init__(self, out_dir: Optional[str] = None, telemetry=None):
+        self.out_dir = out_dir or os.getenv("MCP_PROFILE_DIR") or DEFAULT_PROFILE_DIR
+        self.telemetry = telemetry
+        self.active = False
+        self._session: Optional[ProfileSession] = None
+        self._last: Optional[ProfileSession] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # thread ident -> [tracer, nesting depth, previous profile function]
+        self._tracers: Dict[int, List[Any]] = {}
+
+    # -- control --------------------------------------------------------
+
+    def start(
+        self,
+        tool: Optional[str] = None,
+        calls: Optional[int] = None,
+        duration: Optional[float] = None,
+        mode: str = SAMPLE,
+        interval: float = 0.005,
+        session_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        if mode not in (SAMPLE, TRACE):
+            raise ValueError(f"mode must be '{SAMPLE}' or '{TRACE}'")
+        if calls is not None and (calls < 1 or not tool):
+            raise ValueError("calls needs a tool name and must be >= 1")
+        if duration is not None and duration <= 0:
+            raise ValueError("duration must be > 0")
+        if duration is None:
+            duration = MAX_DURATION if calls else DEFAULT_DURATION
+        session = ProfileSession(
+            mode, tool, calls, min(duration, MAX_DURATION), max(0.001, interval),
+            session_id or getattr(self.telemetry, "session_id", None),
+        )
+        with self._lock:
+            if self._session is not None:
+                raise ValueError(f"capture {self._session.id} is already running")
+            self._session = session
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, args=(session,), name="mcp-profiler", daemon=True)
+            self._thread.start()
+            self.active = True
+        return session.summary()
+
+    def stop(self, timeout: float = 5.0) -> Dict[str, Any]:
+        """End the running capture now; returns its summary (or the last one)."""
+        with self._lock:
+            session, thread = self._session, self._thread
+        if session is not None:
+            session.reason = session.reason or "stopped"
+            self._stop.set()
+        if thread is not None:
+            thread.join(timeout)
+        return self.status()
+
+    def wait(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        return self.status()
+
+    def status(self) -> Dict[str, Any]:
+        session = self._session or self._last
+        return session.summary() if session is not None else {"status": "idle"}
+
+    def _run(self, session: ProfileSession) -> None:
+        me = threading.get_ident()
+        while not self._stop.is_set():
+            remaining = session.deadline - time.monotonic()
+            if remaining <= 0:
+                session.reason = session.reason or "duration"
+                break
+            if session.mode == SAMPLE:
+                self._sample(session, me)
+                self._stop.wait(min(session.interval, remaining))
+            else:
+                self._stop.wait(min(0.05, remaining))
+        self._finish(session)
+
+    def _sample(self, session: ProfileSession, me: int) -> None:
+        if session.tool is not None and not session.in_flight:
+            return
+        targets = session.targets if session.tool is not None else None
+        stacks: Counter = Counter()
+        for ident, frame in sys._current_frames().items():
+            if ident != me:
+                stack = _stack(frame, targets)
+                if stack is not None:
+                    stacks[stack] += 1
+        session.merge(stacks, 1)
+
+    def _finish(self, session: ProfileSession) -> None:
+        with self._lock:
+            self.active = False
+            session.status = "finishing"    # no new calls join
+        if session.mode == TRACE:
+            # let traced calls still running hand in their stacks; take what
+            # the stragglers have so far once the grace period is over
+            limit = time.monotonic() + FINISH_GRACE
+            while session.in_flight and time.monotonic() < limit:
+                time.sleep(0.005)
+            for entry in list(self._tracers.values()):
+                if entry[0].session is session:
+                    self._detach(entry[0])
+        with self._lock:
+            session.status = "finished"
+            session.finished_at = time.time()
+        try:
+            os.makedirs(self.out_dir, exist_ok=True)
+            base = os.path.join(self.out_dir, f"profile-{session.session_id or 'local'}-{session.id}")
+            with open(base + ".collapsed", "w", encoding="utf-8") as f:
+                f.writelines(line + "\n" for line in session.collapsed())
+            session.path = base + ".collapsed"
+            with open(base + ".json", "w", encoding="utf-8") as f:
+                json.dump(session.summary(), f, indent=2)
+        except OSError as exc:
+            session.reason = f"{session.reason}; not written: {exc}"
+        with self._lock:
+            self._session = None
+            self._last = session
+        if self.telemetry is not None:
+            try:
+                summary = session.summary()
+                summary["top"] = summary["top"][:3]
+                self.telemetry.track("profile.captured", summary)
+            except Exception:
+                pass
+
+    # -- hooks used by `instrument` and `offload` -----------------------
+
+    def begin(self, tool: str, fn: Callable) -> Optional[_Capture]:
+        session = self._session
+        if session is None or not session.matches(tool):
+            return None
+        code = getattr(inspect.unwrap(fn), "__code__", None)
+        with session._lock:
+            if session.calls is not None and session.started_calls >= session.calls:
+                return None
+            session.started_calls += 1
+            session.in_flight += 1
+            if code is not None and code not in session.targets:
+                session.targets = session.targets | {code}
+        if session.mode != TRACE:
+            return _Capture(session, False, None)
+        self._trace_on(session)
+        return _Capture(session, True, _tracing.set(session))
+
+    def end(self, capture: _Capture) -> None:
+        session = capture.session
+        if capture.traced:
+            self._trace_off()
+            try:
+                _tracing.reset(capture.token)
+            except ValueError:
+                pass
+        with session._lock:
+            session.in_flight -= 1
+            session.invocations += 1
+            reached = session.calls is not None and session.invocations >= session.calls
+        if reached:
+            session.reason = session.reason or "calls"
+            self._stop.set()
+
+    def bind(self, fn: Callable) -> Callable:
+        """Wrap work handed to another thread so a trace capture follows it there."""
+        @functools.wraps(fn)
+        def traced(*args, **kwargs):
+            session = _tracing.get()
+            if session is None:
+                return fn(*args, **kwargs)
+            self._trace_on(session)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._trace_off()
+        return traced
+
+    def _trace_on(self, session: ProfileSession) -> None:
+        ident = threading.get_ident()
+        entry = self._tracers.get(ident)
+        if entry is not None:
+            entry[1] += 1
+            return
+        prev = sys.getprofile()
+        tracer = _Tracer(session, prev)
+        self._tracers[ident] = [tracer, 1, prev]
+        sys.setprofile(tracer)
+
+    def _trace_off(self) -> None:
+        ident = threading.get_ident()
+        entry = self._tracers.get(ident)
+        if entry is None:
+            return
+        entry[1] -= 1
+        if entry[1]:
+            return
+        sys.setprofile(entry[2])
+        del self._tracers[ident]
+        self._detach(entry[0])
+
+    @staticmethod
+    def _detach(tracer: _Tracer) -> None:
+        """Merge a tracer's stacks into its session exactly once."""
+        session = tracer.session
+        with session._lock:
+            if tracer.detached:
+                return
+            tracer.detached = True
+            # dict.copy is atomic: the tracer's thread may still be adding to it
+            stacks, events = dict.copy(tracer.stacks), tracer.events
+        session.merge(stacks, events)
+
+
+PROFILER = Profiler()
+
+
+def register_profiling_tools(mcp, profiler: Optional[Profiler] = None, telemetry=None):
+    profiler = profiler or PROFILER
+    if telemetry is not None and profiler.telemetry is None:
+        profiler.telemetry = telemetry
+
+    @mcp.tool()
+    async def debug_profile(
+        action: str = "start",
+        tool: Optional[str] = None,
+        calls: Optional[int] = None,
+        duration_seconds: Optional[float] = None,
+        mode: str = SAMPLE,
+        interval_ms: float = 5.0,
+    ) -> dict:
+        """Profile live tool calls: `start` a capture, check its `status`, or `stop` it early.
+
+        A capture covers the next `calls` invocations of `tool`, or every
+        thread (or just `tool`) for `duration_seconds` (default 30). `mode` is
+        `sample` (low overhead) or `trace` (exact, slow). Collapsed stacks go
+        to `.specify/traces/`, named after the telemetry session id.
+        """
+        # imported here: integrations.offload imports this module
+        from integrations.offload import run_sync
+
+        # start/stop block (thread start, up to FINISH_GRACE for traced calls to
+        # finish); off the loop, so traced async calls can actually finish
+        if action == "start":
+            return await run_sync(profiler.start, tool, calls, duration_seconds, mode, interval_ms / 1000.0)
+        if action == "stop":
+            return await run_sync(profiler.stop)
+        if action == "status":
+            return profiler.status()
+        raise ValueError("action must be 'start', 'stop' or 'status'")
+
+    return {"debug_profile": debug_profile}
+
+
+__all__ = [
+    "DEFAULT_PROFILE_DIR",
+    "SAMPLE",
+    "TRACE",
+    "PROFILER",
+    "ProfileSession",
+    "Profiler",
+    "register_profiling_tools",
+]
@@ -0,0 +1,188 @@
+import time
+import asyncio
+import threading
+from collections import deque
+from contextlib import contextmanager, asynccontextmanager
+from typing import Optional, Dict
+
+
+class TokenBucket:
+    """Token bucket shared by threads and coroutines.
+
+    - Refills at `rate` tokens/second up to `burst`.
+    - Each acquire reserves a token up front (the balance may go negative),
+      so waiters are served in arrival order and never spin.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.burst
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token and return how long the caller must wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            self._tokens -= 1.0
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self) -> float:
+        wait = self.reserve()
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self) -> float:
+        wait = self.reserve()
+        if wait:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class HybridSemaphore:
+    """Counting semaphore whose permits are shared by threads and event loops."""
+
+    def __init__(self, value: int):
+        if value < 1:
+            raise ValueError("value must be >= 1")
+        self._value = value
+        self._lock = threading.Lock()
+        self._waiters: deque = deque()
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        with self._lock:
+            if self._value > 0 and not self._waiters:
+                self._value -= 1
+                return True
+            ev = threading.Event()
+            self._waiters.append(ev)
+        if ev.wait(timeout):
+            return True
+        with self._lock:
+            try:
+                self._waiters.remove(ev)
+                return False
+            except ValueError:
+                # granted between the timeout and taking the lock
+                return True
+
+    async def acquire_async(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._value > 0 and not self._waiters:
+                self._value -= 1
+                return
+            fut = loop.create_future()
+            waiter = (loop, fut)
+            self._waiters.append(waiter)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove(waiter)
+                    removed = True
+                except ValueError:
+                    removed = False
+            if not removed and fut.done() and not fut.cancelled():
+                # permit was handed over just before the cancellation landed
+                self.release()
+            raise
+
+    def _grant(self, fut: "asyncio.Future") -> None:
+        if fut.cancelled():
+            self.release()
+        else:
+            fut.set_result(None)
+
+    def release(self) -> None:
+        with self._lock:
+            if not self._waiters:
+                self._value += 1
+                return
+            waiter = self._waiters.popleft()
+        if isinstance(waiter, threading.Event):
+            waiter.set()
+            return
+        loop, fut = waiter
+        try:
+            loop.call_soon_threadsafe(self._grant, fut)
+        except RuntimeError:
+            # loop already closed; pass the permit on
+            self.release()
+
+
+class RateLimiter:
+    """Requests-per-minute token bucket plus an in-flight cap, for sync and async callers."""
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        concurrent_requests: Optional[int] = None,
+        burst: Optional[float] = None,
+    ):
+        self.bucket = None
+        if requests_per_minute:
+            rate = requests_per_minute / 60.0
+            # let a full wave of concurrent requests through before throttling
+            self.bucket = TokenBucket(rate, burst=burst or max(1.0, rate, float(concurrent_requests or 1)))
+        self.semaphore = HybridSemaphore(concurrent_requests) if concurrent_requests else None
+        self.concurrent_requests = concurrent_requests
+        self._lock = threading.Lock()
+        self._stats = {"acquired": 0, "throttled": 0, "throttled_seconds": 0.0, "in_flight": 0}
+
+    @classmethod
+    def from_config(cls, rate_limits: Dict) -> "RateLimiter":
+        return cls(
+            rate_limits.get("requests_per_minute"),
+            rate_limits.get("concurrent_requests"),
+            burst=rate_limits.get("burst"),
+        )
+
+    def _note(self, waited: float, delta: int) -> None:
+        with self._lock:
+            self._stats["in_flight"] += delta
+            if delta > 0:
+                self._stats["acquired"] += 1
+            if waited:
+                self._stats["throttled"] += 1
+                self._stats["throttled_seconds"] += waited
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._stats)
+
+    @contextmanager
+    def limit(self):
+        waited = self.bucket.acquire() if self.bucket else 0.0
+        if self.semaphore:
+            self.semaphore.acquire()
+        self._note(waited, 1)
+        try:
+            yield
+        finally:
+            self._note(0.0, -1)
+            if self.semaphore:
+                self.semaphore.release()
+
+    @asynccontextmanager
+    async def limit_async(self):
+        waited = await self.bucket.acquire_async() if self.bucket else 0.0
+        if self.semaphore:
+            await self.semaphore.acquire_async()
+        self._note(waited, 1)
+        try:
+            yield
+        finally:
+            self._note(0.0, -1)
+            if self.semaphore:
+                self.semaphore.release()
+
+
+__all__ = ["TokenBucket", "HybridSemaphore", "RateLimiter"]
@@ -0,0 +1,221 @@
+import time
+import random
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, Optional
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling upstream while a breaker is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"circuit for {name} is open; retry in {retry_after:.1f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(TimeoutError):
+    """The caller's time budget ran out before a usable response arrived."""
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker driven by a rolling window.
+
+    - Trips to open once the last `window` seconds hold at least `min_calls`
+      calls and either the error rate reaches `error_threshold` or the share of
+      calls slower than `slow_call_seconds` reaches `slow_call_threshold`.
+    - After `reset_timeout` it goes half-open and admits `half_open_max_calls`
+      probes; a successful probe closes it, a failed one re-opens it.
+    - `on_state_change(name, old, new, info)` is called on every transition.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        error_threshold: float = 0.5,
+        slow_call_threshold: float = 0.8,
+        slow_call_seconds: float = 5.0,
+        window: float = 30.0,
+        min_calls: int = 10,
+        reset_timeout: float = 15.0,
+        half_open_max_calls: int = 1,
+        on_state_change: Optional[Callable[[str, str, str, Dict[str, Any]], None]] = None,
+    ):
+        self.name = name
+        self.error_threshold = error_threshold
+        self.slow_call_threshold = slow_call_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.window = window
+        self.min_calls = max(1, min_calls)
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self.on_state_change = on_state_change
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self._calls: deque = deque()  # (timestamp, failed, slow)
+        self._failed = 0
+        self._slow = 0
+
+    @classmethod
+    def from_config(cls, name: str, cfg: Dict[str, Any], on_state_change=None) -> "CircuitBreaker":
+        keys = ("error_threshold", "slow_call_threshold", "slow_call_seconds", "window", "min_calls",
+                "reset_timeout", "half_open_max_calls")
+        return cls(name, on_state_change=on_state_change, **{k: cfg[k] for k in keys if k in cfg})
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open(time.monotonic())
+            return self._state
+
+    def _prune(self, now: float) -> None:
+        cutoff = now - self.window
+        while self._calls and self._calls[0][0] < cutoff:
+            _, failed, slow = self._calls.popleft()
+            self._failed -= failed
+            self._slow -= slow
+
+    def _maybe_half_open(self, now: float) -> Optional[tuple]:
+        if self._state == OPEN and now - self._opened_at >= self.reset_timeout:
+            return self._transition(HALF_OPEN, now)
+        return None
+
+    def _transition(self, new: str, now: float) -> tuple:
+        old, self._state = self._state, new
+        if new == OPEN:
+            self._opened_at = now
+        if new != HALF_OPEN:
+            self._probes = 0
+        if new == CLOSED:
+            self._calls.clear()
+            self._failed = self._slow = 0
+        n = len(self._calls)
+        info = {
+            "calls": n,
+            "error_rate": round(self._failed / n, 3) if n else 0.0,
+            "slow_rate": round(self._slow / n, 3) if n else 0.0,
+        }
+        return old, new, info
+
+    def _notify(self, change: Optional[tuple]) -> None:
+        if change is None or self.on_state_change is None:
+            return
+        try:
+            self.on_state_change(self.name, *change)
+        except Exception:
+            pass
+
+    def before_call(self) -> None:
+        """Reserve a slot or raise `CircuitOpenError`; pair with `record()` or `release()`."""
+        now = time.monotonic()
+        with self._lock:
+            change = self._maybe_half_open(now)
+            if self._state == OPEN:
+                retry_after = self.reset_timeout - (now - self._opened_at)
+                error = CircuitOpenError(self.name, retry_after)
+            elif self._state == HALF_OPEN and self._probes >= self.half_open_max_calls:
+                error = CircuitOpenError(self.name, 0.0)
+            else:
+                error = None
+                if self._state == HALF_OPEN:
+                    self._probes += 1
+        self._notify(change)
+        if error is not None:
+            raise error
+
+    def release(self) -> None:
+        """Give back a `before_call()` slot without an outcome (the call was abandoned, not failed)."""
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probes = max(0, self._probes - 1)
+
+    def record(self, ok: bool, latency: float) -> None:
+        now = time.monotonic()
+        slow = latency >= self.slow_call_seconds
+        change = None
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probes = max(0, self._probes - 1)
+                change = self._transition(CLOSED if ok and not slow else OPEN, now)
+            elif self._state == CLOSED:
+                self._calls.append((now, int(not ok), int(slow)))
+                self._failed += int(not ok)
+                self._slow += int(slow)
+                self._prune(now)
+                n = len(self._calls)
+                if n >= self.min_calls and (
+                    self._failed / n >= self.error_threshold or self._slow / n >= self.slow_call_threshold
+                ):
+                    change = self._transition(OPEN, now)
+        self._notify(change)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._prune(time.monotonic())
+            n = len(self._calls)
+            return {
+                "state": self._state,
+                "calls": n,
+                "error_rate": round(self._failed / n, 3) if n else 0.0,
+                "slow_rate": round(self._slow / n, 3) if n else 0.0,
+            }
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, per `retry_policy` in the OpenClaw config."""
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        status_forcelist: Iterable[int] = (429, 500, 502, 503, 504),
+        max_backoff: float = 10.0,
+    ):
+        self.max_retries = max(0, int(max_retries))
+        self.backoff_factor = backoff_factor
+        self.status_forcelist = frozenset(int(s) for s in status_forcelist)
+        self.max_backoff = max_backoff
+
+    @classmethod
+    def from_config(cls, cfg: Dict[str, Any]) -> "RetryPolicy":
+        keys = ("max_retries", "backoff_factor", "status_forcelist", "max_backoff")
+        return cls(**{k: cfg[k] for k in keys if k in cfg})
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * (2 ** attempt)))
+
+
+def expires_at(deadline: Optional[float]) -> Optional[float]:
+    """Turn a relative `deadline` in seconds into an absolute monotonic time."""
+    return time.monotonic() + deadline if deadline else None
+
+
+def remaining(expires: Optional[float], cap: float) -> float:
+    """Seconds left before `expires` (at most `cap`); raises once it has passed."""
+    if expires is None:
+        return cap
+    left = expires - time.monotonic()
+    if left <= 0:
+        raise DeadlineExceeded("deadline exceeded")
+    return min(cap, left)
+
+
+__all__ = [
+    "CLOSED",
+    "OPEN",
+    "HALF_OPEN",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "DeadlineExceeded",
+    "RetryPolicy",
+    "expires_at",
+    "remaining",
+]
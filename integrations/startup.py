@@ -0,0 +1,118 @@
+"""Startup-time report for the MCP server.
+
+    python -m integrations.startup [--module main] [--top 15] [--target-ms 120] [--json]
+
+Imports the server module in a fresh interpreter under `-X importtime` and
+prints the slowest imports (cumulative and self time), the time until the
+module is importable ("time to ready") and how much of that is ours rather
+than FastMCP's. Exits 1 when our own overhead is above `--target-ms`.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+from typing import Any, Dict, List, Optional
+
+from integrations.config import ROOT_DIR
+
+
+# Measured on the dev container: FastMCP itself is ~650ms of a ~710ms import of
+# `main`; everything this repo adds on top should stay well under this.
+DEFAULT_TARGET_MS = 120.0
+FRAMEWORK_MODULE = "mcp.server.fastmcp"
+
+
+def parse_importtime(text: str) -> List[Dict[str, Any]]:
+    """Rows of `-X importtime` stderr as `{"module", "self_us", "cumulative_us", "depth"}`."""
+    rows = []
+    for line in text.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue    # the header line
+        name = fields[2].rstrip()
+        stripped = name.lstrip()
+        rows.append({
+            "module": stripped,
+            "self_us": int(fields[0]),
+            "cumulative_us": int(fields[1]),
+            "depth": (len(name) - len(stripped) - 1) // 2,
+        })
+    return rows
+
+
+def _cumulative(rows: List[Dict[str, Any]], module: str) -> int:
+    # a module is reported once, where it was first imported
+    return max((r["cumulative_us"] for r in rows if r["module"] == module), default=0)
+
+
+def measure(module: str = "main", python: Optional[str] = None, env: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [python or sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if proc.returncode != 0:
+        tail = [line for line in proc.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError(f"import {module} failed:\n" + "\n".join(tail[-20:]))
+    rows = parse_importtime(proc.stderr)
+    total_us = _cumulative(rows, module)
+    framework_us = _cumulative(rows, FRAMEWORK_MODULE)
+    return {
+        "module": module,
+        "wall_ms": round(wall_ms, 1),
+        "import_ms": round(total_us / 1000, 1),
+        "framework_ms": round(framework_us / 1000, 1),
+        "overhead_ms": round((total_us - framework_us) / 1000, 1),
+        "modules": rows,
+    }
+
+
+def report(result: Dict[str, Any], top: int = 15) -> str:
+    rows = result["modules"]
+    lines = [
+        f"time to ready: {result['wall_ms']} ms wall (interpreter start + import {result['module']})",
+        f"import {result['module']}: {result['import_ms']} ms, of which {FRAMEWORK_MODULE} "
+        f"{result['framework_ms']} ms and ours {result['overhead_ms']} ms",
+        "",
+        f"top {top} by cumulative time (ms):",
+    ]
+    for r in sorted(rows, key=lambda r: r["cumulative_us"], reverse=True)[:top]:
+        lines.append(f"  {r['cumulative_us'] / 1000:8.1f}  {r['module']}")
+    lines += ["", f"top {top} by self time (ms):"]
+    for r in sorted(rows, key=lambda r: r["self_us"], reverse=True)[:top]:
+        lines.append(f"  {r['self_us'] / 1000:8.1f}  {r['module']}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Report import-time breakdown of the MCP server")
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--target-ms", type=float,
+                        default=float(os.getenv("MCP_STARTUP_TARGET_MS", DEFAULT_TARGET_MS)),
+                        help="fail when import overhead beyond FastMCP exceeds this")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    result = measure(args.module)
+    result["target_ms"] = args.target_ms
+    result["ok"] = result["overhead_ms"] <= args.target_ms
+    if args.json:
+        result["modules"] = sorted(result["modules"], key=lambda r: r["cumulative_us"], reverse=True)[:args.top]
+        print(json.dumps(result, indent=2))
+    else:
+        print(report(result, args.top))
+        print(f"\noverhead target: {args.target_ms} ms -> {'ok' if result['ok'] else 'OVER'}")
+    return 0 if result["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+
+__all__ = ["parse_importtime", "measure", "report", "main", "DEFAULT_TARGET_MS"]
@@ -0,0 +1,233 @@
+import json
+import time
+import random
+import hashlib
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from integrations.config import TELEMETRY_CONFIG, section, telemetry_config
+
+
+DEFAULT_CONFIG = TELEMETRY_CONFIG
+
+COUNTERS_EVENT = "telemetry.counters"
+
+# already periodic roll-ups: never sampled, aggregated or size-capped
+_SUMMARY_EVENTS = ("metrics.summary", COUNTERS_EVENT)
+_OTHER = "__other__"
+
+
+def _is_error(event_type: str, payload: Dict[str, Any]) -> bool:
+    return event_type.endswith(("error", ".failed")) or bool(payload.get("error"))
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+class TelemetrySampler:
+    """Decides which events `TelemetryClient` sends, and bounds how big they are.
+
+    - Head sampling per event type: `rates` maps an exact type or a
+      `prefix.*` pattern to the fraction kept; other types use `sample_rate`.
+      Kept events carry their rate so the backend can re-weight counts.
+    - Errors (`*.error`, `*.failed`, or a truthy `error` field) are always
+      kept when `keep_errors` is set, whatever the rate.
+    - `aggregate` types are never sent one by one: they are counted per
+      (type, `dims` values) and shipped as one `telemetry.counters` event
+      every `interval` seconds, with the sampled-out counts. At most
+      `max_series` series per interval; the rest fold into `__other__`.
+    - `compact()` cuts strings over `max_field_bytes` (keeping their size and
+      a sha256 prefix) and lists over `max_items`. A payload still over
+      `max_event_bytes` is replaced by a digest, so every event (and so
+      every tool call's telemetry) has a fixed upper size.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        sample_rate: float = 1.0,
+        rates: Optional[Dict[str, float]] = None,
+        keep_errors: bool = True,
+        aggregate: Iterable[str] = (),
+        dims: Iterable[str] = ("tool", "endpoint", "reason", "status", "error"),
+        interval: float = 10.0,
+        max_series: int = 256,
+        max_field_bytes: int = 1024,
+        max_items: int = 50,
+        max_event_bytes: int = 8192,
+        seed: Optional[int] = None,
+    ):
+        self.enabled = enabled
+        self.sample_rate = self._rate(sample_rate)
+        self.rates = {k: self._rate(v) for k, v in (rates or {}).items()}
+        self.keep_errors = keep_errors
+        self.aggregate = set(aggregate)
+        self.dims = tuple(dims)
+        self.interval = interval
+        self.max_series = max(1, max_series)
+        self.max_field_bytes = max(64, max_field_bytes)
+        self.max_items = max(1, max_items)
+        self.max_event_bytes = max(256, max_event_bytes)
+        self._random = random.Random(seed).random
+        self._resolved: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, Tuple], int] = {}
+        self._sampled_out: Dict[str, int] = {}
+        self._last_emit = time.monotonic()
+        self._counters = {"sampled_out": 0, "aggregated": 0, "truncated_fields": 0, "digested": 0}
+
+    @staticmethod
+    def _rate(value: Any) -> float:
+        return min(1.0, max(0.0, float(value)))
+
+    @classmethod
+    def from_config(cls, cfg: Optional[Dict[str, Any]] = None, path: Optional[str] = None) -> "TelemetrySampler":
+        """From `telemetry_sampling` in `.mcp/telemetry.yaml` (or `cfg`); `enabled: false` keeps everything."""
+        if cfg is None:
+            cfg = section(telemetry_config(path), "telemetry_sampling")
+        kwargs: Dict[str, Any] = {
+            "enabled": bool(cfg.get("enabled", True)),
+            "sample_rate": cfg.get("sample_rate", 1.0),
+            "rates": cfg.get("per_event") or {},
+            "keep_errors": bool(cfg.get("keep_errors", True)),
+            "aggregate": cfg.get("aggregate") or (),
+        }
+        for key, name in (("aggregate_dims", "dims"), ("aggregate_interval", "interval"), ("max_series", "max_series"),
+                          ("max_field_bytes", "max_field_bytes"), ("max_items", "max_items"),
+                          ("max_event_bytes", "max_event_bytes")):
+            if cfg.get(key) is not None:
+                kwargs[name] = cfg[key]
+        return cls(**kwargs)
+
+    # -- caller thread --------------------------------------------------
+
+    def rate_for(self, event_type: str) -> float:
+        rate = self._resolved.get(event_type)
+        if rate is None:
+            rate = self.rates.get(event_type)
+            if rate is None:
+                # longest matching `prefix.*`
+                best = -1
+                for pattern, value in self.rates.items():
+                    if pattern.endswith("*") and event_type.startswith(pattern[:-1]) and len(pattern) > best:
+                        rate, best = value, len(pattern)
+            rate = self.sample_rate if rate is None else rate
+            if len(self._resolved) < 1024:
+                self._resolved[event_type] = rate
+        return rate
+
+    def admit(self, event_type: str, payload: Dict[str, Any]) -> Optional[float]:
+        """The sample rate the event is kept at, or None when it is dropped or counted instead."""
+        if not self.enabled or event_type in _SUMMARY_EVENTS:
+            return 1.0
+        if self.keep_errors and _is_error(event_type, payload):
+            return 1.0
+        if event_type in self.aggregate:
+            key = (event_type, tuple(str(payload.get(d))[:64] for d in self.dims))
+            with self._lock:
+                if key not in self._series and len(self._series) >= self.max_series:
+                    key = (event_type, (_OTHER,))
+                self._series[key] = self._series.get(key, 0) + 1
+                self._counters["aggregated"] += 1
+            return None
+        rate = self.rate_for(event_type)
+        if rate >= 1.0 or self._random() < rate:
+            return rate
+        with self._lock:
+            self._sampled_out[event_type] = self._sampled_out.get(event_type, 0) + 1
+            self._counters["sampled_out"] += 1
+        return None
+
+    # -- sender thread --------------------------------------------------
+
+    def take_counters(self, force: bool = False) -> Optional[Dict[str, Any]]:
+        """Payload for a `telemetry.counters` event once per `interval` (or now, with `force`)."""
+        now = time.monotonic()
+        with self._lock:
+            if not (self._series or self._sampled_out) or (not force and now - self._last_emit < self.interval):
+                return None
+            series, self._series = self._series, {}
+            sampled_out, self._sampled_out = self._sampled_out, {}
+            elapsed, self._last_emit = now - self._last_emit, now
+        counters = []
+        for (event_type, values), count in sorted(series.items(), key=lambda kv: (kv[0][1] == (_OTHER,), kv[0])):
+            if values == (_OTHER,):
+                counters.append({"type": event_type, "other": True, "count": count})
+            else:
+                dims = {d: v for d, v in zip(self.dims, values) if v != "None"}
+                counters.append({"type": event_type, "dims": dims, "count": count})
+        return {"interval_s": round(elapsed, 3), "counters": counters, "sampled_out": sampled_out}
+
+    def compact(self, event_type: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if not self.enabled:
+            return payload
+        out, bound = self._compact(payload, 0)
+        if event_type in _SUMMARY_EVENTS or bound <= self.max_event_bytes:
+            return out
+        body = json.dumps(out, separators=(",", ":"), default=str).encode("utf-8")
+        if len(body) <= self.max_event_bytes:
+            return out
+        with self._lock:
+            self._counters["digested"] += 1
+        # keep the small scalar fields that identify the event
+        keep = {k: v for k, v in out.items() if isinstance(v, (int, float, bool)) or (isinstance(v, str) and len(v) <= 128)}
+        digest = {"truncated": True, "bytes": len(body), "sha256": _digest(body)}
+        kept = json.dumps(keep, separators=(",", ":"), default=str)
+        return {**keep, "_payload": digest} if len(kept) <= self.max_event_bytes // 2 else {"_payload": digest}
+
+    def _compact(self, value: Any, depth: int) -> Tuple[Any, int]:
+        """The compacted value (`value` itself when unchanged) and an upper bound on its JSON size.
+
+        The bound lets `compact()` skip serialising the (usual) small payload:
+        an escaped character is at most 6 bytes, or 12 for a surrogate pair.
+        """
+        if value is None or isinstance(value, (bool, int, float)):
+            return value, 24
+        if isinstance(value, str):
+            if len(value) * 4 > self.max_field_bytes:
+                raw = value.encode("utf-8")
+                if len(raw) > self.max_field_bytes:
+                    with self._lock:
+                        self._counters["truncated_fields"] += 1
+                    head = raw[:self.max_field_bytes].decode("utf-8", "ignore")
+                    value = f"{head}...[truncated {len(raw)} bytes sha256:{_digest(raw)}]"
+            return value, (6 if value.isascii() else 12) * len(value) + 2
+        if isinstance(value, (bytes, bytearray)):
+            return self._compact(f"[{len(value)} bytes sha256:{_digest(bytes(value))}]", depth)
+        if depth >= 8:
+            return self._compact(f"[{type(value).__name__} nested too deep]", depth)
+        if isinstance(value, dict):
+            out: Dict[str, Any] = {}
+            changed, bound = False, 2
+            for i, (k, v) in enumerate(value.items()):
+                if i == self.max_items:
+                    out["_more_keys"] = len(value) - self.max_items
+                    changed, bound = True, bound + 40
+                    break
+                key = k if isinstance(k, str) and len(k) <= self.max_field_bytes else str(k)[:self.max_field_bytes]
+                item, size = self._compact(v, depth + 1)
+                out[key] = item
+                changed = changed or key is not k or item is not v
+                bound += size + (6 if key.isascii() else 12) * len(key) + 4
+            return (out if changed else value), bound
+        if isinstance(value, (list, tuple)):
+            items, bound = [], 2
+            for v in value[:self.max_items]:
+                item, size = self._compact(v, depth + 1)
+                items.append(item)
+                bound += size + 1
+            if len(value) > self.max_items:
+                more, size = self._compact(f"[{len(value) - self.max_items} more items]", depth)
+                items.append(more)
+                bound += size
+            return items, bound
+        # anything else goes out as `str(value)`, like `default=str` in the encoder
+        return self._compact(str(value), depth)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+
+__all__ = ["COUNTERS_EVENT", "DEFAULT_CONFIG", "TelemetrySampler"]
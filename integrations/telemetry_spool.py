@@ -0,0 +1,233 @@
+import os
+import json
+import mmap
+import time
+import uuid
+import shutil
+import threading
+from datetime import datetime
+from typing import Optional, Dict, List, Iterator, Tuple
+
+from integrations.config import ROOT_DIR, section, telemetry_config
+
+
+DEFAULT_SPOOL_DIR = os.path.join(ROOT_DIR, ".specify", "traces", "spool")
+DEFAULT_RETENTION_RUNS = 50
+
+_SEGMENT_SUFFIX = ".ndjson"
+_ACK_SUFFIX = ".ack"
+
+
+def _new_run_id() -> str:
+    # mirrors `session.orchestration.run_id_template` in .mcp/telemetry.yaml
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+    return f"run-{stamp}-{uuid.uuid4().hex[:8]}"
+
+
+class TelemetrySpool:
+    """Append-only, segment-rotated write-ahead spool for telemetry events.
+
+    - Events are written as line-delimited JSON to `<root>/<run_id>/<seq>.ndjson`.
+    - Segments rotate at `max_segment_bytes`; fsync is batched every
+      `fsync_every` appends or `fsync_interval` seconds.
+    - Sealed segments are read back through `mmap`; a torn trailing line left by
+      a crash is ignored and replay progress is kept in a `.ack` sidecar.
+    - Only the newest `retention_runs` run directories are kept on disk.
+    - Unless given, `root` is `MCP_TELEMETRY_SPOOL_DIR` or `spool/` under
+      `storage.traces_dir`, and `retention_runs` is
+      `session.orchestration.retention_runs`, from `.mcp/telemetry.yaml`.
+      The file is read on first use, so constructing a spool stays cheap.
+    """
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        run_id: Optional[str] = None,
+        max_segment_bytes: int = 4 * 1024 * 1024,
+        fsync_every: int = 64,
+        fsync_interval: float = 1.0,
+        retention_runs: Optional[int] = None,
+        config_path: Optional[str] = None,
+    ):
+        self._root = root or os.getenv("MCP_TELEMETRY_SPOOL_DIR")
+        self._retention_runs = None if retention_runs is None else max(1, retention_runs)
+        self.config_path = config_path
+        self.run_id = run_id or _new_run_id()
+        self.max_segment_bytes = max_segment_bytes
+        self.fsync_every = max(1, fsync_every)
+        self.fsync_interval = fsync_interval
+
+        self._lock = threading.Lock()
+        self._fh = None
+        self._seq = 0
+        self._size = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    # -- configuration --------------------------------------------------
+
+    def _configure(self) -> None:
+        if self._root is not None and self._retention_runs is not None:
+            return
+        cfg = telemetry_config(self.config_path)
+        if self._root is None:
+            traces_dir = section(cfg, "storage").get("traces_dir")
+            self._root = os.path.join(ROOT_DIR, traces_dir, "spool") if traces_dir else DEFAULT_SPOOL_DIR
+        if self._retention_runs is None:
+            runs = section(section(cfg, "session"), "orchestration").get("retention_runs")
+            self._retention_runs = max(1, int(runs)) if runs else DEFAULT_RETENTION_RUNS
+
+    @property
+    def root(self) -> str:
+        self._configure()
+        return self._root
+
+    @property
+    def run_dir(self) -> str:
+        return os.path.join(self.root, self.run_id)
+
+    @property
+    def retention_runs(self) -> int:
+        self._configure()
+        return self._retention_runs
+
+    # -- writing --------------------------------------------------------
+
+    def append(self, events: List[Dict]) -> None:
+        if not events:
+            return
+        data = b"".join(json.dumps(e, separators=(",", ":"), default=str).encode("utf-8") + b"\n" for e in events)
+        with self._lock:
+            if self._fh is None or self._size >= self.max_segment_bytes:
+                self._rotate()
+            self._fh.write(data)
+            self._size += len(data)
+            self._unsynced += len(events)
+            if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+                self._sync()
+
+    def seal(self) -> None:
+        """Close the active segment so it becomes visible to `segments()`."""
+        with self._lock:
+            self._close_active()
+
+    def close(self) -> None:
+        self.seal()
+
+    def _rotate(self) -> None:
+        self._close_active()
+        os.makedirs(self.run_dir, exist_ok=True)
+        self._seq += 1
+        path = os.path.join(self.run_dir, f"{self._seq:08d}{_SEGMENT_SUFFIX}")
+        self._fh = open(path, "ab")
+        self._size = self._fh.tell()
+
+    def _sync(self) -> None:
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _close_active(self) -> None:
+        if self._fh is None:
+            return
+        try:
+            self._sync()
+        finally:
+            self._fh.close()
+            self._fh = None
+            self._size = 0
+
+    def _active_path(self) -> Optional[str]:
+        return self._fh.name if self._fh is not None else None
+
+    # -- reading --------------------------------------------------------
+
+    def _runs(self) -> List[str]:
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            return []
+        return sorted(n for n in names if n.startswith("run-") and os.path.isdir(os.path.join(self.root, n)))
+
+    def segments(self) -> List[str]:
+        """Sealed segments across all runs, oldest first."""
+        with self._lock:
+            active = self._active_path()
+        out = []
+        for run in self._runs():
+            run_dir = os.path.join(self.root, run)
+            for name in sorted(os.listdir(run_dir)):
+                path = os.path.join(run_dir, name)
+                if name.endswith(_SEGMENT_SUFFIX) and path != active:
+                    out.append(path)
+        return out
+
+    def pending(self) -> bool:
+        with self._lock:
+            if self._size:
+                return True
+        return bool(self.segments())
+
+    @staticmethod
+    def read(path: str, offset: int = 0) -> Iterator[Tuple[int, Dict]]:
+        """Yield `(end_offset, event)` for each complete line after `offset`."""
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size <= offset:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                pos = offset
+                while True:
+                    nl = mm.find(b"\n", pos)
+                    if nl == -1:
+                        # torn tail from a crash mid-write
+                        return
+                    line = mm[pos:nl]
+                    pos = nl + 1
+                    try:
+                        yield pos, json.loads(line)
+                    except ValueError:
+                        continue
+
+    @staticmethod
+    def acked(path: str) -> int:
+        try:
+            with open(path + _ACK_SUFFIX, "r", encoding="utf-8") as f:
+                return int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    @staticmethod
+    def ack(path: str, offset: int) -> None:
+        tmp = path + _ACK_SUFFIX + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(str(offset))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path + _ACK_SUFFIX)
+
+    def remove(self, path: str) -> None:
+        for p in (path, path + _ACK_SUFFIX):
+            try:
+                os.remove(p)
+            except FileNotFoundError:
+                pass
+        run_dir = os.path.dirname(path)
+        if run_dir != self.run_dir:
+            try:
+                os.rmdir(run_dir)
+            except OSError:
+                pass
+
+    def prune(self) -> int:
+        """Drop the oldest run directories beyond `retention_runs`."""
+        runs = [r for r in self._runs() if r != self.run_id]
+        excess = len(runs) + 1 - self.retention_runs
+        removed = 0
+        for run in runs[:max(0, excess)]:
+            shutil.rmtree(os.path.join(self.root, run), ignore_errors=True)
+            removed += 1
+        return removed
+
+
+__all__ = ["TelemetrySpool", "DEFAULT_SPOOL_DIR", "DEFAULT_RETENTION_RUNS"]
@@ -1,54 +1,104 @@
-from dotenv import load_dotenv
-load_dotenv()
+from integrations.config import load_env
+load_env()
 
-from mcp.server.fastmcp import FastMCP
+from functools import lru_cache
 
+from integrations.admission import AdmissionController, AdmittingFastMCP
 from integrations.mcp_telemetry import TelemetryClient
+from integrations.telemetry_spool import TelemetrySpool
+from integrations.metrics import REGISTRY, MetricsReporter, instrument
+from integrations.profiling import register_profiling_tools
 from integrations.openclaw_integration import OpenClawClient, register_openclaw_tools
+from orchestrator.agents import execute, plan, register_default_agents
+from orchestrator.policy import register_policy_tools
+from orchestrator.scheduler import PipelineScheduler, register_orchestrator_tools
+from orchestrator.task_queue import TaskQueue
 import os
 
 
-# Initialize MCP and telemetry
-mcp = FastMCP("AgentServer")
-telemetry = TelemetryClient()
+# Initialize telemetry and MCP; tool calls pass admission control (`MCP_ADMISSION_*`, `MCP_TOOL_LIMITS`)
+telemetry = TelemetryClient(spool=TelemetrySpool())
+admission = AdmissionController.from_env(telemetry=telemetry)
+mcp = AdmittingFastMCP("AgentServer", admission=admission)
+reporter = MetricsReporter(telemetry, interval=float(os.getenv("MCP_METRICS_INTERVAL", "60")))
 
 
 @mcp.tool()
+@instrument(telemetry=telemetry)
 def planner_agent(task: str) -> str:
-    try:
-        telemetry.track("tool.invocation.started", {"tool": "planner_agent", "task": task})
-    except Exception:
-        pass
-    result = f"Planning task: {task}"
-    try:
-        telemetry.track("tool.invocation.completed", {"tool": "planner_agent", "result": result})
-    except Exception:
-        pass
-    return result
+    return plan(task)
 
 
 @mcp.tool()
+@instrument(telemetry=telemetry)
 def executor_agent(task: str) -> str:
-    try:
-        telemetry.track("tool.invocation.started", {"tool": "executor_agent", "task": task})
-    except Exception:
-        pass
-    result = f"Executing task: {task}"
-    try:
-        telemetry.track("tool.invocation.completed", {"tool": "executor_agent", "result": result})
-    except Exception:
-        pass
-    return result
+    return execute(task)
+
+
+@mcp.tool()
+def metrics() -> dict:
+    """Per-tool call counts, latency percentiles (ms) and payload sizes (bytes), plus admission control state."""
+    return {**REGISTRY.snapshot(), "admission": admission.stats()}
+
+
+# `debug_profile` captures collapsed stacks of live tool calls into .specify/traces/
+register_profiling_tools(mcp, telemetry=telemetry)
+
+
+# Pipelines submitted through `tasks_submit` run on this in-process DAG scheduler
+scheduler = PipelineScheduler(max_workers=int(os.getenv("MCP_PIPELINE_WORKERS", "8")), telemetry=telemetry)
+register_default_agents(scheduler)
+# `tasks_submit(durable=True)` hands work to `python -m orchestrator.worker` processes
+task_queue = TaskQueue()
+register_orchestrator_tools(mcp, scheduler, telemetry=telemetry, queue=task_queue)
+# Pre-publish checks of transcript segments against `policy_rules.yaml` (or `MCP_POLICY_RULES`)
+register_policy_tools(mcp, telemetry=telemetry)
 
 
 # Register integrations that depend on MCP instance
-openclaw = OpenClawClient()  # uses OPENCLAW_BASE_URL and OPENCLAW_API_KEY from .env
-register_openclaw_tools(mcp, openclaw, telemetry=telemetry)
+@lru_cache(maxsize=None)
+def openclaw_client() -> OpenClawClient:
+    # built on first use, so importing this module needs no OPENCLAW_BASE_URL
+    return OpenClawClient(telemetry=telemetry)  # uses OPENCLAW_BASE_URL and OPENCLAW_API_KEY from .env
+
+
+register_openclaw_tools(mcp, openclaw_client, telemetry=telemetry)
+
+
+def status_publisher():
+    """Capacity/health heartbeats to OpenClaw (`status:` in the OpenClaw config).
+
+    None when `status:` is disabled or no OPENCLAW_BASE_URL is set, so the
+    server still starts without an OpenClaw endpoint.
+    """
+    from integrations.config import openclaw_config, section
+    from integrations.openclaw_status import StatusPublisher
+
+    cfg = section(openclaw_config(), "status")
+    if not cfg.get("enabled") or not os.getenv("OPENCLAW_BASE_URL"):
+        return None
+    return StatusPublisher.from_config(
+        openclaw_client(),
+        cfg,
+        capabilities=lambda: scheduler.agents,
+        max_concurrent=scheduler.max_workers,
+        queue_depth=lambda: scheduler.pending() + task_queue.counts()["queued"],
+        telemetry=telemetry,
+    )
 
 
 if __name__ == "__main__":
     telemetry.track("server.start", {"host": os.getenv("MCP_HOST"), "port": os.getenv("MCP_PORT")})
+    reporter.start()
+    publisher = status_publisher()
+    if publisher is not None:
+        publisher.start()
     try:
         mcp.run()
     finally:
+        if publisher is not None:
+            publisher.stop()
+        reporter.stop()
+        admission.report(force=True)
         telemetry.track("server.stop", {})
+        telemetry.close()
@@ -0,0 +1,17 @@
+"""Agents available to every pipeline scheduler, in the MCP server and in queue workers."""
+
+
+def plan(task: str) -> str:
+    return f"Planning task: {task}"
+
+
+def execute(task: str) -> str:
+    return f"Executing task: {task}"
+
+
+def register_default_agents(scheduler) -> None:
+    scheduler.register("planner", plan)
+    scheduler.register("executor", execute)
+
+
+__all__ = ["plan", "execute", "register_default_agents"]
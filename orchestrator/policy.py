@@ -0,0 +1,380 @@
+"""Policy Service: keyword/phrase rule sets scored over transcript segments.
+
+Answers `{decision: pass|flag, confidence, reasons}` for a batch of segments
+before publish (architecture_strategy.md). Rule sets look like:
+
+    version: "2026-10-01"
+    threshold: 0.5
+    rules:
+      - id: pii.ssn
+        category: pii
+        weight: 0.9          # 0..1; a rule at or above `threshold` flags on its own
+        phrases: ["social security number", "ssn"]
+        word: true           # match whole words only (default)
+"""
+import os
+import copy
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from integrations.config import ROOT_DIR, load_yaml
+from integrations.metrics import instrument
+from integrations.offload import offload
+
+
+PASS = "pass"
+FLAG = "flag"
+DEFAULT_THRESHOLD = 0.5
+
+# joins segments for the single scan; never part of a (normalised) phrase
+_SEP = "\x00"
+
+
+class PhraseMatcher:
+    """Aho–Corasick automaton over lower-cased phrases, built once per rule set.
+
+    - The trie and its failure links are flattened into a DFA (one dict of
+      next states per state), so a scan is one dict lookup per character
+      whatever the number of phrases.
+    - `scan()` yields every occurrence, overlapping ones included, as
+      `(end, phrase_index)` with `end` exclusive.
+    """
+
+    def __init__(self, phrases: Sequence[str]):
+        self.phrases = list(phrases)
+        goto: List[Dict[str, int]] = [{}]
+        out: List[Tuple[int, ...]] = [()]
+        for index, phrase in enumerate(self.phrases):
+            state = 0
+            for ch in phrase:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    out.append(())
+                state = nxt
+            out[state] += (index,)
+
+        # breadth-first, so a state's failure target (which is shallower) is
+        # complete before the state itself is
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict() for _ in goto]
+        delta[0] = dict(goto[0])
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            delta[state] = {**delta[fail[state]], **goto[state]}
+            for ch, nxt in goto[state].items():
+                fail[nxt] = delta[fail[state]].get(ch, 0)
+                out[nxt] += out[fail[nxt]]
+                queue.append(nxt)
+        self._delta = delta
+        self._out = [o or None for o in out]
+
+    @property
+    def states(self) -> int:
+        return len(self._delta)
+
+    def scan(self, text: str) -> Iterable[Tuple[int, int]]:
+        delta, out = self._delta, self._out
+        state = 0
+        for i, ch in enumerate(text, 1):
+            state = delta[state].get(ch, 0)
+            hits = out[state]
+            if hits is not None:
+                for index in hits:
+                    yield i, index
+
+
+def _normalise(phrase: str) -> str:
+    return " ".join(phrase.replace(_SEP, " ").split()).lower()
+
+
+def _text(segment: Any) -> str:
+    if isinstance(segment, str):
+        return segment
+    if isinstance(segment, dict):
+        return str(segment.get("text") or "")
+    raise ValueError("segments must be strings or objects with 'text'")
+
+
+def rules_version(rules: List[Dict[str, Any]]) -> str:
+    """Content hash for rule sets submitted without a `version`."""
+    canonical = json.dumps(rules, sort_keys=True, separators=(",", ":"), default=str)
+    return "sha256:" + hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+class CompiledPolicy:
+    """A validated rule set and its `PhraseMatcher`; immutable, shared across threads."""
+
+    def __init__(self, rules: List[Dict[str, Any]], version: str, threshold: float = DEFAULT_THRESHOLD):
+        if not isinstance(rules, list):
+            raise ValueError("rules must be a list")
+        self.version = version
+        self.threshold = float(threshold)
+        self.rules: List[Dict[str, Any]] = []
+        phrases: List[str] = []
+        owners: List[int] = []
+        seen = set()
+        for raw in rules:
+            if not isinstance(raw, dict) or not raw.get("id"):
+                raise ValueError("every rule needs an 'id'")
+            rule_id = str(raw["id"])
+            if rule_id in seen:
+                raise ValueError(f"duplicate rule id: {rule_id}")
+            seen.add(rule_id)
+            weight = float(raw.get("weight", 1.0))
+            if not 0.0 <= weight <= 1.0:
+                raise ValueError(f"rule {rule_id}: weight must be in [0, 1]")
+            items = raw.get("phrases")
+            if isinstance(items, str):
+                items = [items]
+            normalised = [_normalise(p) for p in items or [] if isinstance(p, str)]
+            if not any(normalised):
+                raise ValueError(f"rule {rule_id}: needs at least one phrase")
+            rule = {
+                "id": rule_id,
+                "category": raw.get("category"),
+                "weight": weight,
+                "word": bool(raw.get("word", True)),
+            }
+            for phrase in dict.fromkeys(p for p in normalised if p):
+                phrases.append(phrase)
+                owners.append(len(self.rules))
+            self.rules.append(rule)
+        self._owners = owners
+        self.matcher = PhraseMatcher(phrases)
+
+    def with_threshold(self, threshold: float) -> "CompiledPolicy":
+        """The same compiled rules with another default threshold (shares the matcher)."""
+        if float(threshold) == self.threshold:
+            return self
+        policy = copy.copy(self)
+        policy.threshold = float(threshold)
+        return policy
+
+    def _hits(self, texts: List[str]) -> Dict[int, Dict[int, Dict[str, int]]]:
+        """`{segment: {rule: {phrase: count}}}` from one scan over all segments."""
+        # phrases are lower-cased with single spaces; give the text the same shape
+        lowered = [" ".join(t.lower().split()) for t in texts]
+        joined = _SEP.join(lowered)
+        # segment k spans [starts[k], starts[k + 1] - 1) of `joined`
+        starts = [0]
+        for t in lowered:
+            starts.append(starts[-1] + len(t) + 1)
+        phrases, owners, rules = self.matcher.phrases, self._owners, self.rules
+        hits: Dict[int, Dict[int, Dict[str, int]]] = {}
+        segment = 0
+        for end, index in self.matcher.scan(joined):
+            phrase = phrases[index]
+            begin = end - len(phrase)
+            rule = owners[index]
+            if rules[rule]["word"] and (
+                (begin > 0 and joined[begin - 1].isalnum()) or (end < len(joined) and joined[end].isalnum())
+            ):
+                continue
+            # matches arrive in order of `end`, so the segment only moves forward
+            while end > starts[segment + 1]:
+                segment += 1
+            per_rule = hits.setdefault(segment, {}).setdefault(rule, {})
+            per_rule[phrase] = per_rule.get(phrase, 0) + 1
+        return hits
+
+    def evaluate(self, segments: Sequence[Any], threshold: Optional[float] = None) -> Dict[str, Any]:
+        """Score every segment in one pass; `results` lists only segments with a match.
+
+        A segment's score combines its matched rules' weights as a noisy-or
+        (each rule counts once, however often it matches); it is flagged when
+        the score reaches `threshold`. `confidence` is the score for a flag
+        and `1 - score` for a pass.
+        """
+        threshold = self.threshold if threshold is None else float(threshold)
+        texts = [_text(s) for s in segments]
+        results = []
+        summary: Dict[int, Dict[str, Any]] = {}
+        flagged, worst_pass, top_flag = 0, 1.0, 0.0
+        for index, per_rule in sorted(self._hits(texts).items()):
+            miss = 1.0
+            reasons = []
+            for rule_index, counts in per_rule.items():
+                rule = self.rules[rule_index]
+                miss *= 1.0 - rule["weight"]
+                count = sum(counts.values())
+                reasons.append({
+                    "rule": rule["id"],
+                    "category": rule["category"],
+                    "weight": rule["weight"],
+                    "matches": sorted(counts),
+                    "count": count,
+                })
+                agg = summary.setdefault(rule_index, {
+                    "rule": rule["id"], "category": rule["category"], "weight": rule["weight"], "segments": 0, "count": 0,
+                })
+                agg["segments"] += 1
+                agg["count"] += count
+            score = 1.0 - miss
+            if score >= threshold:
+                decision, confidence = FLAG, score
+                flagged += 1
+                top_flag = max(top_flag, score)
+            else:
+                decision, confidence = PASS, 1.0 - score
+                worst_pass = min(worst_pass, confidence)
+            result = {"index": index, "decision": decision, "confidence": round(confidence, 4), "reasons": reasons}
+            segment = segments[index]
+            if isinstance(segment, dict):
+                result.update({k: segment[k] for k in ("id", "start", "end") if k in segment})
+            results.append(result)
+
+        reasons = sorted(summary.values(), key=lambda r: (-r["weight"], r["rule"]))
+        return {
+            "version": self.version,
+            "decision": FLAG if flagged else PASS,
+            "confidence": round(top_flag if flagged else worst_pass, 4),
+            "reasons": reasons,
+            "segments": len(texts),
+            "flagged": flagged,
+            "threshold": threshold,
+            "results": results,
+        }
+
+
+class PolicyEngine:
+    """Compiles rule sets once and evaluates segment batches against them.
+
+    - Caller rule sets are cached by version (LRU of `max_compiled`); rules
+      sent without a `version` are keyed by a hash of their content. Reusing
+      a cached version with different rules is a ValueError, so give a new
+      version whenever a versioned rule set changes.
+    - The default rule set is `MCP_POLICY_RULES` or `policy_rules.yaml`,
+      re-read only when the file's mtime changes. It is held apart from the
+      caller cache, so no caller rule set can evict or replace it.
+    - Safe to call from the offload pool's threads.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_compiled: int = 16, telemetry=None):
+        self.path = path or os.getenv("MCP_POLICY_RULES") or os.path.join(ROOT_DIR, "policy_rules.yaml")
+        self.max_compiled = max(1, max_compiled)
+        self.telemetry = telemetry
+        # version -> (content hash, compiled rule set)
+        self._compiled: "OrderedDict[str, Tuple[str, CompiledPolicy]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._default: Optional[Tuple[float, CompiledPolicy]] = None
+        self._counters = {"compiles": 0, "cache_hits": 0, "evaluations": 0, "segments": 0}
+
+    def compile(
+        self, rules: List[Dict[str, Any]], version: Optional[str] = None, threshold: float = DEFAULT_THRESHOLD
+    ) -> CompiledPolicy:
+        digest = rules_version(rules)
+        version = str(version) if version else digest
+        with self._lock:
+            cached = self._compiled.get(version)
+            if cached is not None:
+                if cached[0] != digest:
+                    raise ValueError(f"rule set version {version!r} is already compiled with different rules")
+                self._compiled.move_to_end(version)
+                self._counters["cache_hits"] += 1
+                return cached[1].with_threshold(threshold)
+        policy = self._build(rules, version, threshold)
+        with self._lock:
+            # another thread may have compiled the same version meanwhile
+            cached = self._compiled.setdefault(version, (digest, policy))
+            self._compiled.move_to_end(version)
+            while len(self._compiled) > self.max_compiled:
+                self._compiled.popitem(last=False)
+        if cached[0] != digest:
+            raise ValueError(f"rule set version {version!r} is already compiled with different rules")
+        return cached[1].with_threshold(threshold)
+
+    def _build(self, rules: List[Dict[str, Any]], version: str, threshold: float) -> CompiledPolicy:
+        started = time.perf_counter()
+        policy = CompiledPolicy(rules, version, threshold)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._counters["compiles"] += 1
+        if self.telemetry is not None:
+            try:
+                self.telemetry.track("policy.compile", {
+                    "version": version,
+                    "rules": len(policy.rules),
+                    "phrases": len(policy.matcher.phrases),
+                    "states": policy.matcher.states,
+                    "compile_ms": round(elapsed_ms, 3),
+                })
+            except Exception:
+                pass
+        return policy
+
+    def default(self) -> CompiledPolicy:
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            raise ValueError(f"no rules given and no rule set at {self.path}")
+        cached = self._default
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        data = load_yaml(self.path)
+        rules = data.get("rules") or []
+        version = str(data.get("version") or rules_version(rules))
+        policy = self._build(rules, version, float(data.get("threshold", DEFAULT_THRESHOLD)))
+        self._default = (mtime, policy)
+        return policy
+
+    def evaluate(
+        self,
+        segments: Sequence[Any],
+        rules: Optional[List[Dict[str, Any]]] = None,
+        version: Optional[str] = None,
+        threshold: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        policy = self.default() if rules is None else self.compile(rules, version)
+        result = policy.evaluate(segments, threshold)
+        with self._lock:
+            self._counters["evaluations"] += 1
+            self._counters["segments"] += result["segments"]
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            default = self._default[1].version if self._default is not None else None
+            return {**self._counters, "default": default, "compiled": list(self._compiled)}
+
+
+def register_policy_tools(mcp, engine: Optional[PolicyEngine] = None, telemetry=None):
+    engine = engine or PolicyEngine(telemetry=telemetry)
+
+    @mcp.tool()
+    @instrument(telemetry=telemetry)
+    @offload
+    def policy_evaluate(
+        segments: List[Union[str, dict]],
+        rules: Optional[List[dict]] = None,
+        version: Optional[str] = None,
+        threshold: Optional[float] = None,
+    ) -> dict:
+        """Check transcript segments (strings or `{"text", "start"?, "end"?}`) against a rule set.
+
+        Returns `{decision: pass|flag, confidence, reasons}` for the batch plus
+        per-segment `results` for segments that matched any rule. Without
+        `rules` the server's default rule set is used.
+        """
+        return engine.evaluate(segments, rules=rules, version=version, threshold=threshold)
+
+    return {"policy_evaluate": policy_evaluate}
+
+
+__all__ = [
+    "PASS",
+    "FLAG",
+    "DEFAULT_THRESHOLD",
+    "PhraseMatcher",
+    "CompiledPolicy",
+    "PolicyEngine",
+    "rules_version",
+    "register_policy_tools",
+]
@@ -0,0 +1,341 @@
+import time
+import uuid
+import asyncio
+import inspect
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from integrations.metrics import instrument
+from integrations.offload import run_sync
+
+
+class PipelineError(ValueError):
+    """The submitted pipeline is not a valid DAG of registered agents."""
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat() + "Z"
+
+
+class Step:
+    __slots__ = ("id", "agent", "input", "depends_on", "status", "output", "error", "started_at", "finished_at")
+
+    def __init__(self, id: str, agent: str, input: Dict[str, Any], depends_on: List[str]):
+        self.id = id
+        self.agent = agent
+        self.input = input
+        self.depends_on = depends_on
+        self.status = "pending"
+        self.output: Any = None
+        self.error: Optional[Dict[str, str]] = None
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "agent": self.agent,
+            "depends_on": list(self.depends_on),
+            "status": self.status,
+            "output": self.output,
+            "error": self.error,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+def parse_pipeline(pipeline: List[Dict[str, Any]]) -> List[Step]:
+    """Build steps from `[{"agent", "input", "id"?, "depends_on"?}, ...]`.
+
+    A step without `depends_on` depends on the step before it, so the linear
+    pipelines in specs/technical.md keep their meaning; give `depends_on: []`
+    (or a list of ids) to let steps run in parallel.
+    """
+    if not isinstance(pipeline, list) or not pipeline:
+        raise PipelineError("pipeline must be a non-empty list of steps")
+    agents = [s.get("agent") for s in pipeline if isinstance(s, dict)]
+    if len(agents) != len(pipeline) or not all(isinstance(a, str) and a for a in agents):
+        raise PipelineError("every step needs an 'agent' name")
+
+    steps: List[Step] = []
+    for i, spec in enumerate(pipeline):
+        sid = spec.get("id") or (spec["agent"] if agents.count(spec["agent"]) == 1 else f"{spec['agent']}-{i}")
+        if "depends_on" in spec:
+            deps = list(spec["depends_on"] or [])
+        else:
+            deps = [steps[-1].id] if steps else []
+        steps.append(Step(str(sid), spec["agent"], dict(spec.get("input") or {}), [str(d) for d in deps]))
+
+    ids = [s.id for s in steps]
+    if len(set(ids)) != len(ids):
+        raise PipelineError("step ids must be unique")
+    known = set(ids)
+    for s in steps:
+        missing = [d for d in s.depends_on if d not in known]
+        if missing:
+            raise PipelineError(f"step {s.id!r} depends on unknown steps {missing}")
+
+    # Kahn's algorithm: anything left over sits on a cycle
+    indegree = {s.id: len(s.depends_on) for s in steps}
+    children: Dict[str, List[str]] = {s.id: [] for s in steps}
+    for s in steps:
+        for d in s.depends_on:
+            children[d].append(s.id)
+    ready = [sid for sid, n in indegree.items() if n == 0]
+    seen = 0
+    while ready:
+        sid = ready.pop()
+        seen += 1
+        for child in children[sid]:
+            indegree[child] -= 1
+            if indegree[child] == 0:
+                ready.append(child)
+    if seen != len(steps):
+        raise PipelineError("pipeline has a dependency cycle")
+    return steps
+
+
+def _resolve(value: Any, outputs: Dict[str, Any]) -> Any:
+    """Replace `"$step_id"` / `"$step_id.key"` strings with upstream outputs."""
+    if isinstance(value, str) and value.startswith("$") and len(value) > 1:
+        sid, _, key = value[1:].partition(".")
+        if sid in outputs:
+            out = outputs[sid]
+            return out.get(key) if key and isinstance(out, dict) else out
+        return value
+    if isinstance(value, dict):
+        return {k: _resolve(v, outputs) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_resolve(v, outputs) for v in value]
+    return value
+
+
+class _Agent:
+    __slots__ = ("fn", "is_async", "wants_upstream", "limit", "max_concurrency")
+
+    def __init__(self, fn: Callable[..., Any], max_concurrency: Optional[int]):
+        self.fn = fn
+        self.is_async = inspect.iscoroutinefunction(fn)
+        params = inspect.signature(fn).parameters.values()
+        self.wants_upstream = any(p.name == "upstream" or p.kind == p.VAR_KEYWORD for p in params)
+        self.max_concurrency = max_concurrency
+        self.limit = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+
+
+class Task:
+    def __init__(self, task_id: str, request_id: Optional[str], steps: List[Step]):
+        self.id = task_id
+        self.request_id = request_id
+        self.steps = steps
+        self.status = "queued"
+        self.created_at = _now()
+        self.updated_at = self.created_at
+        self.elapsed_seconds: Optional[float] = None
+        self.done = asyncio.Event()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "task_id": self.id,
+            "request_id": self.request_id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "elapsed_seconds": self.elapsed_seconds,
+            "steps": [s.to_dict() for s in self.steps],
+        }
+
+
+class PipelineScheduler:
+    """Runs pipelines as DAGs on the current event loop.
+
+    - Each step starts as soon as all of its dependencies have succeeded, so a
+      task takes about as long as its critical path.
+    - At most `max_workers` steps run at once across all tasks, and each agent
+      can carry its own `max_concurrency` cap.
+    - Async agents are awaited; sync agents run on the shared offload pool.
+    - Agents are called with the step's `input` as keyword arguments (after
+      `"$step_id.key"` references are resolved) plus `upstream={step_id: output}`
+      when they accept it.
+    - Finished tasks are kept for `GET /tasks/{task_id}`-style lookups, up to
+      `max_tasks`.
+    """
+
+    def __init__(self, max_workers: int = 8, telemetry=None, max_tasks: int = 1000):
+        self.max_workers = max(1, max_workers)
+        self.telemetry = telemetry
+        self.max_tasks = max(1, max_tasks)
+        self._agents: Dict[str, _Agent] = {}
+        self._tasks: "OrderedDict[str, Task]" = OrderedDict()
+        self._workers = asyncio.Semaphore(self.max_workers)
+        self._running: Dict[str, asyncio.Task] = {}
+
+    def register(self, name: str, fn: Callable[..., Any], max_concurrency: Optional[int] = None) -> None:
+        self._agents[name] = _Agent(fn, max_concurrency)
+
+    @property
+    def agents(self) -> List[str]:
+        return sorted(self._agents)
+
+    def _track(self, event_type: str, payload: Dict[str, Any]) -> None:
+        if self.telemetry is not None:
+            try:
+                self.telemetry.track(event_type, payload)
+            except Exception:
+                pass
+
+    # -- submission -----------------------------------------------------
+
+    def _create(self, pipeline: List[Dict[str, Any]], request_id: Optional[str]) -> Task:
+        steps = parse_pipeline(pipeline)
+        unknown = sorted({s.agent for s in steps} - set(self._agents))
+        if unknown:
+            raise PipelineError(f"unknown agents {unknown}; registered: {self.agents}")
+        task = Task(str(uuid.uuid4()), request_id, steps)
+        self._tasks[task.id] = task
+        while len(self._tasks) > self.max_tasks:
+            oldest = next(iter(self._tasks))
+            if not self._tasks[oldest].done.is_set():
+                break
+            self._tasks.pop(oldest)
+        return task
+
+    async def submit(self, pipeline: List[Dict[str, Any]], request_id: Optional[str] = None) -> Dict[str, Any]:
+        """Queue a pipeline and return at once with its `task_id`."""
+        task = self._create(pipeline, request_id)
+        runner = asyncio.get_running_loop().create_task(self._run(task))
+        self._running[task.id] = runner
+        runner.add_done_callback(lambda _: self._running.pop(task.id, None))
+        return {"request_id": request_id, "task_id": task.id, "status": task.status}
+
+    async def run(self, pipeline: List[Dict[str, Any]], request_id: Optional[str] = None) -> Dict[str, Any]:
+        """Run a pipeline to completion and return its final status."""
+        task = self._create(pipeline, request_id)
+        await self._run(task)
+        return task.to_dict()
+
+    def pending(self) -> int:
+        """Submitted tasks that have not finished yet."""
+        return len(self._running)
+
+    def status(self, task_id: str) -> Optional[Dict[str, Any]]:
+        task = self._tasks.get(task_id)
+        return task.to_dict() if task is not None else None
+
+    async def wait(self, task_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        task = self._tasks.get(task_id)
+        if task is None:
+            return None
+        await asyncio.wait_for(task.done.wait(), timeout)
+        return task.to_dict()
+
+    # -- execution ------------------------------------------------------
+
+    async def _run(self, task: Task) -> None:
+        start = time.perf_counter()
+        task.status = "running"
+        task.updated_at = _now()
+        self._track("task.start", {"task_id": task.id, "request_id": task.request_id, "steps": len(task.steps)})
+
+        finished: Dict[str, asyncio.Future] = {s.id: asyncio.get_running_loop().create_future() for s in task.steps}
+        outputs: Dict[str, Any] = {}
+        await asyncio.gather(*(self._run_step(task, s, finished, outputs) for s in task.steps))
+
+        task.status = "success" if all(s.status == "success" for s in task.steps) else "failed"
+        task.elapsed_seconds = round(time.perf_counter() - start, 6)
+        task.updated_at = _now()
+        task.done.set()
+        self._track("task.complete" if task.status == "success" else "task.error", {
+            "task_id": task.id,
+            "request_id": task.request_id,
+            "status": task.status,
+            "elapsed_seconds": task.elapsed_seconds,
+        })
+
+    async def _run_step(self, task: Task, step: Step, finished: Dict[str, asyncio.Future], outputs: Dict[str, Any]) -> None:
+        done = finished[step.id]
+        try:
+            deps_ok = all([await finished[d] for d in step.depends_on])
+            if not deps_ok:
+                step.status = "skipped"
+                done.set_result(False)
+                return
+            agent = self._agents[step.agent]
+            upstream = {d: outputs[d] for d in step.depends_on}
+            kwargs = _resolve(step.input, outputs)
+            if agent.wants_upstream:
+                kwargs["upstream"] = upstream
+            # take the agent's own slot first so a capped agent never pins a worker
+            if agent.limit is not None:
+                await agent.limit.acquire()
+            try:
+                async with self._workers:
+                    step.status = "running"
+                    step.started_at = task.updated_at = _now()
+                    if agent.is_async:
+                        step.output = await agent.fn(**kwargs)
+                    else:
+                        step.output = await run_sync(agent.fn, **kwargs)
+            finally:
+                if agent.limit is not None:
+                    agent.limit.release()
+            outputs[step.id] = step.output
+            step.status = "success"
+            done.set_result(True)
+        except Exception as exc:
+            step.status = "failed"
+            step.error = {"code": type(exc).__name__, "message": str(exc)}
+            if not done.done():
+                done.set_result(False)
+        finally:
+            step.finished_at = task.updated_at = _now()
+
+
+def register_orchestrator_tools(mcp, scheduler: PipelineScheduler, telemetry=None, queue=None):
+    @mcp.tool()
+    @instrument(telemetry=telemetry)
+    async def tasks_submit(pipeline: List[dict], request_id: Optional[str] = None, durable: bool = False) -> dict:
+        """Submit a pipeline (`[{"agent", "input", "id"?, "depends_on"?}]`); returns its `task_id`.
+
+        With `durable`, the task is written to the SQLite queue and run by
+        `python -m orchestrator.worker` processes instead of this server.
+        """
+        if durable and queue is not None:
+            parse_pipeline(pipeline)  # reject bad DAGs before they reach the queue
+            # SQLite write: keep it off the event loop
+            task_id = await run_sync(queue.enqueue, pipeline, request_id=request_id)
+            return {"request_id": request_id, "task_id": task_id, "status": "queued"}
+        return await scheduler.submit(pipeline, request_id=request_id)
+
+    @mcp.tool()
+    async def tasks_status(task_id: str) -> dict:
+        """Canonical task status with per-step outcomes (`GET /tasks/{task_id}`)."""
+        status = scheduler.status(task_id)
+        if status is None and queue is not None:
+            row = await run_sync(queue.get, task_id)
+            if row is not None:
+                status = {
+                    "task_id": task_id,
+                    "request_id": row["request_id"],
+                    "status": row["status"],
+                    "attempts": row["attempts"],
+                    "created_at": row["created_at"],
+                    "updated_at": row["updated_at"],
+                    "result": row["result"],
+                }
+        return status or {"task_id": task_id, "status": "not_found"}
+
+    return {
+        "tasks_submit": tasks_submit,
+        "tasks_status": tasks_status,
+    }
+
+
+__all__ = [
+    "PipelineError",
+    "PipelineScheduler",
+    "Step",
+    "Task",
+    "parse_pipeline",
+    "register_orchestrator_tools",
+]
@@ -0,0 +1,207 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from integrations.config import ROOT_DIR
+
+
+DEFAULT_DB_PATH = os.path.join(ROOT_DIR, ".specify", "tasks.db")
+
+STATUSES = ("queued", "running", "success", "failed")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id            TEXT PRIMARY KEY,
+    request_id    TEXT,
+    status        TEXT NOT NULL CHECK (status IN ('queued', 'running', 'success', 'failed')),
+    pipeline      TEXT NOT NULL,
+    result        TEXT,
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    lease_owner   TEXT,
+    lease_expires REAL,
+    created_at    TEXT NOT NULL,
+    updated_at    TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, created_at);
+CREATE INDEX IF NOT EXISTS idx_tasks_lease ON tasks (status, lease_expires);
+"""
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat() + "Z"
+
+
+class TaskQueue:
+    """Durable task queue on SQLite (WAL), a local stand-in for the Postgres `tasks` table.
+
+    - Any number of processes on one box can share the database file.
+    - `claim()` moves queued rows to `running` under a time-limited lease inside
+      a `BEGIN IMMEDIATE` transaction, so two workers never get the same task.
+    - Workers extend leases with `heartbeat()` and report outcomes in batches
+      with `complete()`; updates from a worker that lost its lease are ignored.
+    - `requeue_expired()` returns tasks whose lease ran out to the queue, or
+      fails them after `max_attempts` (default 5, per specs/technical.md).
+    """
+
+    def __init__(self, path: Optional[str] = None, busy_timeout: float = 5.0, max_attempts: int = 5):
+        self.path = path or os.getenv("MCP_TASK_DB") or DEFAULT_DB_PATH
+        self.busy_timeout = busy_timeout
+        self.max_attempts = max(1, max_attempts)
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    # -- connection -----------------------------------------------------
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            # autocommit mode; transactions are explicit below
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout * 1000)}")
+            with self._init_lock:
+                if not self._initialized:
+                    conn.executescript(_SCHEMA)
+                    self._initialized = True
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _write(self):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    @staticmethod
+    def _row(row: sqlite3.Row) -> Dict[str, Any]:
+        out = dict(row)
+        out["pipeline"] = json.loads(out["pipeline"])
+        out["result"] = json.loads(out["result"]) if out["result"] is not None else None
+        return out
+
+    # -- producers ------------------------------------------------------
+
+    def enqueue(self, pipeline: List[Dict[str, Any]], request_id: Optional[str] = None) -> str:
+        return self.enqueue_many([(pipeline, request_id)])[0]
+
+    def enqueue_many(self, items: Iterable[Tuple[List[Dict[str, Any]], Optional[str]]]) -> List[str]:
+        now = _now()
+        rows = [(str(uuid.uuid4()), request_id, json.dumps(pipeline), now, now) for pipeline, request_id in items]
+        with self._write() as conn:
+            conn.executemany(
+                "INSERT INTO tasks (id, request_id, status, pipeline, created_at, updated_at) "
+                "VALUES (?, ?, 'queued', ?, ?, ?)",
+                rows,
+            )
+        return [r[0] for r in rows]
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return self._row(row) if row is not None else None
+
+    def counts(self) -> Dict[str, int]:
+        out = {s: 0 for s in STATUSES}
+        for status, n in self._conn().execute("SELECT status, COUNT(*) FROM tasks GROUP BY status"):
+            out[status] = n
+        return out
+
+    # -- workers --------------------------------------------------------
+
+    def claim(self, worker_id: str, limit: int = 1, lease_seconds: float = 30.0) -> List[Dict[str, Any]]:
+        now = _now()
+        expires = time.time() + lease_seconds
+        with self._write() as conn:
+            rows = conn.execute(
+                "SELECT * FROM tasks WHERE status = 'queued' ORDER BY created_at LIMIT ?", (max(0, limit),)
+            ).fetchall()
+            if not rows:
+                return []
+            conn.executemany(
+                "UPDATE tasks SET status = 'running', lease_owner = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                [(worker_id, expires, now, r["id"]) for r in rows],
+            )
+        claimed = []
+        for r in rows:
+            task = self._row(r)
+            task.update(status="running", lease_owner=worker_id, lease_expires=expires, attempts=task["attempts"] + 1)
+            claimed.append(task)
+        return claimed
+
+    def heartbeat(self, worker_id: str, task_ids: Iterable[str], lease_seconds: float = 30.0) -> List[str]:
+        """Extend the leases `worker_id` still holds; returns the ids it still owns."""
+        ids = list(task_ids)
+        if not ids:
+            return []
+        expires = time.time() + lease_seconds
+        marks = ",".join("?" * len(ids))
+        with self._write() as conn:
+            conn.execute(
+                f"UPDATE tasks SET lease_expires = ? WHERE status = 'running' AND lease_owner = ? AND id IN ({marks})",
+                [expires, worker_id, *ids],
+            )
+            held = conn.execute(
+                f"SELECT id FROM tasks WHERE status = 'running' AND lease_owner = ? AND id IN ({marks})",
+                [worker_id, *ids],
+            ).fetchall()
+        return [r[0] for r in held]
+
+    def complete(self, worker_id: str, results: Iterable[Tuple[str, str, Any]]) -> int:
+        """Record `(task_id, status, result)` outcomes in one transaction; returns rows updated."""
+        now = _now()
+        rows = []
+        for task_id, status, result in results:
+            if status not in ("success", "failed"):
+                raise ValueError(f"cannot complete a task with status {status!r}")
+            rows.append((status, json.dumps(result, default=str), now, task_id, worker_id))
+        if not rows:
+            return 0
+        with self._write() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "UPDATE tasks SET status = ?, result = ?, updated_at = ?, lease_owner = NULL, lease_expires = NULL "
+                "WHERE id = ? AND status = 'running' AND lease_owner = ?",
+                rows,
+            )
+            return conn.total_changes - before
+
+    def requeue_expired(self) -> Dict[str, int]:
+        now = _now()
+        exhausted = json.dumps({"error": {"code": "lease_expired", "message": "attempts exhausted"}})
+        with self._write() as conn:
+            failed = conn.execute(
+                "UPDATE tasks SET status = 'failed', result = ?, lease_owner = NULL, lease_expires = NULL, "
+                "updated_at = ? WHERE status = 'running' AND lease_expires < ? AND attempts >= ?",
+                (exhausted, now, time.time(), self.max_attempts),
+            ).rowcount
+            requeued = conn.execute(
+                "UPDATE tasks SET status = 'queued', lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE status = 'running' AND lease_expires < ?",
+                (now, time.time()),
+            ).rowcount
+        return {"requeued": requeued, "failed": failed}
+
+
+__all__ = ["TaskQueue", "DEFAULT_DB_PATH", "STATUSES"]
@@ -0,0 +1,204 @@
+import os
+import sys
+import uuid
+import signal
+import socket
+import asyncio
+import logging
+import argparse
+import importlib
+import multiprocessing
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from integrations.offload import run_sync
+from orchestrator.agents import register_default_agents
+from orchestrator.scheduler import PipelineScheduler
+from orchestrator.task_queue import TaskQueue
+
+
+log = logging.getLogger(__name__)
+
+def default_scheduler() -> PipelineScheduler:
+    scheduler = PipelineScheduler()
+    register_default_agents(scheduler)
+    return scheduler
+
+
+def _load_factory(spec: Optional[str]) -> Callable[[], PipelineScheduler]:
+    """Resolve `module:function` (importable in every worker process)."""
+    if not spec:
+        return default_scheduler
+    module, _, attr = spec.partition(":")
+    return getattr(importlib.import_module(module), attr or "default_scheduler")
+
+
+class QueueWorker:
+    """Pulls tasks from a `TaskQueue` and runs them on a `PipelineScheduler`.
+
+    - Keeps up to `concurrency` tasks in flight, claiming only what it can run.
+    - Heartbeats its leases every `lease_seconds / 3` and drops tasks whose lease
+      was lost, so a stalled worker's tasks go back to the queue, not twice.
+      A failed heartbeat (e.g. "database is locked") is logged and retried on
+      the next beat; a lease outlives two missed beats.
+    - Finished outcomes are written back in batches (`complete()`).
+    - Queue calls (blocking SQLite I/O) run on the offload pool, so the loop
+      keeps driving the running pipelines meanwhile.
+    """
+
+    def __init__(
+        self,
+        queue: TaskQueue,
+        scheduler: PipelineScheduler,
+        worker_id: Optional[str] = None,
+        concurrency: int = 4,
+        lease_seconds: float = 30.0,
+        poll_interval: float = 0.5,
+    ):
+        self.queue = queue
+        self.scheduler = scheduler
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.concurrency = max(1, concurrency)
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self._running: Dict[str, asyncio.Task] = {}
+        self._results: List[Tuple[str, str, Any]] = []
+        self._stop = asyncio.Event()
+        self.processed = 0
+        self.heartbeat_errors = 0
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    async def _execute(self, task: Dict[str, Any]) -> None:
+        try:
+            status = await self.scheduler.run(task["pipeline"], request_id=task["request_id"])
+            self._results.append((task["id"], status["status"], status))
+        except Exception as exc:
+            self._results.append((task["id"], "failed", {"error": {"code": type(exc).__name__, "message": str(exc)}}))
+
+    async def _flush(self) -> None:
+        if self._results:
+            batch, self._results = self._results, []
+            await run_sync(self.queue.complete, self.worker_id, batch)
+            self.processed += len(batch)
+
+    async def _heartbeat(self) -> None:
+        while not self._stop.is_set():
+            try:
+                await asyncio.wait_for(self._stop.wait(), self.lease_seconds / 3)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                held = set(await run_sync(self.queue.heartbeat, self.worker_id, list(self._running),
+                                          self.lease_seconds))
+                for task_id in [t for t in self._running if t not in held]:
+                    # lease lost (e.g. we stalled past expiry); someone else owns it now
+                    self._running.pop(task_id).cancel()
+                await run_sync(self.queue.requeue_expired)
+            except Exception:
+                # nothing awaits this task: an escaping error would silently end
+                # the heartbeats and let our leases expire under running tasks
+                self.heartbeat_errors += 1
+                log.exception("worker %s: heartbeat failed; retrying on the next beat", self.worker_id)
+
+    async def run(self, max_tasks: Optional[int] = None, drain: bool = False) -> int:
+        """Work until `stop()`; with `drain`, return once the queue is empty."""
+        await run_sync(self.queue.requeue_expired)
+        heartbeat = asyncio.get_running_loop().create_task(self._heartbeat())
+        try:
+            while not self._stop.is_set():
+                room = self.concurrency - len(self._running)
+                if max_tasks is not None:
+                    room = min(room, max_tasks - self.processed - len(self._running) - len(self._results))
+                claimed = await run_sync(self.queue.claim, self.worker_id, room, self.lease_seconds) if room > 0 else []
+                for task in claimed:
+                    runner = asyncio.get_running_loop().create_task(self._execute(task))
+                    self._running[task["id"]] = runner
+                    runner.add_done_callback(lambda _, tid=task["id"]: self._running.pop(tid, None))
+                if self._running:
+                    await asyncio.wait(list(self._running.values()), timeout=self.poll_interval,
+                                       return_when=asyncio.FIRST_COMPLETED)
+                elif drain and not claimed:
+                    break
+                elif not claimed:
+                    try:
+                        await asyncio.wait_for(self._stop.wait(), self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                await self._flush()
+                if max_tasks is not None and self.processed >= max_tasks:
+                    break
+        finally:
+            self._stop.set()
+            heartbeat.cancel()
+            if self._running:
+                await asyncio.gather(*self._running.values(), return_exceptions=True)
+            await self._flush()
+        return self.processed
+
+
+def _process_main(db_path: str, factory: Optional[str], concurrency: int, lease_seconds: float,
+                  poll_interval: float, drain: bool) -> None:
+    queue = TaskQueue(db_path)
+    worker = QueueWorker(queue, _load_factory(factory)(), concurrency=concurrency,
+                         lease_seconds=lease_seconds, poll_interval=poll_interval)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, worker.stop)
+            except (NotImplementedError, RuntimeError):
+                pass
+        return await worker.run(drain=drain)
+
+    asyncio.run(main())
+    queue.close()
+
+
+def run_workers(
+    db_path: Optional[str] = None,
+    processes: int = 0,
+    factory: Optional[str] = None,
+    concurrency: int = 4,
+    lease_seconds: float = 30.0,
+    poll_interval: float = 0.5,
+    drain: bool = False,
+) -> None:
+    """Start `processes` worker processes (default: one per core) on the same queue."""
+    db_path = db_path or TaskQueue().path
+    count = processes or os.cpu_count() or 1
+    # spawn, not fork: a forked child would inherit open SQLite handles and the
+    # parent's thread pools/locks in whatever state they happened to be in
+    ctx = multiprocessing.get_context("spawn")
+    procs = [
+        ctx.Process(
+            target=_process_main,
+            args=(db_path, factory, concurrency, lease_seconds, poll_interval, drain),
+            name=f"chimera-worker-{i}",
+        )
+        for i in range(count)
+    ]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run pipeline workers against the local SQLite task queue")
+    parser.add_argument("--db", help="SQLite path (default: MCP_TASK_DB or .specify/tasks.db)")
+    parser.add_argument("--processes", type=int, default=0, help="Worker processes (default: CPU count)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Tasks in flight per process")
+    parser.add_argument("--lease-seconds", type=float, default=30.0)
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    parser.add_argument("--scheduler", help="module:function returning a configured PipelineScheduler")
+    parser.add_argument("--drain", action="store_true", help="Exit once the queue is empty")
+    args = parser.parse_args(argv)
+    run_workers(args.db, args.processes, args.scheduler, args.concurrency, args.lease_seconds,
+                args.poll_interval, args.drain)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+import os
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from integrations.artifact_store import ArtifactStore
+from skills.skill_download_youtube.downloader import DEFAULT_DOWNLOAD_DIR, Downloader, DownloadError
+
+try:
+    import yt_dlp
+except ImportError:  # only needed to resolve watch pages; direct media URLs work without it
+    yt_dlp = None
+
+
+_WATCH_HOSTS = ("youtube.com", "www.youtube.com", "m.youtube.com", "youtu.be")
+
+
+def _media_url(video_url: str) -> Tuple[str, Optional[str]]:
+    """Resolve a YouTube watch URL to a direct, Range-capable media URL and a file name."""
+    if urlparse(video_url).hostname not in _WATCH_HOSTS:
+        return video_url, None
+    if yt_dlp is None:
+        raise DownloadError("resolving YouTube watch URLs requires yt-dlp (pip install yt-dlp)")
+    with yt_dlp.YoutubeDL({"quiet": True, "format": "best[ext=mp4]/best"}) as ydl:
+        info = ydl.extract_info(video_url, download=False)
+    return info["url"], f"{info['id']}.{info.get('ext') or 'mp4'}"
+
+
+def download_video(video_url: str, dest_dir: Optional[str] = None, expected_sha256: Optional[str] = None,
+                   store: Optional[ArtifactStore] = None, **options: Any) -> Dict[str, Any]:
+    """Download `video_url` and return `{"file_path", "size", "checksum", ...}`.
+
+    With `store`, the result is an artifact from the content-addressed store and
+    nothing is downloaded when that URL (or `expected_sha256`) is already stored.
+    `options` are passed to `Downloader` (chunk_size, parts, min_part_size, ...).
+    """
+    def fetch(source_url: str) -> Dict[str, Any]:
+        url, name = _media_url(source_url)
+        with Downloader(dest_dir=dest_dir, **options) as downloader:
+            path = os.path.join(downloader.dest_dir, name) if name else None
+            return downloader.download(url, path, expected_sha256=expected_sha256)
+
+    if store is None:
+        return fetch(video_url)
+    source = "youtube" if urlparse(video_url).hostname in _WATCH_HOSTS else "http"
+    artifact = store.fetch(video_url, fetch, checksum=expected_sha256, source=source)
+    return dict(artifact, file_path=artifact["media_uri"])
+
+
+__all__ = ["download_video", "Downloader", "DownloadError", "DEFAULT_DOWNLOAD_DIR"]
@@ -0,0 +1,292 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+from urllib.parse import unquote, urlparse
+
+import httpx
+
+from integrations.config import ROOT_DIR
+from integrations.resilience import RetryPolicy
+
+
+DEFAULT_DOWNLOAD_DIR = os.path.join(ROOT_DIR, ".specify", "downloads")
+
+_PART_SUFFIX = ".part"
+_STATE_SUFFIX = ".part.json"
+
+
+class DownloadError(Exception):
+    """The source could not be fetched (maps to the `download_failed` error code)."""
+
+
+class _Range:
+    __slots__ = ("start", "end", "done")
+
+    def __init__(self, start: int, end: Optional[int], done: Optional[int] = None):
+        self.start = start
+        self.end = end          # exclusive; None until a stream of unknown length ends
+        self.done = start if done is None else done
+
+    @property
+    def complete(self) -> bool:
+        return self.end is not None and self.done >= self.end
+
+
+class _Progress:
+    """Shared state of one download: per-range progress, the sha256 cursor and the resume file.
+
+    The hash is fed strictly in file order. A chunk that lands exactly at the
+    cursor is hashed straight from memory; bytes other ranges wrote ahead of it
+    are read back with `pread` (from the page cache) once the gap closes.
+    """
+
+    def __init__(self, fd: int, ranges: List[_Range], state_path: str, meta: Dict[str, Any],
+                 checkpoint_bytes: int, chunk_size: int):
+        self.fd = fd
+        self.ranges = ranges
+        self.state_path = state_path
+        self.meta = meta
+        self.checkpoint_bytes = checkpoint_bytes
+        self.chunk_size = chunk_size
+        self.sha256 = hashlib.sha256()
+        self.hashed = 0
+        self._since_checkpoint = 0
+        self.cancelled = threading.Event()
+        self._lock = threading.Lock()
+        with self._lock:
+            self._catch_up()
+
+    def wrote(self, rng: _Range, offset: int, data: bytes) -> None:
+        with self._lock:
+            rng.done = offset + len(data)
+            if offset == self.hashed:
+                self.sha256.update(data)
+                self.hashed += len(data)
+            self._catch_up()
+            self._since_checkpoint += len(data)
+            if self._since_checkpoint >= self.checkpoint_bytes:
+                self._checkpoint()
+
+    def _catch_up(self) -> None:
+        for rng in self.ranges:
+            if rng.end is not None and rng.end <= self.hashed:
+                continue
+            if rng.start > self.hashed:
+                return
+            while self.hashed < rng.done:
+                data = os.pread(self.fd, min(self.chunk_size, rng.done - self.hashed), self.hashed)
+                if not data:
+                    return
+                self.sha256.update(data)
+                self.hashed += len(data)
+            if not rng.complete:
+                return
+
+    def _checkpoint(self) -> None:
+        self._since_checkpoint = 0
+        state = dict(self.meta, parts=[[r.start, r.end, r.done] for r in self.ranges])
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp, self.state_path)
+
+    def checkpoint(self) -> None:
+        with self._lock:
+            self._checkpoint()
+
+    def restart(self, rng: _Range) -> None:
+        with self._lock:
+            rng.done = rng.start
+            self.sha256, self.hashed = hashlib.sha256(), 0
+
+
+class Downloader:
+    """Streams media to disk with bounded memory.
+
+    - Bodies are written in `chunk_size` pieces straight to a `.part` file;
+      nothing holds more than one chunk per connection.
+    - Files of at least `2 * min_part_size` bytes from servers that honour
+      `Range` are split into up to `parts` concurrent range requests.
+    - Progress is checkpointed to `<file>.part.json`, so an interrupted download
+      resumes where it stopped as long as the size and validator still match.
+    - The sha256 from the artifact schema is computed while the file is written.
+    """
+
+    def __init__(
+        self,
+        dest_dir: Optional[str] = None,
+        chunk_size: int = 1024 * 1024,
+        parts: int = 4,
+        min_part_size: int = 8 * 1024 * 1024,
+        timeout: float = 30.0,
+        retry_policy: Optional[RetryPolicy] = None,
+        headers: Optional[Dict[str, str]] = None,
+        checkpoint_bytes: int = 8 * 1024 * 1024,
+        transport: Optional[httpx.BaseTransport] = None,
+    ):
+        self.dest_dir = dest_dir or os.getenv("MCP_DOWNLOAD_DIR") or DEFAULT_DOWNLOAD_DIR
+        self.chunk_size = max(4096, chunk_size)
+        self.parts = max(1, parts)
+        self.min_part_size = max(1, min_part_size)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.checkpoint_bytes = checkpoint_bytes
+        self._client = httpx.Client(
+            timeout=timeout,
+            headers=headers,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=self.parts, max_keepalive_connections=self.parts),
+            transport=transport,
+        )
+
+    def close(self) -> None:
+        self._client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -- probing --------------------------------------------------------
+
+    def _probe(self, url: str) -> Dict[str, Any]:
+        """Size, validator and Range support, from a one-byte ranged GET."""
+        with self._client.stream("GET", url, headers={"Range": "bytes=0-0"}) as resp:
+            if resp.status_code >= 400:
+                raise DownloadError(f"GET {url} returned {resp.status_code}")
+            validator = resp.headers.get("etag") or resp.headers.get("last-modified")
+            if resp.status_code == 206:
+                total = resp.headers.get("content-range", "").rpartition("/")[2]
+                size = int(total) if total.isdigit() else None
+                return {"size": size, "validator": validator, "ranges": size is not None}
+            length = resp.headers.get("content-length")
+            return {"size": int(length) if length and length.isdigit() else None,
+                    "validator": validator, "ranges": False}
+
+    def _plan(self, size: Optional[int], ranges_ok: bool) -> List[_Range]:
+        if size is None:
+            return [_Range(0, None)]
+        if not ranges_ok or size < 2 * self.min_part_size:
+            return [_Range(0, size)]
+        count = min(self.parts, size // self.min_part_size)
+        step = -(-size // count)
+        return [_Range(s, min(size, s + step)) for s in range(0, size, step)]
+
+    @staticmethod
+    def _load_state(state_path: str, meta: Dict[str, Any]) -> Optional[List[_Range]]:
+        try:
+            with open(state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if any(state.get(k) != v for k, v in meta.items()) or meta["size"] is None or not meta["ranges"]:
+            return None
+        return [_Range(s, e, d) for s, e, d in state["parts"]]
+
+    # -- transfer -------------------------------------------------------
+
+    def _fetch(self, url: str, rng: _Range, progress: _Progress, ranged: bool) -> None:
+        attempt = 0
+        while not rng.complete:
+            headers = {}
+            if ranged:
+                headers["Range"] = f"bytes={rng.done}-{rng.end - 1}"
+            elif rng.done:
+                # no Range support: start the (single) stream over
+                progress.restart(rng)
+            try:
+                with self._client.stream("GET", url, headers=headers) as resp:
+                    if resp.status_code in self.retry_policy.status_forcelist:
+                        raise httpx.HTTPStatusError(f"{resp.status_code}", request=resp.request, response=resp)
+                    if resp.status_code >= 400:
+                        raise DownloadError(f"GET {url} returned {resp.status_code}")
+                    if ranged and resp.status_code != 206:
+                        raise DownloadError(f"{url} ignored the Range header")
+                    for data in resp.iter_bytes(self.chunk_size):
+                        if progress.cancelled.is_set():
+                            raise DownloadError("download cancelled")
+                        if rng.end is not None:
+                            data = data[:rng.end - rng.done]
+                        offset = rng.done
+                        os.pwrite(progress.fd, data, offset)
+                        progress.wrote(rng, offset, data)
+                        if rng.complete:
+                            break
+                if rng.end is None:
+                    rng.end = rng.done
+                elif not rng.complete:
+                    raise httpx.RemoteProtocolError("connection closed before the range was complete")
+            except (httpx.TransportError, httpx.HTTPStatusError) as exc:
+                if attempt >= self.retry_policy.max_retries:
+                    raise DownloadError(f"download of {url} failed: {exc}") from exc
+                time.sleep(self.retry_policy.backoff(attempt))
+                attempt += 1
+
+    def download(self, url: str, path: Optional[str] = None, expected_sha256: Optional[str] = None) -> Dict[str, Any]:
+        probe = self._probe(url)
+        if path is None:
+            name = os.path.basename(unquote(urlparse(url).path)) or hashlib.sha256(url.encode()).hexdigest()[:16]
+            path = os.path.join(self.dest_dir, name)
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        part_path, state_path = path + _PART_SUFFIX, path + _STATE_SUFFIX
+        meta = {"url": url, "size": probe["size"], "validator": probe["validator"], "ranges": probe["ranges"]}
+
+        ranges = self._load_state(state_path, meta) if os.path.exists(part_path) else None
+        resumed = sum(r.done - r.start for r in ranges) if ranges else 0
+        if ranges is None:
+            ranges = self._plan(probe["size"], probe["ranges"])
+
+        fd = os.open(part_path, os.O_RDWR | os.O_CREAT | (0 if resumed else os.O_TRUNC), 0o644)
+        try:
+            if probe["size"] is not None and not resumed:
+                os.ftruncate(fd, probe["size"])
+            progress = _Progress(fd, ranges, state_path, meta, self.checkpoint_bytes, self.chunk_size)
+            pending = [r for r in ranges if not r.complete]
+            try:
+                if len(pending) > 1:
+                    with ThreadPoolExecutor(max_workers=len(pending), thread_name_prefix="download") as pool:
+                        futures = [pool.submit(self._fetch, url, r, progress, True) for r in pending]
+                        try:
+                            for f in futures:
+                                f.result()
+                        except BaseException:
+                            progress.cancelled.set()
+                            raise
+                elif pending:
+                    self._fetch(url, pending[0], progress, probe["ranges"])
+            except BaseException:
+                if probe["ranges"]:
+                    progress.checkpoint()
+                raise
+            size = ranges[-1].end
+            if progress.hashed != size:
+                raise DownloadError(f"hashed {progress.hashed} of {size} bytes")
+            os.ftruncate(fd, size)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+        digest = progress.sha256.hexdigest()
+        if expected_sha256 and expected_sha256.split(":")[-1].lower() != digest:
+            os.remove(part_path)
+            if os.path.exists(state_path):
+                os.remove(state_path)
+            raise DownloadError(f"checksum mismatch for {url}: got sha256:{digest}")
+        os.replace(part_path, path)
+        if os.path.exists(state_path):
+            os.remove(state_path)
+        return {
+            "file_path": path,
+            "size": size,
+            "checksum": f"sha256:{digest}",
+            "parts": len(ranges),
+            "resumed_bytes": resumed,
+        }
+
+
+__all__ = ["Downloader", "DownloadError", "DEFAULT_DOWNLOAD_DIR"]
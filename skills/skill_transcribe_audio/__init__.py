@@ -0,0 +1,4 @@
+from skills.skill_transcribe_audio.engine import StubBackend, TranscriptionEngine, load_backend, transcribe_audio
+from skills.skill_transcribe_audio.segment_store import SegmentStore
+
+__all__ = ["SegmentStore", "StubBackend", "TranscriptionEngine", "load_backend", "transcribe_audio"]
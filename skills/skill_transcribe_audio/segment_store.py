@@ -0,0 +1,256 @@
+import io
+import os
+import sys
+import json
+import mmap
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, List, Union
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; filtering falls back to a pure-Python scan
+    np = None
+
+
+MAGIC = b"CHTS"
+VERSION = 1
+
+# magic, version, flags, segment count, text byte length
+_HEADER = struct.Struct("<4sHHQQ")
+_ALIGN = 8
+
+# column name, array typecode; the order is the on-disk layout
+_COLUMNS = (
+    ("start", "d"),
+    ("end", "d"),
+    ("max_end", "d"),   # running max of `end`, what makes overlap queries bisectable
+    ("confidence", "f"),
+    ("speaker", "i"),   # -1 when the segment has no speaker
+)
+
+_NO_SPEAKER = -1
+
+
+def _pad(n: int) -> int:
+    return (-n) % _ALIGN
+
+
+def _encode(segments: Iterable[Dict[str, Any]]) -> bytes:
+    rows = sorted((
+        (float(s["start"]), float(s["end"]), s.get("text") or "", s.get("confidence"), s.get("speaker"))
+        for s in segments
+    ), key=lambda row: (row[0], row[1]))
+    cols = {name: array(code) for name, code in _COLUMNS}
+    offsets = array("Q", [0])
+    text = io.BytesIO()
+    max_end = float("-inf")
+    for start, end, txt, confidence, speaker in rows:
+        if end < start:
+            raise ValueError(f"segment ends before it starts: {start} > {end}")
+        max_end = max(max_end, end)
+        cols["start"].append(start)
+        cols["end"].append(end)
+        cols["max_end"].append(max_end)
+        cols["confidence"].append(float("nan") if confidence is None else float(confidence))
+        cols["speaker"].append(_NO_SPEAKER if speaker is None else int(speaker))
+        text.write(txt.encode("utf-8"))
+        offsets.append(text.tell())
+
+    blob = text.getvalue()
+    out = io.BytesIO()
+    out.write(_HEADER.pack(MAGIC, VERSION, 0, len(rows), len(blob)))
+    for col in (*(cols[name] for name, _ in _COLUMNS), offsets):
+        if sys.byteorder != "little":
+            col.byteswap()
+        raw = col.tobytes()
+        out.write(raw + b"\0" * _pad(len(raw)))
+    out.write(blob)
+    return out.getvalue()
+
+
+class SegmentStore:
+    """Read-only columnar store for transcript segments.
+
+    - start/end/confidence/speaker live in packed typed arrays and all text in
+      one UTF-8 buffer addressed by an offsets array; nothing is a Python object
+      until a segment is asked for.
+    - The same layout is used in memory and on disk, so `open()` maps a file and
+      serves queries straight from the page cache.
+    - Segments are kept sorted by start; `between()` finds overlapping segments
+      by binary search instead of a scan.
+    - `to_segments()` / `from_segments()` round-trip the `{start,end,text,
+      confidence,speaker}` schema from specs/technical.md.
+    """
+
+    def __init__(self, buf: Union[bytes, bytearray, memoryview, mmap.mmap], _owner: Any = None):
+        view = memoryview(buf)
+        if len(view) < _HEADER.size:
+            raise ValueError("transcript buffer is truncated")
+        magic, version, _flags, count, text_len = _HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError("not a transcript segment store")
+        if version != VERSION:
+            raise ValueError(f"unsupported transcript store version {version}")
+        if sys.byteorder != "little":
+            raise ValueError("memory-mapped transcript stores require a little-endian host")
+
+        self._buf = buf
+        self._owner = _owner
+        self._view = view
+        pos = _HEADER.size
+        columns = {}
+        for name, code in (*_COLUMNS, ("offsets", "Q")):
+            length = count + 1 if name == "offsets" else count
+            size = length * array(code).itemsize
+            columns[name] = view[pos:pos + size].cast(code)
+            pos += size + _pad(size)
+        if pos + text_len > len(view):
+            raise ValueError("transcript buffer is truncated")
+        self._count = count
+        self._start = columns["start"]
+        self._end = columns["end"]
+        self._max_end = columns["max_end"]
+        self._confidence = columns["confidence"]
+        self._speaker = columns["speaker"]
+        self._offsets = columns["offsets"]
+        self._text = view[pos:pos + text_len]
+
+    # -- construction ---------------------------------------------------
+
+    @classmethod
+    def from_segments(cls, segments: Iterable[Dict[str, Any]]) -> "SegmentStore":
+        return cls(_encode(segments))
+
+    @classmethod
+    def from_json(cls, data: Union[str, bytes, Dict[str, Any], List[Dict[str, Any]]]) -> "SegmentStore":
+        """Accepts a transcribe response, its `segments` list, or either as JSON text."""
+        if isinstance(data, (str, bytes)):
+            data = json.loads(data)
+        if isinstance(data, dict):
+            data = data.get("segments") or []
+        return cls.from_segments(data)
+
+    @classmethod
+    def open(cls, path: str) -> "SegmentStore":
+        """Memory-map a file written by `save()`."""
+        f = open(path, "rb")
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            f.close()
+            raise ValueError(f"{path} is empty") from None
+        try:
+            return cls(mm, _owner=f)
+        except Exception:
+            mm.close()
+            f.close()
+            raise
+
+    def save(self, path: str) -> None:
+        tmp = path + ".tmp"
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, "wb") as f:
+            f.write(self._view)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def close(self) -> None:
+        """Release the mapping; the store is unusable afterwards."""
+        for col in (self._start, self._end, self._max_end, self._confidence, self._speaker,
+                    self._offsets, self._text, self._view):
+            col.release()
+        if isinstance(self._buf, mmap.mmap):
+            self._buf.close()
+        if self._owner is not None:
+            self._owner.close()
+            self._owner = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -- access ---------------------------------------------------------
+
+    def __len__(self) -> int:
+        return self._count
+
+    def nbytes(self) -> int:
+        return len(self._view)
+
+    def text(self, i: int) -> str:
+        return bytes(self._text[self._offsets[i]:self._offsets[i + 1]]).decode("utf-8")
+
+    def segment(self, i: int) -> Dict[str, Any]:
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        confidence = self._confidence[i]
+        speaker = self._speaker[i]
+        return {
+            "start": self._start[i],
+            "end": self._end[i],
+            "text": self.text(i),
+            # float32 storage; round so 0.98 comes back as 0.98
+            "confidence": None if confidence != confidence else round(confidence, 6),
+            "speaker": None if speaker == _NO_SPEAKER else speaker,
+        }
+
+    __getitem__ = segment
+
+    def __iter__(self):
+        return (self.segment(i) for i in range(self._count))
+
+    def to_segments(self) -> List[Dict[str, Any]]:
+        return list(self)
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_segments())
+
+    # -- queries --------------------------------------------------------
+
+    def indices_between(self, start: float, end: float) -> List[int]:
+        """Indices of segments overlapping the half-open window `[start, end)`."""
+        hi = bisect_left(self._start, end)
+        # max_end is non-decreasing, so everything before `lo` ends at or before `start`
+        lo = bisect_right(self._max_end, start, 0, hi)
+        return [i for i in range(lo, hi) if self._end[i] > start]
+
+    def between(self, start: float, end: float) -> List[Dict[str, Any]]:
+        return [self.segment(i) for i in self.indices_between(start, end)]
+
+    def at(self, t: float) -> List[Dict[str, Any]]:
+        """Segments being spoken at time `t` (`start <= t < end`)."""
+        hi = bisect_right(self._start, t)
+        lo = bisect_right(self._max_end, t, 0, hi)
+        return [self.segment(i) for i in range(lo, hi) if self._end[i] > t]
+
+    def indices_with_confidence(self, minimum: float) -> List[int]:
+        """Indices of segments with `confidence >= minimum` (vectorized when numpy is available)."""
+        if np is not None:
+            conf = np.frombuffer(self._confidence, dtype=np.float32)
+            return np.flatnonzero(conf >= minimum).tolist()
+        return [i for i, c in enumerate(self._confidence) if c >= minimum]
+
+    def with_confidence(self, minimum: float) -> List[Dict[str, Any]]:
+        return [self.segment(i) for i in self.indices_with_confidence(minimum)]
+
+    def columns(self) -> Dict[str, Any]:
+        """Zero-copy column views (numpy arrays when numpy is installed, memoryviews otherwise)."""
+        cols = {
+            "start": self._start,
+            "end": self._end,
+            "confidence": self._confidence,
+            "speaker": self._speaker,
+        }
+        if np is not None:
+            dtypes = {"d": np.float64, "f": np.float32, "i": np.int32}
+            cols = {name: np.frombuffer(col, dtype=dtypes[col.format]) for name, col in cols.items()}
+        return cols
+
+
+__all__ = ["SegmentStore", "MAGIC", "VERSION"]
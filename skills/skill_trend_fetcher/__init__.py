@@ -0,0 +1,15 @@
+from skills.skill_trend_fetcher.fetcher import TrendFetcher, default_fetcher, fetch_trends
+from skills.skill_trend_fetcher.providers import PROVIDERS, MockProvider, TrendProvider, register_provider
+from skills.skill_trend_fetcher.timeseries import TimeSeries, TrendStore
+
+__all__ = [
+    "fetch_trends",
+    "TrendFetcher",
+    "default_fetcher",
+    "TrendProvider",
+    "MockProvider",
+    "PROVIDERS",
+    "register_provider",
+    "TimeSeries",
+    "TrendStore",
+]
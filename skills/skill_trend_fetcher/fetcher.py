@@ -0,0 +1,148 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from integrations.openclaw_cache import ResponseCache
+from skills.skill_trend_fetcher.providers import PROVIDERS, TrendProvider
+from skills.skill_trend_fetcher.timeseries import TrendStore
+
+
+DEFAULT_WINDOW = timedelta(days=7)
+
+
+def _parse_time(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+class TrendFetcher:
+    """Fans a trend query out to providers concurrently and ranks the results.
+
+    - Each provider call runs on a shared thread pool; one slow or failing
+      provider only adds a warning, it does not fail the request.
+    - Results are cached per (provider, query, window) for `cache_ttl` seconds,
+      with concurrent identical lookups coalesced. A default window ending
+      "now" is rounded down to `window_granularity` so repeat calls hit.
+    - Freshly fetched samples accumulate in a (bounded) `TrendStore`, which
+      answers top-k by score.
+    """
+
+    def __init__(
+        self,
+        providers: Optional[Dict[str, TrendProvider]] = None,
+        cache_ttl: float = 300.0,
+        max_workers: int = 8,
+        store: Optional[TrendStore] = None,
+        window_granularity: float = 60.0,
+    ):
+        self.providers = PROVIDERS if providers is None else providers
+        self.cache = ResponseCache(ttl=cache_ttl, max_entries=4096)
+        self.store = store if store is not None else TrendStore()
+        self.window_granularity = window_granularity
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="trends")
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _window(self, time_range: Optional[Dict[str, Any]]) -> Tuple[datetime, datetime]:
+        time_range = time_range or {}
+        if time_range.get("to"):
+            end = _parse_time(time_range["to"])
+        else:
+            now = datetime.now(timezone.utc).timestamp()
+            end = datetime.fromtimestamp(now - now % self.window_granularity, tz=timezone.utc)
+        start = _parse_time(time_range["from"]) if time_range.get("from") else end - DEFAULT_WINDOW
+        if start > end:
+            raise ValueError("time_range.from is after time_range.to")
+        return start, end
+
+    def _fetch_one(self, name: str, query: str, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        provider = self.providers[name]
+        key = ResponseCache.key("trends", {"provider": name, "query": query,
+                                           "from": start.isoformat(), "to": end.isoformat()})
+
+        def fresh() -> List[Dict[str, Any]]:
+            # only samples straight from the provider go into the store; a cache
+            # hit would add the same points again
+            samples = provider.fetch(query, start, end)
+            self.store.add(name, samples)
+            return samples
+
+        return self.cache.get_or_call(key, fresh)
+
+    def fetch(
+        self,
+        query: str = "",
+        providers: Optional[Sequence[str]] = None,
+        time_range: Optional[Dict[str, Any]] = None,
+        top_k: int = 20,
+        score: str = "latest",
+    ) -> Dict[str, Any]:
+        names = list(providers) if providers else list(self.providers)
+        start, end = self._window(time_range)
+        warnings = [f"unknown provider: {n}" for n in names if n not in self.providers]
+        names = [n for n in names if n in self.providers]
+
+        futures = {n: self._pool.submit(self._fetch_one, n, query, start, end) for n in names}
+        keys = set()
+        for name, future in futures.items():
+            try:
+                samples = future.result()
+            except Exception as exc:
+                warnings.append(f"{name}: {type(exc).__name__}: {exc}")
+                continue
+            keys.update((name, s["subject"], s["metric"]) for s in samples)
+
+        ranked = self.store.top_k(top_k, keys, start.timestamp(), end.timestamp(), score=score)
+        trends = [
+            {
+                "provider": provider,
+                "subject": subject,
+                "metric": metric,
+                "value": int(value) if value.is_integer() else value,
+                "score": round(points, 3),
+                "sampled_at": _iso(ts),
+            }
+            for points, (provider, subject, metric), ts, value in ranked
+        ]
+        return {
+            "status": "success" if trends or not warnings else "error",
+            "trends": trends,
+            "time_range": {"from": _iso(start.timestamp()), "to": _iso(end.timestamp())},
+            "warnings": warnings,
+        }
+
+
+_default: Optional[TrendFetcher] = None
+_default_lock = threading.Lock()
+
+
+def default_fetcher() -> TrendFetcher:
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = TrendFetcher()
+        return _default
+
+
+def fetch_trends(
+    platform: Optional[str] = None,
+    query: str = "",
+    providers: Optional[Sequence[str]] = None,
+    time_range: Optional[Dict[str, Any]] = None,
+    top_k: int = 20,
+    score: str = "latest",
+) -> Dict[str, Any]:
+    """`{"trends": [...]}` for one `platform`, or several `providers` queried concurrently."""
+    if platform and not providers:
+        providers = [platform]
+    return default_fetcher().fetch(query, providers, time_range, top_k=top_k, score=score)
+
+
+__all__ = ["TrendFetcher", "default_fetcher", "fetch_trends", "DEFAULT_WINDOW"]
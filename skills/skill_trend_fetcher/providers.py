@@ -0,0 +1,83 @@
+import math
+import time
+import random
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+
+class TrendProvider:
+    """Adapter for one trend source.
+
+    `fetch()` returns samples shaped like rows of the `trends` table:
+    `{"subject", "metric", "value", "sampled_at"}` with `sampled_at` a UTC
+    `datetime`. Implementations must be thread-safe; they are called from a pool.
+    """
+
+    name = "base"
+
+    def fetch(self, query: str, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+
+class MockProvider(TrendProvider):
+    """Deterministic local provider: same (name, query, window) gives the same samples.
+
+    - `topics` subjects, each with hourly samples of `metric` across the window.
+    - `latency` seconds of simulated network time per call.
+    - `fail=True` raises, for exercising partial-failure handling.
+    """
+
+    def __init__(self, name: str, metric: str = "views", topics: int = 25, latency: float = 0.0,
+                 interval: timedelta = timedelta(hours=1), fail: bool = False):
+        self.name = name
+        self.metric = metric
+        self.topics = topics
+        self.latency = latency
+        self.interval = interval
+        self.fail = fail
+        self.calls = 0
+
+    def fetch(self, query: str, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.fail:
+            raise ConnectionError(f"{self.name} is unavailable")
+        step = self.interval.total_seconds()
+        first = datetime.fromtimestamp(-(-start.timestamp() // step) * step, tz=timezone.utc)
+        out = []
+        for i in range(self.topics):
+            subject = f"{query or 'trending'} #{i + 1}"
+            seed = hashlib.sha256(f"{self.name}|{subject}".encode()).digest()
+            rng = random.Random(seed)
+            base, period, phase = rng.randint(100, 100_000), rng.uniform(6, 48), rng.uniform(0, math.tau)
+            t = first
+            while t <= end:
+                # a function of absolute time, so overlapping windows agree on shared samples
+                hours = t.timestamp() / 3600
+                out.append({
+                    "subject": subject,
+                    "metric": self.metric,
+                    "value": round(base * (1.5 + math.sin(math.tau * hours / period + phase))),
+                    "sampled_at": t,
+                })
+                t += self.interval
+        return out
+
+
+PROVIDERS: Dict[str, TrendProvider] = {}
+
+
+def register_provider(provider: TrendProvider) -> TrendProvider:
+    """Make `provider` the adapter used for `provider.name` by the default fetcher."""
+    PROVIDERS[provider.name] = provider
+    return provider
+
+
+# No real platform adapters ship yet; these stand in until they are registered
+for _name, _metric in (("youtube", "views"), ("twitter", "mentions"), ("tiktok", "views"), ("instagram", "likes")):
+    register_provider(MockProvider(_name, metric=_metric))
+
+
+__all__ = ["TrendProvider", "MockProvider", "PROVIDERS", "register_provider"]
@@ -0,0 +1,155 @@
+import heapq
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+SeriesKey = Tuple[str, str, str]    # (provider, subject, metric)
+
+DEFAULT_RETENTION = 30 * 24 * 3600.0
+
+
+class TimeSeries:
+    """Samples of one (provider, subject, metric), sorted by time in packed arrays.
+
+    In-order appends are O(1); a late or repeated sample is placed with bisect
+    (a repeated timestamp overwrites the earlier value).
+    """
+
+    __slots__ = ("ts", "values")
+
+    def __init__(self):
+        self.ts = array("d")
+        self.values = array("d")
+
+    def add(self, ts: float, value: float) -> None:
+        if not self.ts or ts > self.ts[-1]:
+            self.ts.append(ts)
+            self.values.append(value)
+            return
+        i = bisect_left(self.ts, ts)
+        if i < len(self.ts) and self.ts[i] == ts:
+            self.values[i] = value
+        else:
+            self.ts.insert(i, ts)
+            self.values.insert(i, value)
+
+    def trim(self, before: float, keep: int) -> int:
+        """Drop samples older than `before`, then all but the newest `keep`; returns how many went."""
+        i = max(bisect_left(self.ts, before), len(self.ts) - keep)
+        if i > 0:
+            del self.ts[:i]
+            del self.values[:i]
+        return max(i, 0)
+
+    def span(self, start: Optional[float] = None, end: Optional[float] = None) -> Tuple[int, int]:
+        lo = 0 if start is None else bisect_left(self.ts, start)
+        hi = len(self.ts) if end is None else bisect_right(self.ts, end)
+        return lo, hi
+
+    def window(self, start: Optional[float] = None, end: Optional[float] = None) -> List[Tuple[float, float]]:
+        lo, hi = self.span(start, end)
+        return list(zip(self.ts[lo:hi], self.values[lo:hi]))
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+
+def _latest(series: TimeSeries, lo: int, hi: int) -> float:
+    return series.values[hi - 1]
+
+
+def _growth(series: TimeSeries, lo: int, hi: int) -> float:
+    return series.values[hi - 1] - series.values[lo]
+
+
+def _mean(series: TimeSeries, lo: int, hi: int) -> float:
+    return sum(series.values[lo:hi]) / (hi - lo)
+
+
+SCORERS = {"latest": _latest, "growth": _growth, "mean": _mean}
+
+
+class TrendStore:
+    """In-memory time series for trend samples, keyed by (provider, subject, metric).
+
+    - `add()` folds provider samples in incrementally; nothing is re-sorted.
+    - `top_k()` scores each series over a time window and keeps the best `k`
+      with a bounded heap (O(n log k)) rather than sorting every candidate.
+    - Bounded: samples more than `retention` seconds older than the newest
+      sample in the store are dropped, each series keeps at most `max_points`,
+      and past `max_series` the least recently updated series is dropped.
+    """
+
+    def __init__(self, retention: Optional[float] = DEFAULT_RETENTION, max_points: int = 10000,
+                 max_series: int = 100000):
+        self.retention = retention
+        self.max_points = max(1, max_points)
+        self.max_series = max(1, max_series)
+        self._series: "OrderedDict[SeriesKey, TimeSeries]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._newest = float("-inf")
+        self._swept = float("-inf")
+
+    def add(self, provider: str, samples: Iterable[Dict[str, Any]]) -> List[SeriesKey]:
+        touched = {}
+        with self._lock:
+            for s in samples:
+                key = (provider, s["subject"], s["metric"])
+                series = self._series.get(key)
+                if series is None:
+                    series = self._series[key] = TimeSeries()
+                else:
+                    self._series.move_to_end(key)
+                ts = s["sampled_at"].timestamp()
+                series.add(ts, float(s["value"]))
+                self._newest = max(self._newest, ts)
+                touched[key] = None
+            self._expire(touched)
+        return [key for key in touched if key in self._series]
+
+    def _expire(self, touched: Iterable[SeriesKey]) -> None:
+        cutoff = float("-inf") if self.retention is None else self._newest - self.retention
+        # every series once the cutoff has moved on a tenth of `retention`, else just the touched ones
+        if self.retention is not None and cutoff - self._swept >= self.retention / 10:
+            touched, self._swept = list(self._series), cutoff
+        for key in touched:
+            series = self._series.get(key)
+            if series is not None:
+                series.trim(cutoff, self.max_points)
+                if not len(series):
+                    del self._series[key]
+        while len(self._series) > self.max_series:
+            self._series.popitem(last=False)
+
+    def series(self, key: SeriesKey) -> Optional[TimeSeries]:
+        return self._series.get(key)
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    def top_k(
+        self,
+        k: int,
+        keys: Optional[Iterable[SeriesKey]] = None,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        score: str = "latest",
+    ) -> List[Tuple[float, SeriesKey, float, float]]:
+        """Best `k` as `(score, key, last_ts, last_value)`, highest score first."""
+        scorer = SCORERS[score]
+        with self._lock:
+            candidates = []
+            for key in (self._series if keys is None else keys):
+                series = self._series.get(key)
+                if series is None:
+                    continue
+                lo, hi = series.span(start, end)
+                if hi > lo:
+                    candidates.append((scorer(series, lo, hi), key, series.ts[hi - 1], series.values[hi - 1]))
+        return heapq.nlargest(k, candidates, key=lambda c: c[0])
+
+
+__all__ = ["DEFAULT_RETENTION", "TimeSeries", "TrendStore", "SCORERS"]
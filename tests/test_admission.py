@@ -0,0 +1,156 @@
+import asyncio
+import json
+import time
+
+from integrations.admission import (
+    DEADLINE,
+    QUEUE_FULL,
+    TIMEOUT,
+    AdmissionController,
+    AdmittingFastMCP,
+    AIMDLimit,
+    OverloadedError,
+)
+
+
+class _Telemetry:
+    def __init__(self):
+        self.events = []
+
+    def track(self, event_type, payload):
+        self.events.append((event_type, payload))
+
+
+def _controller(limit=2, **kwargs):
+    kwargs.setdefault("report_interval", 0.0)
+    return AdmissionController(AIMDLimit(initial=limit, min_limit=1, max_limit=limit), **kwargs)
+
+
+def test_aimd_backs_off_once_per_interval_and_grows_when_busy():
+    limit = AIMDLimit(initial=10, max_limit=20, latency_target=0.05, backoff=0.5)
+    limit.on_sample(0.2, in_flight=10)
+    limit.on_sample(0.2, in_flight=10)    # same congestion episode
+    assert limit.value == 5
+    time.sleep(0.06)
+    limit.on_sample(0.01, in_flight=1, dropped=True)
+    assert limit.value == 2
+    for _ in range(20):
+        limit.on_sample(0.01, in_flight=2)
+    assert limit.value > 2
+    before = limit._limit
+    limit.on_sample(0.01, in_flight=0)    # idle: no evidence more room is needed
+    assert limit._limit == before
+
+
+def test_global_limit_queues_excess_calls():
+    ctl = _controller(limit=2)
+    active, peak = [], []
+
+    async def call(i):
+        async with ctl.admit("work"):
+            active.append(i)
+            peak.append(len(active))
+            await asyncio.sleep(0.01)
+            active.remove(i)
+        return i
+
+    async def main():
+        return await asyncio.gather(*(call(i) for i in range(6)))
+
+    assert asyncio.run(main()) == list(range(6))
+    assert max(peak) == 2
+    stats = ctl.stats()
+    assert stats["admitted"] == 6 and stats["queued"] == 4 and stats["shed"] == 0 and stats["in_flight"] == 0
+
+
+def test_per_tool_cap_does_not_block_other_tools():
+    ctl = _controller(limit=4, tool_limits={"slow": 1})
+    order = []
+
+    async def call(tool, delay):
+        async with ctl.admit(tool):
+            await asyncio.sleep(delay)
+        order.append(tool)
+
+    async def main():
+        await asyncio.gather(call("slow", 0.05), call("slow", 0.05), call("fast", 0.0))
+
+    asyncio.run(main())
+    assert order == ["fast", "slow", "slow"]
+
+
+def test_sheds_when_queue_full_or_deadline_cannot_be_met():
+    telemetry = _Telemetry()
+    ctl = _controller(limit=1, max_queue=1, queue_timeout=0.05, telemetry=telemetry)
+
+    async def hold(delay):
+        async with ctl.admit("t"):
+            await asyncio.sleep(delay)
+
+    async def main():
+        holder = asyncio.ensure_future(hold(0.2))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(hold(0))
+        await asyncio.sleep(0)
+        try:
+            await ctl.acquire("t")
+        except OverloadedError as exc:
+            full = exc
+        try:
+            await waiter
+        except OverloadedError as exc:
+            timed_out = exc
+        await holder
+        return full, timed_out
+
+    full, timed_out = asyncio.run(main())
+    assert full.reason == QUEUE_FULL and timed_out.reason == TIMEOUT
+    info = json.loads(str(full))
+    assert info["error"] == "overloaded" and info["tool"] == "t" and info["queued"] == 1
+    assert ctl.stats()["shed_by_tool"] == {"t": {QUEUE_FULL: 1, TIMEOUT: 1}}
+    assert telemetry.events and telemetry.events[0][0] == "admission.shed"
+
+    # once calls are known to take ~0.2s, a 0.01s budget is rejected without queueing
+    async def early():
+        holder = asyncio.ensure_future(hold(0.05))
+        await asyncio.sleep(0)
+        try:
+            await ctl.acquire("t", deadline=0.01)
+        except OverloadedError as exc:
+            return exc
+        finally:
+            await holder
+
+    exc = asyncio.run(early())
+    assert exc.reason == DEADLINE and exc.retry_after > 0.01
+
+
+def test_fastmcp_dispatch_goes_through_admission():
+    ctl = _controller(limit=1, max_queue=0, exempt=("status",))
+    mcp = AdmittingFastMCP("test", admission=ctl)
+
+    @mcp.tool()
+    async def slow() -> str:
+        await asyncio.sleep(0.05)
+        return "done"
+
+    @mcp.tool()
+    def status() -> int:
+        return ctl.in_flight
+
+    async def main():
+        first = asyncio.ensure_future(mcp.call_tool("slow", {}))
+        await asyncio.sleep(0.01)
+        try:
+            await mcp.call_tool("slow", {})
+            shed = None
+        except OverloadedError as exc:
+            shed = exc
+        in_flight = await mcp.call_tool("status", {})
+        await first
+        return shed, in_flight
+
+    shed, in_flight = asyncio.run(main())
+    assert shed is not None and shed.reason == QUEUE_FULL
+    assert "1" in json.dumps(in_flight, default=str)
+    assert ctl.stats()["completed"] == 1
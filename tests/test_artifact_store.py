@@ -0,0 +1,91 @@
+import os
+
+from integrations.artifact_store import ArtifactStore
+
+
+def _file(path, data):
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_fetch_skips_known_urls_and_dedups_content(tmp_path):
+    store = ArtifactStore(str(tmp_path / "store"))
+    downloads = []
+
+    def download(url):
+        downloads.append(url)
+        return {"file_path": _file(tmp_path / f"dl{len(downloads)}", b"same bytes")}
+
+    first = store.fetch("https://a/1", download)
+    again = store.fetch("https://a/1", download)
+    mirror = store.fetch("https://mirror/1", download)
+    assert downloads == ["https://a/1", "https://mirror/1"]
+    assert (first["cached"], again["cached"]) == (False, True)
+    assert again["id"] == first["id"]
+    assert mirror["checksum"] == first["checksum"] and mirror["media_uri"] == first["media_uri"]
+    assert store.stats()["blobs"] == 1 and store.stats()["artifacts"] == 2
+    # the downloaded temp files are gone; only the blob remains
+    assert not os.path.exists(tmp_path / "dl1")
+
+    with store.open(first["checksum"]) as view:
+        assert isinstance(view, memoryview)
+        assert bytes(view[:4]) == b"same"
+
+
+def test_put_file_hardlinks_and_known_checksum_skips_download(tmp_path):
+    store = ArtifactStore(str(tmp_path / "store"))
+    src = _file(tmp_path / "video.mp4", b"x" * 1000)
+    artifact = store.put_file(src, source_url="https://b/1")
+    assert os.stat(src).st_ino == os.stat(artifact["media_uri"]).st_ino
+
+    def download(url):
+        raise AssertionError("should not download")
+
+    reused = store.fetch("https://c/1", download, checksum=artifact["checksum"])
+    assert reused["cached"] and reused["checksum"] == artifact["checksum"]
+
+
+def test_unreferenced_blobs_are_evicted_lru_under_the_size_cap(tmp_path):
+    store = ArtifactStore(str(tmp_path / "store"), max_bytes=2500)
+    a = store.put_file(_file(tmp_path / "a", b"a" * 1000))
+    b = store.put_file(_file(tmp_path / "b", b"b" * 1000))
+    store.release(a["id"])
+    store.release(b["id"])
+    store.touch(a["checksum"])  # a is now more recently used than b
+    c = store.put_file(_file(tmp_path / "c", b"c" * 1000))
+    assert store.stats()["bytes"] == 2000
+    assert store.has(a["checksum"]) and store.has(c["checksum"])
+    assert not store.has(b["checksum"])
+    # referenced blobs are never evicted, even over the cap
+    assert store.evict(max_bytes=0) == 1000
+    assert store.has(c["checksum"])
+
+
+def test_blob_evicted_between_ingest_and_link_is_restored(tmp_path):
+    store = ArtifactStore(str(tmp_path / "store"))
+    other = ArtifactStore(str(tmp_path / "store"))    # e.g. another thread or process
+    first = store.put_file(_file(tmp_path / "a", b"shared"))
+    store.release(first["id"])
+    ingest, evicted = store._ingest, []
+
+    def ingest_then_evict(path, digest):
+        ingest(path, digest)    # the blob is still there, so nothing is copied...
+        if not evicted:
+            evicted.append(other.evict(max_bytes=0))    # ...and it is evicted before the link
+
+    store._ingest = ingest_then_evict
+    second = store.put_file(_file(tmp_path / "b", b"shared"))
+    with store.open(second["checksum"]) as view:
+        assert bytes(view) == b"shared"
+    assert store.stats()["blobs"] == 1
+
+
+def test_fetch_by_checksum_downloads_again_if_the_blob_was_evicted(tmp_path):
+    store = ArtifactStore(str(tmp_path / "store"))
+    first = store.put_file(_file(tmp_path / "a", b"payload"))
+    store.release(first["id"])
+    has = store.has
+    store.has = lambda checksum: has(checksum) and store.evict(max_bytes=0) >= 0
+    artifact = store.fetch("https://b/1", lambda url: {"file_path": _file(tmp_path / "dl", b"payload")},
+                           checksum=first["checksum"])
+    assert artifact["cached"] is False and os.path.exists(artifact["media_uri"])
@@ -0,0 +1,54 @@
+import asyncio
+
+from benchmarks.harness import compare, latency_summary, percentile
+from benchmarks.load import TelemetrySink, run_scenario
+from benchmarks.micro import bench_openclaw_invoke, bench_policy_evaluate, bench_telemetry_track
+
+
+def test_percentile_and_summary():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([], 50) == 0.0
+    summary = latency_summary([0.001] * 9 + [0.1], duration_s=0.5, errors=1)
+    assert summary["requests"] == 10 and summary["errors"] == 1 and summary["rps"] == 20.0
+    assert summary["p50_ms"] == 1.0 and summary["p99_ms"] == 100.0
+
+
+def test_compare_flags_regressions_by_direction():
+    baseline = {"scenarios": {
+        "a": {"rps": 100.0, "p50_ms": 10.0, "p99_ms": 20.0, "max_ms": 30.0},
+        "gone": {"rps": 1.0},
+    }}
+    result = {"scenarios": {
+        "a": {"rps": 70.0, "p50_ms": 11.0, "p99_ms": 29.0, "max_ms": 300.0},
+        "new": {"rps": 1.0},
+    }}
+    regressions = compare(result, baseline, tolerance=0.25)
+    # rps fell 30%; p50 +10% is within tolerance, p99 +45% within the wider tail band,
+    # and max_ms is informational only
+    assert [(r["scenario"], r["metric"]) for r in regressions] == [("a", "rps")]
+    assert regressions[0]["change"] == -0.3
+    assert compare(result, baseline, tolerance=0.5) == []
+
+
+def test_micro_benchmarks_report_per_op_cost():
+    track = bench_telemetry_track(iterations=500)
+    assert track["ops_per_s"] > 0 and track["dropped"] == 0
+    invoke = bench_openclaw_invoke(iterations=50)
+    assert invoke["us_per_op"] > 0 and invoke["raw_us_per_op"] > 0 and invoke["overhead_us"] >= 0
+    policy = bench_policy_evaluate(iterations=2, segments=200, rules=20)
+    assert policy["segments_per_s"] > 0 and policy["speedup_vs_regex"] > 1
+
+
+def test_load_scenario_drives_main_over_stdio():
+    sink = TelemetrySink()
+    try:
+        out = asyncio.run(run_scenario("planner_agent", concurrency=4, payload_bytes=64, requests=20,
+                                       base_url="http://127.0.0.1:9", sink=sink, warmup=2))
+    finally:
+        sink.close()
+    assert out["requests"] == 20 and out["errors"] == 0
+    assert out["p50_ms"] > 0 and out["p50_ms"] <= out["p99_ms"]
+    assert out["server_p50_ms"] is not None
+    assert out["telemetry_bytes_per_call"] > 0
@@ -0,0 +1,108 @@
+import hashlib
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from integrations.artifact_store import ArtifactStore
+from integrations.resilience import RetryPolicy
+from skills.skill_download_youtube import Downloader, DownloadError, download_video
+
+PAYLOAD = os.urandom(3 * 1024 * 1024 + 123)
+DIGEST = "sha256:" + hashlib.sha256(PAYLOAD).hexdigest()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    ranges = True
+    fail_after = None   # bytes to send on each response before dropping the connection
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        type(self).requests.append(self.headers.get("Range"))
+        start, end = 0, len(PAYLOAD)
+        header = self.headers.get("Range")
+        if self.ranges and header:
+            first, _, last = header.removeprefix("bytes=").partition("-")
+            start, end = int(first), (int(last) + 1 if last else len(PAYLOAD))
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end - 1}/{len(PAYLOAD)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(end - start))
+        self.send_header("ETag", '"v1"')
+        self.end_headers()
+        body = PAYLOAD[start:end]
+        if self.fail_after is not None and len(body) > self.fail_after:
+            self.wfile.write(body[:self.fail_after])
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    handler = type("Handler", (_Handler,), {"requests": []})
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield handler, f"http://127.0.0.1:{httpd.server_address[1]}/media/video.mp4"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_parallel_ranges_and_incremental_checksum(server, tmp_path):
+    handler, url = server
+    result = download_video(url, dest_dir=str(tmp_path), chunk_size=64 * 1024, parts=4, min_part_size=512 * 1024)
+    assert result["parts"] == 4
+    assert result["checksum"] == DIGEST
+    assert result["file_path"] == str(tmp_path / "video.mp4")
+    assert _read(result["file_path"]) == PAYLOAD
+    assert sorted(os.listdir(tmp_path)) == ["video.mp4"]
+    assert len([r for r in handler.requests if r != "bytes=0-0"]) == 4
+
+
+def test_interrupted_download_resumes(server, tmp_path):
+    handler, url = server
+    handler.fail_after = 256 * 1024
+    with Downloader(str(tmp_path), chunk_size=64 * 1024, parts=3, min_part_size=512 * 1024,
+                    retry_policy=RetryPolicy(max_retries=0)) as dl:
+        with pytest.raises(DownloadError):
+            dl.download(url)
+    assert os.path.exists(tmp_path / "video.mp4.part.json")
+
+    handler.fail_after = None
+    with Downloader(str(tmp_path), chunk_size=64 * 1024, parts=3, min_part_size=512 * 1024) as dl:
+        result = dl.download(url, expected_sha256=DIGEST)
+    assert result["resumed_bytes"] >= 256 * 1024
+    assert _read(result["file_path"]) == PAYLOAD
+
+
+def test_servers_without_range_support_stream_once(server, tmp_path):
+    handler, url = server
+    handler.ranges = False
+    result = download_video(url, dest_dir=str(tmp_path), chunk_size=64 * 1024, min_part_size=512 * 1024)
+    assert result["parts"] == 1
+    assert result["checksum"] == DIGEST
+    with pytest.raises(DownloadError):
+        download_video(url, dest_dir=str(tmp_path), expected_sha256="sha256:" + "0" * 64)
+
+
+def test_artifact_store_skips_repeat_downloads(server, tmp_path):
+    handler, url = server
+    store = ArtifactStore(str(tmp_path / "artifacts"))
+    first = download_video(url, dest_dir=str(tmp_path / "dl"), store=store)
+    count = len(handler.requests)
+    second = download_video(url, dest_dir=str(tmp_path / "dl"), store=store)
+    assert len(handler.requests) == count
+    assert second["cached"] and second["file_path"] == first["file_path"]
+    assert first["checksum"] == DIGEST
+    assert _read(second["file_path"]) == PAYLOAD
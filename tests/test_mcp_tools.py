@@ -0,0 +1,47 @@
+import asyncio
+import threading
+import time
+
+import httpx
+from mcp.server.fastmcp import FastMCP
+
+from integrations.offload import offload
+from integrations.openclaw_integration import OpenClawClient, register_openclaw_tools
+
+
+def test_openclaw_tools_do_not_serialize_on_the_server_loop():
+    async def handler(request):
+        await asyncio.sleep(0.2)
+        return httpx.Response(200, json={"ok": True})
+
+    mcp = FastMCP("test")
+    client = OpenClawClient(base_url="http://openclaw.test", config={}, async_transport=httpx.MockTransport(handler))
+    register_openclaw_tools(mcp, client)
+
+    async def main():
+        start = time.perf_counter()
+        await asyncio.gather(*(mcp.call_tool("openclaw_invoke", {"endpoint": "/x", "payload": {"i": i}}) for i in range(5)))
+        return time.perf_counter() - start
+
+    assert asyncio.run(main()) < 0.6
+
+
+def test_offload_runs_sync_tool_off_the_loop():
+    mcp = FastMCP("test")
+    loop_thread = []
+
+    @mcp.tool()
+    @offload
+    def slow(n: int) -> int:
+        loop_thread.append(threading.current_thread().name)
+        time.sleep(0.1)
+        return n * 2
+
+    async def main():
+        return await asyncio.gather(*(mcp.call_tool("slow", {"n": i}) for i in range(4)))
+
+    start = time.perf_counter()
+    results = asyncio.run(main())
+    assert time.perf_counter() - start < 0.35
+    assert [r[1]["result"] for r in results] == [0, 2, 4, 6]
+    assert all(name.startswith("mcp-offload") for name in loop_thread)
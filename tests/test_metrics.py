@@ -0,0 +1,50 @@
+import asyncio
+import inspect
+
+from integrations.metrics import LogHistogram, MetricsRegistry, instrument, upstream_timer
+
+
+def test_histogram_percentiles_are_within_bucket_error():
+    h = LogHistogram(sub_bits=4)
+    for v in range(1, 10001):
+        h.record(v)
+    snap = h.snapshot()
+    assert snap["count"] == 10000
+    assert snap["min"] == 1 and snap["max"] == 10000
+    assert abs(snap["p50"] - 5000) / 5000 < 1 / 16
+    assert abs(snap["p99"] - 9900) / 9900 < 1 / 16
+
+
+def test_instrument_records_sync_and_async_tools():
+    reg = MetricsRegistry()
+
+    @instrument(registry=reg)
+    def echo(text: str) -> str:
+        with upstream_timer():
+            pass
+        return text
+
+    @instrument(registry=reg)
+    async def aecho(text: str) -> str:
+        return text
+
+    @instrument(registry=reg)
+    def boom() -> None:
+        raise RuntimeError("x")
+
+    assert list(inspect.signature(echo).parameters) == ["text"]
+    assert inspect.iscoroutinefunction(aecho)
+    echo(text="hello")
+    asyncio.run(aecho(text="hi"))
+    try:
+        boom()
+    except RuntimeError:
+        pass
+
+    tools = reg.snapshot()["tools"]
+    assert tools["echo"]["calls"] == 1
+    assert tools["echo"]["request_bytes"]["max"] == len('{"text":"hello"}')
+    assert tools["echo"]["upstream_ms"]["count"] == 1
+    assert tools["aecho"]["calls"] == 1
+    assert tools["boom"]["errors"] == 1
+    assert tools["boom"]["in_flight"] == 0
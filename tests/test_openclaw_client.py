@@ -0,0 +1,403 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from integrations.openclaw_cache import ResponseCache
+from integrations.openclaw_integration import OpenClawClient
+from integrations.rate_limit import HybridSemaphore, TokenBucket
+from integrations.resilience import CircuitBreaker, CircuitOpenError, DeadlineExceeded, RetryPolicy
+
+
+def _client(handler, **kwargs):
+    transport = httpx.MockTransport(handler)
+    kwargs.setdefault("config", {})
+    return OpenClawClient(base_url="http://openclaw.test", transport=transport, async_transport=transport, **kwargs)
+
+
+def test_invoke_reuses_one_pooled_client():
+    seen = []
+    client = _client(lambda r: seen.append(r.url.path) or httpx.Response(200, json={"ok": True}))
+    pooled = client._http()
+    assert client.invoke("/predict", {"x": 1}) == {"ok": True}
+    assert client.invoke("analyze", {"x": 2}) == {"ok": True}
+    assert client._http() is pooled
+    assert seen == ["/predict", "/analyze"]
+
+
+def test_limits_come_from_config():
+    client = OpenClawClient(base_url="http://openclaw.test", config={"rate_limits": {"requests_per_minute": 60, "concurrent_requests": 3}})
+    assert client.limits.max_connections == 3
+    assert client.rate_limiter.semaphore is not None
+    assert client.rate_limiter.bucket.rate == 1.0
+
+
+def test_token_bucket_reserves_in_order():
+    bucket = TokenBucket(rate=10.0, burst=2)
+    waits = [bucket.reserve() for _ in range(4)]
+    assert waits[:2] == [0.0, 0.0]
+    assert 0.09 < waits[2] < 0.11 and 0.19 < waits[3] < 0.21
+
+
+def test_semaphore_caps_threads_and_coroutines_together():
+    sem = HybridSemaphore(2)
+    active = []
+    peak = []
+
+    def worker():
+        sem.acquire()
+        active.append(1)
+        peak.append(len(active))
+        time.sleep(0.02)
+        active.pop()
+        sem.release()
+
+    async def aworker():
+        await sem.acquire_async()
+        active.append(1)
+        peak.append(len(active))
+        await asyncio.sleep(0.02)
+        active.pop()
+        sem.release()
+
+    async def main():
+        await asyncio.gather(*(aworker() for _ in range(4)))
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    asyncio.run(main())
+    for t in threads:
+        t.join()
+    assert max(peak) <= 2
+    assert len(peak) == 8
+
+
+def test_cache_hits_and_bypasses_non_idempotent_methods(tmp_path):
+    calls = []
+
+    def handler(request):
+        calls.append(request.method)
+        return httpx.Response(200, json={"n": len(calls)})
+
+    client = _client(handler, cache=ResponseCache(ttl=60, max_entries=2, disk_dir=str(tmp_path)))
+    assert client.predict({"x": 1}) == {"n": 1}
+    assert client.predict({"x": 1}) == {"n": 1}
+    assert client.invoke("/predict", {"x": 1}, method="POST") == {"n": 2}
+    assert client.invoke("/predict", {"x": 1}, method="POST") == {"n": 3}
+
+    client.cache.clear()
+    assert client.predict({"x": 1}) == {"n": 1}  # promoted back from disk
+    stats = client.stats()["cache"]
+    assert stats["hits"] == 2 and stats["disk_hits"] == 1 and stats["misses"] == 1
+
+
+def test_concurrent_identical_calls_are_coalesced():
+    async def handler(request):
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"ok": True})
+
+    transport = httpx.MockTransport(handler)
+    client = OpenClawClient(base_url="http://openclaw.test", config={}, async_transport=transport, cache=ResponseCache())
+
+    async def main():
+        return await asyncio.gather(*(client.analyze_async("/analyze", {"text": "hi"}) for _ in range(10)))
+
+    assert asyncio.run(main()) == [{"ok": True}] * 10
+    stats = client.cache.stats()
+    assert stats["misses"] == 1 and stats["coalesced"] == 9
+
+
+
+def test_cancelling_the_first_caller_leaves_coalesced_callers_running(tmp_path):
+    cache = ResponseCache(disk_dir=str(tmp_path))
+    calls = []
+
+    async def upstream():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"ok": True}
+
+    async def main():
+        first = asyncio.ensure_future(cache.get_or_call_async("k", upstream))
+        await asyncio.sleep(0.01)
+        followers = [asyncio.ensure_future(cache.get_or_call_async("k", upstream)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        first.cancel()
+        results = await asyncio.gather(*followers)
+        return first.cancelled(), results
+
+    assert asyncio.run(main()) == (True, [{"ok": True}] * 3)
+    assert len(calls) == 1 and cache.stats()["coalesced"] == 3
+    cache.clear()
+    assert asyncio.run(cache.get_async("k")) == {"ok": True}    # written to disk off the loop
+
+
+def test_disk_tier_is_bounded(tmp_path):
+    cache = ResponseCache(max_entries=1, disk_dir=str(tmp_path), max_disk_entries=3)
+    for i in range(5):
+        cache.put(f"{i:02d}", {"n": i})
+    cache.get("02")     # recently used: kept
+    cache.put("05", {"n": 5})
+    files = sorted(p.name for p in tmp_path.rglob("*.json"))
+    assert files == ["02.json", "04.json", "05.json"]
+    stats = cache.stats()
+    assert stats["disk_entries"] == 3 and stats["disk_evictions"] == 3
+
+    # a fresh instance picks up what is already on disk
+    small = ResponseCache(disk_dir=str(tmp_path), max_disk_bytes=1)
+    small.put("06", {"n": 6})
+    assert [p.name for p in tmp_path.rglob("*.json")] == ["06.json"]
+
+def test_invoke_many_keeps_order_and_reports_per_item_errors():
+    async def handler(request):
+        body = json.loads(request.content)
+        if body["i"] == 2:
+            return httpx.Response(500)
+        await asyncio.sleep(0.01 * (5 - body["i"]))
+        return httpx.Response(200, json={"i": body["i"]})
+
+    transport = httpx.MockTransport(handler)
+    client = OpenClawClient(
+        base_url="http://openclaw.test", config={}, async_transport=transport, retry_policy=RetryPolicy(max_retries=0)
+    )
+    results = client.invoke_many("/analyze", [{"i": i} for i in range(5)], concurrency=3)
+
+    assert [r["ok"] for r in results] == [True, True, False, True, True]
+    assert [r["result"]["i"] for r in results if r["ok"]] == [0, 1, 3, 4]
+    assert results[2]["error"]["status"] == 500
+
+
+def test_mock_batch_endpoint():
+    from integrations.openclaw_api import app
+
+    client = OpenClawClient(base_url="http://openclaw.test", config={}, async_transport=httpx.ASGITransport(app=app))
+    payload = {"items": [{"text": "a b"}, {"text": "c"}]}
+    (out,) = client.invoke_many("/analyze/batch", [payload])
+    assert out["ok"] and out["result"]["count"] == 2
+    assert [r["tokens"] for r in out["result"]["results"]] == [2, 1]
+
+
+def test_analyze_stream_yields_running_counts_then_final_result():
+    from integrations.openclaw_api import app
+
+    client = OpenClawClient(base_url="http://openclaw.test", config={}, async_transport=httpx.ASGITransport(app=app))
+    pieces = ["hello wor", "ld foo ", "bar " * 10]
+
+    async def collect():
+        async def text():
+            for piece in pieces:
+                yield piece
+        return [item async for item in client.analyze_stream(text(), meta={"id": "t1"}, chunk_size=8)]
+
+    items = asyncio.run(collect())
+    *partials, final = items
+    full = "".join(pieces)
+    assert [p["chunk_length"] for p in partials] == [8, 1, 7, 8, 8, 8, 8, 8]
+    assert partials[1]["chunk_words"] == 0    # "r" finishes "wo" from the previous chunk
+    assert [p["tokens"] for p in partials] == sorted(p["tokens"] for p in partials)
+    assert final["done"] and final["tokens"] == len(full.split()) == 13
+    assert final["input"] == {"meta": {"id": "t1"}, "length": len(full)}
+    assert final["summary"] == full[:200]
+
+
+def test_analyze_stream_parses_sse_and_surfaces_rejected_uploads():
+    def handler(request):
+        body = b"".join(request.stream)
+        if b"bad" in body:
+            return httpx.Response(200, content=b'{"error": "invalid request stream", "detail": "x"}\n')
+        return httpx.Response(200, headers={"Content-Type": "text/event-stream"},
+                              content=b'event: partial\ndata: {"tokens": 1}\n\ndata: {"done": true, "tokens": 1}\n\n')
+
+    client = _client(handler)
+
+    async def collect(text):
+        return [item async for item in client.analyze_stream(text)]
+
+    assert asyncio.run(collect("a")) == [{"tokens": 1}, {"done": True, "tokens": 1}]
+    try:
+        asyncio.run(collect("bad"))
+        assert False, "expected ValueError"
+    except ValueError as exc:
+        assert "invalid request stream" in str(exc)
+    assert client._breaker("/analyze/stream").state == "closed"
+
+
+def test_retries_forcelisted_status_then_succeeds():
+    statuses = iter([503, 502, 200])
+    client = _client(
+        lambda r: httpx.Response(next(statuses), json={"ok": True}),
+        retry_policy=RetryPolicy(max_retries=3, backoff_factor=0.001),
+    )
+    assert client.invoke("/predict", {}) == {"ok": True}
+
+
+def test_breaker_opens_fails_fast_and_reports_transitions():
+    changes = []
+
+    class Telemetry:
+        def track(self, event_type, payload):
+            changes.append((event_type, payload["from"], payload["to"]))
+
+    calls = []
+    client = _client(
+        lambda r: calls.append(1) or httpx.Response(500),
+        retry_policy=RetryPolicy(max_retries=0),
+        telemetry=Telemetry(),
+        config={"circuit_breaker": {"min_calls": 3, "reset_timeout": 0.05}},
+    )
+    for _ in range(3):
+        try:
+            client.invoke("/predict", {})
+        except httpx.HTTPStatusError:
+            pass
+    try:
+        client.invoke("/predict", {})
+        assert False, "expected the breaker to be open"
+    except CircuitOpenError:
+        pass
+    assert len(calls) == 3
+    assert changes == [("openclaw.circuit.state", "closed", "open")]
+
+    time.sleep(0.06)
+    try:
+        client.invoke("/predict", {})
+    except httpx.HTTPStatusError:
+        pass
+    assert [c[2] for c in changes] == ["open", "half_open", "open"]
+
+
+def test_breaker_half_open_probe_closes_on_success():
+    breaker = CircuitBreaker("x", min_calls=1, reset_timeout=0.0)
+    breaker.before_call()
+    breaker.record(False, 0.01)
+    assert breaker.state == "half_open"
+    breaker.before_call()
+    breaker.record(True, 0.01)
+    assert breaker.state == "closed"
+
+
+def test_deadline_bounds_retries():
+    client = _client(lambda r: httpx.Response(503), retry_policy=RetryPolicy(max_retries=50, backoff_factor=0.05))
+    start = time.monotonic()
+    try:
+        client.invoke("/predict", {}, deadline=0.2)
+    except (httpx.HTTPStatusError, DeadlineExceeded):
+        pass
+    assert time.monotonic() - start < 0.4
+
+
+def test_cancelled_half_open_probe_is_released():
+    slow = [True]
+
+    async def handler(request):
+        if slow[0]:
+            await asyncio.sleep(10)
+        return httpx.Response(200, json={"ok": True})
+
+    client = _client(
+        handler,
+        retry_policy=RetryPolicy(max_retries=0),
+        config={"circuit_breaker": {"min_calls": 1, "reset_timeout": 0.05}},
+    )
+    breaker = client._breaker("/predict")
+    breaker.before_call()
+    breaker.record(False, 0.01)
+
+    async def main():
+        await asyncio.sleep(0.06)
+        probe = asyncio.ensure_future(client.invoke_async("/predict", {}))
+        await asyncio.sleep(0.02)
+        assert breaker.state == "half_open"
+        probe.cancel()
+        try:
+            await probe
+            assert False, "expected the probe to be cancelled"
+        except asyncio.CancelledError:
+            pass
+        # abandoned, not failed: the probe slot is free again straight away
+        assert breaker.state == "half_open"
+        slow[0] = False
+        return await client.invoke_async("/predict", {})
+
+    assert asyncio.run(main()) == {"ok": True}
+    assert breaker.state == "closed"
+
+
+def test_cancelled_calls_do_not_count_against_a_closed_breaker():
+    async def handler(request):
+        await asyncio.sleep(10)
+
+    client = _client(handler, config={"circuit_breaker": {"min_calls": 2}})
+
+    async def main():
+        calls = [asyncio.ensure_future(client.invoke_async("/predict", {})) for _ in range(4)]
+        await asyncio.sleep(0.02)
+        for call in calls:
+            call.cancel()
+        await asyncio.gather(*calls, return_exceptions=True)
+
+    asyncio.run(main())
+    assert client._breaker("/predict").snapshot() == {"state": "closed", "calls": 0, "error_rate": 0.0,
+                                                      "slow_rate": 0.0}
+
+
+def test_time_queued_in_the_limiter_is_not_upstream_latency():
+    client = _client(
+        lambda r: httpx.Response(200, json={"ok": True}),
+        config={
+            "rate_limits": {"requests_per_minute": 240, "concurrent_requests": 1},
+            "circuit_breaker": {"slow_call_seconds": 0.5, "min_calls": 4, "slow_call_threshold": 0.5},
+        },
+    )
+
+    async def main():
+        return await asyncio.gather(*(client.invoke_async("/predict", {"i": i}) for i in range(12)))
+
+    assert asyncio.run(main()) == [{"ok": True}] * 12
+    stats = client._breaker("/predict").snapshot()
+    assert stats["state"] == "closed" and stats["calls"] == 12 and stats["slow_rate"] == 0.0
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _pooled_sockets(client):
+    pool = client._transport._pool
+    return [c._connection._network_stream.get_extra_info("socket") for c in pool.connections]
+
+
+def test_per_loop_async_pools_are_closed():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        client = OpenClawClient(base_url=f"http://127.0.0.1:{server.server_port}", config={})
+        assert [r["ok"] for r in client.invoke_many("/predict", [{"i": 1}, {"i": 2}])] == [True, True]
+        assert client._aclients == {}    # invoke_many closes the pool of its own loop
+
+        # a loop that ended without aclose(): its sockets are closed once noticed
+        assert asyncio.run(client.invoke_async("/predict", {})) == {"ok": True}
+        ((_, abandoned),) = client._aclients.values()
+        sockets = _pooled_sockets(abandoned)
+        assert sockets and all(s.fileno() != -1 for s in sockets)
+        assert asyncio.run(client.invoke_async("/predict", {})) == {"ok": True}
+        assert all(s.fileno() == -1 for s in sockets) and len(client._aclients) == 1
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,92 @@
+import json
+
+import httpx
+from fastapi.testclient import TestClient
+
+from integrations.metrics import MetricsRegistry
+from integrations.openclaw_api import app
+from integrations.openclaw_integration import OpenClawClient
+from integrations.openclaw_status import StatusPublisher
+from integrations.resilience import RetryPolicy
+
+
+def _publisher(handler, **kwargs):
+    client = OpenClawClient(base_url="http://openclaw.test", transport=httpx.MockTransport(handler),
+                            config={}, retry_policy=RetryPolicy(max_retries=0))
+    kwargs.setdefault("registry", MetricsRegistry())
+    return StatusPublisher(client, capabilities=["download", "transcribe"], max_concurrent=4, **kwargs)
+
+
+def _calls(registry, ok, failed):
+    stats = registry.tool("tool")
+    for i in range(ok + failed):
+        stats.started.add()
+        stats.wall_us.record(100)
+        if i >= ok:
+            stats.errors.add()
+
+
+def test_heartbeats_are_delta_suppressed():
+    sent = []
+    depth = [0]
+    pub = _publisher(lambda r: sent.append(json.loads(r.content)) or httpx.Response(200, json={}),
+                     queue_depth=lambda: depth[0])
+    assert pub.publish(force=True)
+    assert not pub.publish()
+    depth[0] = 2
+    assert pub.publish()
+    pub.heartbeat = 0
+    assert pub.publish()
+    assert pub.stats == {"sent": 3, "suppressed": 1, "failed": 0}
+    assert sent[1]["capacity"] == {"concurrent_tasks": 4, "max_concurrent_tasks": 4, "queue_length": 2}
+    assert sent[0]["capabilities"] == ["download", "transcribe"]
+    assert sent[0]["health"]["status"] == "healthy"
+
+
+def test_error_rate_and_saturation_degrade_health():
+    registry = MetricsRegistry()
+    depth = [0]
+    pub = _publisher(lambda r: httpx.Response(200, json={}), registry=registry, queue_depth=lambda: depth[0],
+                     min_calls=5, saturated_samples=2)
+    pub.sample()
+    _calls(registry, ok=6, failed=4)
+    health = pub.sample()["health"]
+    assert health["status"] == "degraded" and health["details"]["reasons"] == ["error_rate"]
+    assert "last_task_success_seconds" in health["details"]
+
+    pub.error_window = 0  # forget the failures
+    pub.sample()
+    depth[0] = 10
+    assert pub.sample()["health"]["status"] == "healthy"
+    assert pub.sample()["health"]["details"]["reasons"] == ["queue_saturated"]
+
+
+def test_failures_back_off_and_shutdown_sends_draining_then_offline():
+    events, sent = [], []
+    status = [503]
+
+    class Telemetry:
+        def track(self, event_type, payload):
+            events.append(event_type)
+
+    def handler(request):
+        sent.append(json.loads(request.content)["health"]["status"])
+        return httpx.Response(status[0], json={})
+
+    pub = _publisher(handler, telemetry=Telemetry())
+    assert not pub.publish(force=True)
+    assert not pub.publish()          # backing off: no request made
+    assert len(sent) == 1 and events == ["openclaw.status.error"]
+
+    status[0] = 200
+    pub.stop()
+    assert sent[1:] == ["draining", "offline"]
+
+
+def test_mock_api_records_status_per_instance():
+    api = TestClient(app)
+    payload = {"instance_id": "node-1", "health": {"status": "healthy"}, "capacity": {"concurrent_tasks": 2}}
+    assert api.post("/openclaw/status", json=payload).json() == {"accepted": True, "instance_id": "node-1"}
+    listed = api.get("/openclaw/status").json()
+    assert payload in listed["instances"]
+    assert api.post("/openclaw/status", json={"health": {}}).status_code == 422
@@ -0,0 +1,113 @@
+import asyncio
+import json
+
+import pytest
+from mcp.server.fastmcp import FastMCP
+
+from orchestrator.policy import FLAG, PASS, CompiledPolicy, PhraseMatcher, PolicyEngine, register_policy_tools
+
+
+RULES = [
+    {"id": "pii", "category": "pii", "weight": 0.9, "phrases": ["credit card number", "ssn"]},
+    {"id": "spam", "weight": 0.3, "phrases": ["act now", "free"]},
+    {"id": "hype", "weight": 0.4, "phrases": ["miracle"]},
+    {"id": "frag", "weight": 0.1, "phrases": ["coin"], "word": False},
+]
+
+
+def test_matcher_reports_overlapping_phrases():
+    matcher = PhraseMatcher(["he", "she", "his", "hers"])
+    assert sorted(matcher.scan("ushers")) == [(4, 0), (4, 1), (6, 3)]
+    assert list(PhraseMatcher([]).scan("anything")) == []
+
+
+def test_batch_decisions_confidence_and_reasons():
+    policy = CompiledPolicy(RULES, "v1")
+    segments = [
+        "My Credit\n card  number is on file",     # whitespace and case are normalised
+        "free stuff, act now! FREE",               # one rule, counted once in the score
+        {"id": "s3", "start": 4.0, "end": 6.0, "text": "a free miracle"},
+        "freedom and ssnx are not words we match",
+        "bitcoin",                                 # substring rule
+        "nothing to see",
+    ]
+    out = policy.evaluate(segments)
+    by_index = {r["index"]: r for r in out["results"]}
+    assert sorted(by_index) == [0, 1, 2, 4]
+
+    assert by_index[0]["decision"] == FLAG and by_index[0]["confidence"] == 0.9
+    assert by_index[1]["decision"] == PASS and by_index[1]["confidence"] == 0.7
+    assert by_index[1]["reasons"] == [
+        {"rule": "spam", "category": None, "weight": 0.3, "matches": ["act now", "free"], "count": 3}
+    ]
+    # noisy-or of 0.3 and 0.4 = 0.58 >= 0.5
+    assert by_index[2]["decision"] == FLAG and by_index[2]["confidence"] == 0.58
+    assert (by_index[2]["id"], by_index[2]["start"], by_index[2]["end"]) == ("s3", 4.0, 6.0)
+
+    assert out["decision"] == FLAG and out["flagged"] == 2 and out["segments"] == 6
+    assert out["confidence"] == 0.9
+    assert [r["rule"] for r in out["reasons"]] == ["pii", "hype", "spam", "frag"]
+    assert out["reasons"][2]["segments"] == 2 and out["reasons"][2]["count"] == 4
+
+    strict = policy.evaluate(segments[1:2], threshold=0.2)
+    assert strict["decision"] == FLAG and strict["confidence"] == 0.3
+    clean = policy.evaluate(["all good"])
+    assert clean["decision"] == PASS and clean["confidence"] == 1.0 and clean["results"] == []
+
+
+def test_invalid_rules_are_rejected():
+    for rules in ([{"phrases": ["x"]}], [{"id": "a", "phrases": []}], [{"id": "a", "phrases": ["x"], "weight": 2}],
+                  [{"id": "a", "phrases": ["x"]}, {"id": "a", "phrases": ["y"]}]):
+        try:
+            CompiledPolicy(rules, "v")
+            assert False, f"expected ValueError for {rules}"
+        except ValueError:
+            pass
+
+
+def test_engine_caches_compiled_rule_sets_by_version(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"version": "f1", "threshold": 0.2, "rules": RULES[1:2]}))
+    engine = PolicyEngine(path=str(path), max_compiled=2)
+
+    first = engine.compile(RULES, version="v1")
+    assert engine.compile(list(RULES), version="v1") is first     # same version and rules, cached
+    strict = engine.compile(RULES, version="v1", threshold=0.2)
+    assert strict.threshold == 0.2 and strict.matcher is first.matcher and first.threshold == 0.5
+    unversioned = engine.compile(RULES)
+    assert unversioned.version.startswith("sha256:") and engine.compile(list(RULES)) is unversioned
+
+    out = engine.evaluate(["act now"])
+    assert out["version"] == "f1" and out["decision"] == FLAG    # file threshold applies
+    assert engine.evaluate(["act now"])["version"] == "f1"
+    stats = engine.stats()
+    assert stats["compiles"] == 3 and stats["cache_hits"] == 3 and stats["evaluations"] == 2
+    assert stats["default"] == "f1" and stats["compiled"] == ["v1", unversioned.version]
+
+
+def test_caller_rule_sets_cannot_replace_the_default(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"version": "f1", "rules": RULES[:1]}))
+    engine = PolicyEngine(path=str(path), max_compiled=1)
+    assert engine.evaluate(["my ssn"])["decision"] == FLAG
+
+    # same version as the default file, harmless rules: compiled on its own
+    assert engine.evaluate(["my ssn"], rules=RULES[2:3], version="f1")["decision"] == PASS
+    assert engine.evaluate(["my ssn"])["decision"] == FLAG
+    with pytest.raises(ValueError):
+        engine.compile(RULES[1:2], version="f1")
+    # filling the caller cache does not evict the default either
+    engine.compile(RULES[1:2])
+    assert engine.evaluate(["my ssn"])["decision"] == FLAG and engine.stats()["compiles"] == 3
+
+
+def test_policy_tool_runs_through_mcp():
+    mcp = FastMCP("test")
+    register_policy_tools(mcp, PolicyEngine(path="/nonexistent"))
+
+    async def main():
+        return await mcp.call_tool("policy_evaluate", {"segments": ["ssn here", {"text": "fine"}], "rules": RULES})
+
+    (content,) = asyncio.run(main())
+    out = json.loads(content.text)
+    assert out["decision"] == FLAG and out["results"][0]["index"] == 0
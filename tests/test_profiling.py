@@ -0,0 +1,183 @@
+import asyncio
+import json
+import os
+import threading
+import time
+
+import pytest
+from mcp.server.fastmcp import FastMCP
+
+from integrations import profiling
+from integrations.metrics import MetricsRegistry, instrument
+from integrations.offload import offload
+from integrations.profiling import PROFILER, register_profiling_tools
+
+
+@pytest.fixture(autouse=True)
+def _stop_profiler():
+    # the tests drive the process-wide PROFILER; never leave a capture running
+    yield
+    PROFILER.stop()
+
+
+def _spin(seconds):
+    end = time.perf_counter() + seconds
+    n = 0
+    while time.perf_counter() < end:
+        n += 1
+    return n
+
+
+def _work(n):
+    total = 0
+    for i in range(n):
+        total += i * i
+    return total
+
+
+def _server(tmp_path, monkeypatch):
+    monkeypatch.setattr(PROFILER, "out_dir", str(tmp_path))
+    registry = MetricsRegistry()
+    mcp = FastMCP("test")
+    register_profiling_tools(mcp)
+
+    @mcp.tool()
+    @instrument(registry=registry)
+    def hot(seconds: float) -> int:
+        return _spin(seconds)
+
+    @mcp.tool()
+    @instrument(registry=registry)
+    @offload
+    def hot_offloaded(seconds: float) -> int:
+        return _spin(seconds)
+
+    @mcp.tool()
+    @instrument(registry=registry)
+    def work(n: int) -> int:
+        return _work(n)
+
+    @mcp.tool()
+    @instrument(registry=registry)
+    @offload
+    def work_offloaded(n: int) -> int:
+        return _work(n)
+
+    @mcp.tool()
+    @instrument(registry=registry)
+    async def idle() -> str:
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    return mcp
+
+
+def _call(mcp, *calls):
+    async def main():
+        return await asyncio.gather(*(mcp.call_tool(name, args) for name, args in calls))
+    return asyncio.run(main())
+
+
+def test_sampling_captures_next_n_calls_of_one_tool(tmp_path, monkeypatch):
+    mcp = _server(tmp_path, monkeypatch)
+    (content,), = _call(mcp, ("debug_profile", {"tool": "hot_offloaded", "calls": 2, "interval_ms": 1}))
+    started = json.loads(content.text)
+    assert started["status"] == "running" and started["session_id"] is None
+
+    _call(mcp, ("hot_offloaded", {"seconds": 0.1}), ("hot_offloaded", {"seconds": 0.1}), ("idle", {}))
+    _call(mcp, ("hot_offloaded", {"seconds": 0.05}))    # past N: not captured
+    out = PROFILER.wait(5)
+    assert out["status"] == "finished" and out["reason"] == "calls" and out["invocations"] == 2
+    assert out["top"][0]["frame"].startswith("_spin (tests/test_profiling.py:")
+
+    lines = open(out["path"]).read().splitlines()
+    assert lines and all(line.startswith("_server.<locals>.hot_offloaded (tests/") for line in lines)
+    stack, count = lines[0].rsplit(" ", 1)
+    assert stack.split(";")[-1] == out["top"][0]["frame"] and int(count) > 10
+    assert os.path.basename(out["path"]) == f"profile-local-{out['id']}.collapsed"
+    assert json.load(open(out["path"][:-len(".collapsed")] + ".json"))["id"] == out["id"]
+
+
+def test_trace_mode_times_stacks_on_loop_and_pool_threads(tmp_path, monkeypatch):
+    mcp = _server(tmp_path, monkeypatch)
+    started = time.perf_counter()
+    _work(200000)
+    expected_us = (time.perf_counter() - started) * 1e6
+    for tool in ("work", "work_offloaded"):
+        PROFILER.start(tool=tool, calls=1, mode="trace", session_id="s-1")
+        _call(mcp, (tool, {"n": 200000}), ("idle", {}))
+        out = PROFILER.wait(5)
+        stacks = dict(line.rsplit(" ", 1) for line in open(out["path"]).read().splitlines())
+        assert os.path.basename(out["path"]).startswith("profile-s-1-") and out["unit"] == "us"
+        assert all(s.startswith(f"_server.<locals>.{tool} (") for s in stacks)
+        # the loop makes no calls, so its whole run time is charged to `_work`
+        leaf = [int(v) for s, v in stacks.items() if s.endswith(";" + out["top"][0]["frame"])]
+        assert out["top"][0]["frame"].startswith("_work (") and leaf[0] > expected_us * 0.5
+
+
+def test_window_capture_stop_and_single_capture_at_a_time(tmp_path, monkeypatch):
+    mcp = _server(tmp_path, monkeypatch)
+    PROFILER.start(duration=30, interval=0.001)
+    with pytest.raises(ValueError):
+        PROFILER.start(tool="hot")
+    _call(mcp, ("hot", {"seconds": 0.05}))
+    (content,), = _call(mcp, ("debug_profile", {"action": "stop"}))
+    out = json.loads(content.text)
+    assert out["status"] == "finished" and out["reason"] == "stopped" and out["samples"] > 0
+    assert any("_spin" in line for line in open(out["path"]))
+    assert not PROFILER.active
+
+    with pytest.raises(ValueError):
+        PROFILER.start(calls=3)    # calls needs a tool
+
+
+def _in_background(mcp, *calls):
+    thread = threading.Thread(target=_call, args=(mcp, *calls))
+    thread.start()
+    return thread
+
+
+def test_stopping_a_trace_waits_for_the_running_call(tmp_path, monkeypatch):
+    mcp = _server(tmp_path, monkeypatch)
+    PROFILER.start(tool="work_offloaded", duration=30, mode="trace")
+    caller = _in_background(mcp, ("work_offloaded", {"n": 2000000}))
+    time.sleep(0.05)
+    out = PROFILER.stop()
+    caller.join()
+    assert out["status"] == "finished" and out["in_flight"] == 0 and out["invocations"] == 1
+    assert out["top"][0]["frame"].startswith("_work (")
+    assert any("_work" in line for line in open(out["path"]))
+
+
+def test_a_trace_outlived_by_its_call_keeps_partial_stacks_and_unhooks(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "FINISH_GRACE", 0.05)
+    mcp = _server(tmp_path, monkeypatch)
+    PROFILER.start(tool="hot_offloaded", duration=30, mode="trace")
+    caller = _in_background(mcp, ("hot_offloaded", {"seconds": 0.5}))
+    time.sleep(0.1)
+    out = PROFILER.stop()
+    assert out["status"] == "finished" and out["in_flight"] == 1 and out["top"]
+    written = open(out["path"]).read()
+    caller.join()
+    # the straggler's tracer was merged once, at finish, and removed itself
+    assert PROFILER.status()["top"] == out["top"] and not PROFILER._tracers
+    assert written and "_spin" in written
+
+
+def test_stopping_a_trace_from_the_loop_lets_async_calls_finish(tmp_path, monkeypatch):
+    mcp = _server(tmp_path, monkeypatch)
+    PROFILER.start(tool="idle", duration=30, mode="trace")
+
+    async def main():
+        async def stop():
+            await asyncio.sleep(0.01)    # `idle` is now awaiting on this loop
+            (content,) = await mcp.call_tool("debug_profile", {"action": "stop"})
+            return json.loads(content.text)
+
+        began = time.perf_counter()
+        _, out = await asyncio.gather(mcp.call_tool("idle", {}), stop())
+        return out, time.perf_counter() - began
+
+    out, elapsed = asyncio.run(main())
+    assert out["status"] == "finished" and out["invocations"] == 1 and out["in_flight"] == 0
+    assert elapsed < 1.0
@@ -0,0 +1,87 @@
+import asyncio
+import time
+
+import pytest
+
+from orchestrator.scheduler import PipelineError, PipelineScheduler, parse_pipeline
+
+
+def test_parse_defaults_to_linear_and_rejects_cycles():
+    steps = parse_pipeline([{"agent": "download"}, {"agent": "transcribe"}])
+    assert [s.depends_on for s in steps] == [[], ["download"]]
+
+    with pytest.raises(PipelineError):
+        parse_pipeline([
+            {"id": "a", "agent": "x", "depends_on": ["b"]},
+            {"id": "b", "agent": "x", "depends_on": ["a"]},
+        ])
+
+
+def test_parallel_branches_take_the_critical_path():
+    scheduler = PipelineScheduler(max_workers=4)
+
+    async def fetch(name: str) -> dict:
+        await asyncio.sleep(0.1)
+        return {"name": name}
+
+    def join(upstream: dict) -> list:
+        time.sleep(0.05)
+        return sorted(v["name"] for v in upstream.values())
+
+    scheduler.register("fetch", fetch)
+    scheduler.register("join", join)
+    pipeline = [
+        {"id": "a", "agent": "fetch", "input": {"name": "a"}, "depends_on": []},
+        {"id": "b", "agent": "fetch", "input": {"name": "b"}, "depends_on": []},
+        {"id": "c", "agent": "fetch", "input": {"name": "c"}, "depends_on": []},
+        {"id": "j", "agent": "join", "depends_on": ["a", "b", "c"]},
+    ]
+    result = asyncio.run(scheduler.run(pipeline))
+
+    assert result["status"] == "success"
+    assert result["steps"][-1]["output"] == ["a", "b", "c"]
+    assert result["elapsed_seconds"] < 0.3
+
+
+def test_failure_skips_dependents_and_references_resolve():
+    scheduler = PipelineScheduler()
+    scheduler.register("echo", lambda value: {"value": value})
+
+    def boom(value):
+        raise RuntimeError("nope")
+
+    scheduler.register("boom", boom)
+
+    async def main():
+        submitted = await scheduler.submit([
+            {"id": "x", "agent": "echo", "input": {"value": 1}},
+            {"id": "y", "agent": "echo", "input": {"value": "$x.value"}},
+            {"id": "z", "agent": "boom", "input": {"value": 0}, "depends_on": []},
+            {"id": "w", "agent": "echo", "input": {"value": 2}, "depends_on": ["z"]},
+        ])
+        return await scheduler.wait(submitted["task_id"], timeout=5)
+
+    result = asyncio.run(main())
+    steps = {s["id"]: s for s in result["steps"]}
+    assert result["status"] == "failed"
+    assert steps["y"]["output"] == {"value": 1}
+    assert steps["z"]["error"]["code"] == "RuntimeError"
+    assert steps["w"]["status"] == "skipped"
+
+
+def test_per_agent_cap():
+    scheduler = PipelineScheduler(max_workers=8)
+    running = []
+    peak = []
+
+    async def slow(i: int) -> int:
+        running.append(i)
+        peak.append(len(running))
+        await asyncio.sleep(0.02)
+        running.remove(i)
+        return i
+
+    scheduler.register("slow", slow, max_concurrency=2)
+    pipeline = [{"id": str(i), "agent": "slow", "input": {"i": i}, "depends_on": []} for i in range(6)]
+    assert asyncio.run(scheduler.run(pipeline))["status"] == "success"
+    assert max(peak) == 2
@@ -0,0 +1,36 @@
+import os
+import sys
+import subprocess
+
+from integrations.config import ROOT_DIR
+from integrations.startup import parse_importtime
+
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     _io
+import time:      1962 |       1962 |       dotenv.parser
+import time:      1164 |      3126 |     dotenv.main
+import time:     20081 |     708472 | main
+"""
+
+
+def test_parse_importtime():
+    rows = parse_importtime(SAMPLE + "Traceback (most recent call last):\n")
+    assert [r["module"] for r in rows] == ["_io", "dotenv.parser", "dotenv.main", "main"]
+    assert rows[1] == {"module": "dotenv.parser", "self_us": 1962, "cumulative_us": 1962, "depth": 3}
+    assert rows[-1]["depth"] == 0 and rows[-1]["cumulative_us"] == 708472
+
+
+def test_status_publisher_is_skipped_without_openclaw_env():
+    env = {k: v for k, v in os.environ.items() if not k.startswith("OPENCLAW_")}
+    code = "import main; assert main.status_publisher() is None; assert main.openclaw_client.cache_info().currsize == 0"
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT_DIR, env=env, capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+
+
+def test_main_imports_without_openclaw_env():
+    env = {k: v for k, v in os.environ.items() if not k.startswith("OPENCLAW_")}
+    code = "import sys, main; assert 'yaml' not in sys.modules; assert main.openclaw_client.cache_info().currsize == 0"
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT_DIR, env=env, capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
@@ -0,0 +1,107 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+
+from mcp.server.fastmcp import FastMCP
+
+from orchestrator.scheduler import register_orchestrator_tools
+from orchestrator.task_queue import TaskQueue
+from orchestrator.worker import QueueWorker, default_scheduler, run_workers
+
+
+def test_concurrent_claims_never_overlap(tmp_path):
+    path = str(tmp_path / "tasks.db")
+    TaskQueue(path).enqueue_many([([{"agent": "planner", "input": {"task": str(i)}}], None) for i in range(200)])
+    claimed = []
+
+    def worker(n):
+        queue = TaskQueue(path)
+        while True:
+            got = queue.claim(f"w{n}", limit=7, lease_seconds=30)
+            if not got:
+                return
+            claimed.extend(t["id"] for t in got)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(claimed) == 200 == len(set(claimed))
+    assert TaskQueue(path).counts()["running"] == 200
+
+
+def test_expired_leases_are_requeued_and_stale_owner_is_ignored(tmp_path):
+    queue = TaskQueue(str(tmp_path / "tasks.db"), max_attempts=2)
+    task_id = queue.enqueue([{"agent": "planner", "input": {"task": "x"}}])
+
+    (task,) = queue.claim("a", lease_seconds=-1)
+    assert queue.requeue_expired() == {"requeued": 1, "failed": 0}
+    (task,) = queue.claim("b", lease_seconds=30)
+    assert task["attempts"] == 2
+    assert queue.heartbeat("a", [task_id]) == []
+    assert queue.complete("a", [(task_id, "success", {})]) == 0
+    assert queue.complete("b", [(task_id, "success", {"ok": True})]) == 1
+    assert queue.get(task_id)["result"] == {"ok": True}
+
+
+def test_worker_runs_pipelines_to_completion(tmp_path):
+    queue = TaskQueue(str(tmp_path / "tasks.db"))
+    ids = queue.enqueue_many([
+        ([{"agent": "planner", "input": {"task": str(i)}}, {"agent": "executor", "input": {"task": "$planner"}}], f"r{i}")
+        for i in range(5)
+    ])
+    worker = QueueWorker(queue, default_scheduler(), concurrency=3, poll_interval=0.01)
+    assert asyncio.run(worker.run(drain=True)) == 5
+    result = queue.get(ids[0])
+    assert result["status"] == "success"
+    assert result["result"]["steps"][1]["output"] == "Executing task: Planning task: 0"
+
+
+def test_worker_processes_share_the_queue(tmp_path):
+    path = str(tmp_path / "tasks.db")
+    queue = TaskQueue(path)
+    queue.enqueue_many([([{"agent": "planner", "input": {"task": str(i)}}], None) for i in range(20)])
+    run_workers(path, processes=2, poll_interval=0.01, drain=True)
+    assert queue.counts() == {"queued": 0, "running": 0, "success": 20, "failed": 0}
+
+
+def test_durable_submit_and_status_through_mcp(tmp_path):
+    queue = TaskQueue(str(tmp_path / "tasks.db"))
+    mcp = FastMCP("test")
+    register_orchestrator_tools(mcp, default_scheduler(), queue=queue)
+
+    async def main():
+        (submitted,) = await mcp.call_tool("tasks_submit", {"pipeline": [{"agent": "planner", "input": {"task": "x"}}],
+                                                            "durable": True})
+        task_id = json.loads(submitted.text)["task_id"]
+        (status,) = await mcp.call_tool("tasks_status", {"task_id": task_id})
+        return task_id, json.loads(status.text)
+
+    task_id, status = asyncio.run(main())
+    assert status["task_id"] == task_id and status["status"] == "queued"
+    assert queue.get(task_id)["pipeline"][0]["agent"] == "planner"
+
+
+def test_worker_keeps_heartbeating_after_a_failed_beat(tmp_path):
+    queue = TaskQueue(str(tmp_path / "tasks.db"))
+    (task_id,) = queue.enqueue_many([([{"agent": "slow", "input": {}}], None)])
+    scheduler = default_scheduler()
+    scheduler.register("slow", lambda: time.sleep(0.5) or "done")
+    renewed, heartbeat = [], queue.heartbeat
+
+    def flaky_heartbeat(worker_id, task_ids, lease_seconds=30.0):
+        if not renewed:
+            renewed.append(None)
+            raise sqlite3.OperationalError("database is locked")
+        held = heartbeat(worker_id, task_ids, lease_seconds)
+        renewed.extend(held)
+        return held
+
+    queue.heartbeat = flaky_heartbeat
+    worker = QueueWorker(queue, scheduler, lease_seconds=0.3, poll_interval=0.01)
+    assert asyncio.run(worker.run(drain=True)) == 1
+    assert worker.heartbeat_errors == 1 and task_id in renewed
+    assert queue.get(task_id)["status"] == "success" and queue.get(task_id)["attempts"] == 1
@@ -0,0 +1,177 @@
+import gzip
+import json
+
+import httpx
+
+from integrations.mcp_telemetry import TelemetryClient
+from integrations.telemetry_sampling import TelemetrySampler
+from integrations.telemetry_spool import TelemetrySpool
+
+
+def _client(handler, **kwargs):
+    # long flush interval so the background sender never races the test
+    kwargs.setdefault("flush_interval", 60.0)
+    kwargs.setdefault("batch_size", 1000)
+    return TelemetryClient(url="http://telemetry.test/proxy", transport=httpx.MockTransport(handler), **kwargs)
+
+
+def test_drop_oldest_and_newest_are_counted():
+    oldest = _client(lambda r: httpx.Response(200), max_queue=3)
+    newest = _client(lambda r: httpx.Response(200), max_queue=3, overflow="drop_newest")
+    for i in range(5):
+        oldest.track("evt", {"i": i})
+        newest.track("evt", {"i": i})
+
+    assert oldest.stats()["dropped_oldest"] == 2
+    assert [e["payload"]["i"] for e in oldest._buffer] == [2, 3, 4]
+    assert newest.stats()["dropped_newest"] == 2
+    assert [e["payload"]["i"] for e in newest._buffer] == [0, 1, 2]
+
+
+def test_flush_sends_gzipped_jsonrpc_batch():
+    bodies = []
+
+    def handler(request):
+        assert request.headers["Content-Encoding"] == "gzip"
+        bodies.append(json.loads(gzip.decompress(request.content)))
+        return httpx.Response(200)
+
+    client = _client(handler, compress=True, session_id="sess-1")
+    client.track("a", {"x": 1})
+    client.track("b")
+    client.flush()
+
+    assert len(bodies) == 1
+    batch = bodies[0]
+    assert [e["method"] for e in batch] == ["telemetry.emit", "telemetry.emit"]
+    assert batch[0]["params"]["session"] == "sess-1"
+    assert batch[0]["params"]["type"] == "a"
+    assert client.stats()["sent"] == 2
+
+
+def test_rejected_batch_is_not_retried():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(400)
+
+    client = _client(handler)
+    client.track("a")
+    client.flush()
+    assert len(calls) == 1
+    assert client.stats()["rejected"] == 1
+
+
+def test_spool_skips_torn_tail_and_resumes_from_ack(tmp_path):
+    spool = TelemetrySpool(root=str(tmp_path))
+    spool.append([{"i": 0}, {"i": 1}])
+    spool.seal()
+    (path,) = spool.segments()
+    with open(path, "ab") as f:
+        f.write(b'{"i": 2')  # crash mid-write
+
+    rows = list(TelemetrySpool.read(path))
+    assert [e["i"] for _, e in rows] == [0, 1]
+    TelemetrySpool.ack(path, rows[0][0])
+    assert [e["i"] for _, e in TelemetrySpool.read(path, TelemetrySpool.acked(path))] == [1]
+
+
+
+def test_spool_location_and_retention_come_from_telemetry_config(tmp_path, monkeypatch):
+    monkeypatch.delenv("MCP_TELEMETRY_SPOOL_DIR", raising=False)
+    config = tmp_path / "telemetry.yaml"
+    config.write_text(json.dumps({"storage": {"traces_dir": str(tmp_path / "traces")},
+                                  "session": {"orchestration": {"retention_runs": 2}}}))
+    spool = TelemetrySpool(config_path=str(config))
+    assert spool.root == str(tmp_path / "traces" / "spool") and spool.retention_runs == 2
+    for run in ("run-1", "run-2", "run-3"):
+        (tmp_path / "traces" / "spool" / run).mkdir(parents=True)
+    assert spool.prune() == 2
+
+    monkeypatch.setenv("MCP_TELEMETRY_SPOOL_DIR", str(tmp_path / "env"))
+    explicit = TelemetrySpool(retention_runs=7, config_path=str(config))
+    assert explicit.root == str(tmp_path / "env") and explicit.retention_runs == 7
+
+def test_failed_batches_spool_then_replay(tmp_path):
+    up = {"ok": False}
+    received = []
+
+    def handler(request):
+        if not up["ok"]:
+            return httpx.Response(503)
+        received.extend(json.loads(request.content))
+        return httpx.Response(200)
+
+    client = _client(handler, spool=TelemetrySpool(root=str(tmp_path)), replay_interval=60.0)
+    client.track("a")
+    client.flush()
+    client.track("b")
+    client.flush()
+    assert client.stats()["spooled"] == 2
+    assert received == []
+
+    up["ok"] = True
+    assert client.replay() is True
+    assert [e["params"]["type"] for e in received] == ["a", "b"]
+    assert client.stats()["replayed"] == 2
+    assert client._spool.segments() == []
+
+
+def test_sampling_keeps_errors_and_aggregates_hot_events():
+    bodies = []
+
+    def handler(request):
+        bodies.extend(json.loads(request.content))
+        return httpx.Response(200)
+
+    sampler = TelemetrySampler(sample_rate=0.0, rates={"keep.*": 1.0, "keep.some": 0.5}, seed=1,
+                               aggregate=["task.start"], max_series=2)
+    client = _client(handler, sampler=sampler)
+    for i in range(200):
+        client.track("noise", {"i": i})
+        client.track("keep.some", {"i": i})
+        client.track("task.start", {"tool": f"t{i % 3}", "task": "x" * 100})
+    client.track("keep.all", {})
+    client.track("noise.error", {"error": "boom"})
+    client.track("noise", {"error": "ValueError"})
+    client.flush()
+
+    types = [e["params"]["type"] for e in bodies]
+    assert types.count("noise") == 1 and "noise.error" in types and "keep.all" in types
+    some = [e["params"] for e in bodies if e["params"]["type"] == "keep.some"]
+    assert 60 < len(some) < 140 and all(e["sample_rate"] == 0.5 for e in some)
+
+    (counters,) = [e["params"]["payload"] for e in bodies if e["params"]["type"] == "telemetry.counters"]
+    assert counters["counters"] == [
+        {"type": "task.start", "dims": {"tool": "t0"}, "count": 67},
+        {"type": "task.start", "dims": {"tool": "t1"}, "count": 67},
+        {"type": "task.start", "other": True, "count": 66},
+    ]
+    assert counters["sampled_out"] == {"noise": 200, "keep.some": 200 - len(some)}
+    stats = client.stats()
+    assert stats["aggregated"] == 200 and stats["sampled_out"] == 400 - len(some)
+
+
+def test_payloads_are_compacted_to_a_fixed_bound():
+    sizes = []
+
+    def handler(request):
+        sizes.extend(len(json.dumps(e["params"]["payload"])) for e in json.loads(request.content))
+        return httpx.Response(200)
+
+    sampler = TelemetrySampler(max_field_bytes=256, max_items=5, max_event_bytes=1024)
+    client = _client(handler, sampler=sampler)
+    client.track("big", {"tool": "t", "task": "é" * 100000, "items": list(range(1000))})
+    client.track("wide", {"tool": "t", **{f"k{i}": "v" * 200 for i in range(100)}})
+    client.track("small", {"tool": "t", "n": 1})
+    client.flush()
+    assert all(size <= 1024 for size in sizes)
+
+    out = sampler.compact("big", {"task": "a" * 5000, "items": list(range(10))})
+    assert out["task"].startswith("a" * 256 + "...[truncated 5000 bytes sha256:")
+    assert out["items"] == [0, 1, 2, 3, 4, "[5 more items]"]
+    wide = sampler.compact("wide", {"tool": "t", **{f"k{i}": "v" * 250 for i in range(100)}})
+    assert wide["tool"] == "t" and wide["_payload"]["truncated"] is True
+    small = {"tool": "t", "n": 1}
+    assert sampler.compact("small", small) is small
@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+from skills.skill_transcribe_audio import SegmentStore
+
+
+def _segments(n, seed=7):
+    rng = random.Random(seed)
+    out, t = [], 0.0
+    for i in range(n):
+        start = t + rng.uniform(0, 0.5)
+        # every tenth segment is a long overlapping one, as diarized crosstalk produces
+        end = start + (rng.uniform(5, 30) if i % 10 == 0 else rng.uniform(0.5, 4))
+        out.append({
+            "start": start,
+            "end": end,
+            "text": f"segment {i} – héllo",
+            "confidence": round(rng.random(), 3),
+            "speaker": i % 3 if i % 7 else None,
+        })
+        t = start + rng.uniform(0.2, 3)
+    return out
+
+
+def test_round_trips_the_json_schema(tmp_path):
+    segments = _segments(200)
+    store = SegmentStore.from_json({"segments": segments, "language": "en-US"})
+    assert store.to_segments() == sorted(segments, key=lambda s: s["start"])
+
+    path = str(tmp_path / "t.seg")
+    store.save(path)
+    with SegmentStore.open(path) as mapped:
+        assert len(mapped) == 200
+        assert mapped.to_segments() == store.to_segments()
+
+
+def test_time_range_queries_match_a_full_scan():
+    segments = _segments(2000)
+    store = SegmentStore.from_segments(segments)
+    rng = random.Random(1)
+    for _ in range(200):
+        a = rng.uniform(-5, 3500)
+        b = a + rng.uniform(0, 60)
+        expected = sorted((s for s in segments if s["start"] < b and s["end"] > a), key=lambda s: s["start"])
+        assert store.between(a, b) == expected
+        assert store.at(a) == [s for s in sorted(segments, key=lambda s: s["start"]) if s["start"] <= a < s["end"]]
+
+
+def test_confidence_filter_and_validation():
+    store = SegmentStore.from_segments([
+        {"start": 0.0, "end": 1.0, "text": "a", "confidence": 0.98, "speaker": 1},
+        {"start": 1.0, "end": 2.0, "text": "b", "confidence": 0.4, "speaker": 2},
+        {"start": 2.0, "end": 3.0, "text": "c", "confidence": None, "speaker": None},
+    ])
+    assert [s["text"] for s in store.with_confidence(0.9)] == ["a"]
+    assert store[0]["confidence"] == 0.98
+    assert store[2]["confidence"] is None
+    with pytest.raises(ValueError):
+        SegmentStore(b"nope" + bytes(32))
+    with pytest.raises(ValueError):
+        SegmentStore.from_segments([{"start": 2.0, "end": 1.0, "text": "x"}])
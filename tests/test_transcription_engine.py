@@ -0,0 +1,53 @@
+import random
+import wave
+
+from skills.skill_transcribe_audio import StubBackend, TranscriptionEngine, transcribe_audio
+
+
+def _wav(path, seconds, rate=8000):
+    rng = random.Random(3)
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(bytes(rng.getrandbits(8) for _ in range(int(seconds * rate) * 2)))
+    return str(path)
+
+
+class _Recording(StubBackend):
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def transcribe(self, pcm, sample_rate, sample_width, channels, offset):
+        self.calls.append(offset)
+        return super().transcribe(pcm, sample_rate, sample_width, channels, offset)
+
+
+def test_windowed_pool_output_matches_a_single_pass(tmp_path):
+    path = _wav(tmp_path / "a.wav", 95.5)
+    reference = transcribe_audio(path, window_seconds=1000, processes=1)
+    windowed = transcribe_audio(path, window_seconds=10, overlap_seconds=2, processes=2)
+    assert len(reference["segments"]) == 96
+    assert windowed == reference
+    starts = [s["start"] for s in windowed["segments"]]
+    assert starts == sorted(starts)
+
+
+def test_segments_stream_before_later_windows_run(tmp_path):
+    path = _wav(tmp_path / "b.wav", 40)
+    backend = _Recording()
+    engine = TranscriptionEngine(backend, window_seconds=10, overlap_seconds=2, processes=1, max_pending=1)
+    stream = engine.stream(path)
+    first = next(stream)
+    assert first["start"] == 0.0
+    assert backend.calls == [0.0]
+    rest = list(stream)
+    assert len(backend.calls) == len(engine.windows(40)) == 5
+    assert len(rest) == 39
+
+
+def test_duplicate_text_across_a_boundary_is_dropped():
+    recent = [{"start": 9.0, "end": 10.2, "text": "Hello  world"}]
+    assert TranscriptionEngine._duplicate({"start": 9.4, "end": 10.4, "text": "hello world"}, recent)
+    assert not TranscriptionEngine._duplicate({"start": 10.2, "end": 11.0, "text": "hello world"}, recent)
@@ -1,7 +1,77 @@
-from skills.skill_trend_fetcher import fetch_trends
+import time
+from datetime import datetime, timezone
+
+from skills.skill_trend_fetcher import MockProvider, TimeSeries, TrendFetcher, TrendStore, fetch_trends
 
 def test_trend_structure():
     result = fetch_trends("youtube")
 
     assert "trends" in result
     assert isinstance(result["trends"], list)
+
+
+WINDOW = {"from": "2026-01-01T00:00:00Z", "to": "2026-01-07T00:00:00Z"}
+
+
+def test_providers_are_fetched_concurrently_and_cached():
+    providers = {n: MockProvider(n, latency=0.2) for n in ("youtube", "twitter", "tiktok", "instagram")}
+    fetcher = TrendFetcher(providers)
+    began = time.perf_counter()
+    first = fetcher.fetch("ai", time_range=WINDOW, top_k=5)
+    assert time.perf_counter() - began < 0.6
+    second = fetcher.fetch("ai", time_range=WINDOW, top_k=5)
+    assert first == second
+    assert all(p.calls == 1 for p in providers.values())
+    assert fetcher.cache.stats()["hits"] == 4
+
+
+def test_top_k_matches_a_full_sort_and_failures_become_warnings():
+    providers = {"youtube": MockProvider("youtube"), "twitter": MockProvider("twitter", metric="mentions"),
+                 "down": MockProvider("down", fail=True)}
+    fetcher = TrendFetcher(providers)
+    result = fetcher.fetch("ai", time_range=WINDOW, top_k=7, score="growth")
+    assert result["status"] == "success"
+    assert result["warnings"] == ["down: ConnectionError: down is unavailable"]
+
+    everything = fetcher.fetch("ai", providers=["youtube", "twitter"], time_range=WINDOW, top_k=1000, score="growth")
+    expected = sorted(everything["trends"], key=lambda t: t["score"], reverse=True)[:7]
+    assert [t["score"] for t in result["trends"]] == [t["score"] for t in expected]
+    assert len(everything["trends"]) == 50
+
+
+def test_time_series_handles_out_of_order_samples():
+    series = TimeSeries()
+    for ts, value in [(3, 30), (1, 10), (2, 20), (2, 21), (4, 40)]:
+        series.add(ts, value)
+    assert series.window() == [(1, 10), (2, 21), (3, 30), (4, 40)]
+    assert series.window(2, 3) == [(2, 21), (3, 30)]
+
+
+def test_cached_responses_are_not_added_to_the_store_again():
+    added = []
+
+    class Store(TrendStore):
+        def add(self, provider, samples):
+            added.append(provider)
+            return super().add(provider, samples)
+
+    fetcher = TrendFetcher({"youtube": MockProvider("youtube")}, store=Store())
+    first = fetcher.fetch("ai", time_range=WINDOW)
+    assert fetcher.fetch("ai", time_range=WINDOW) == first
+    assert added == ["youtube"]
+
+
+def test_store_drops_old_samples_and_excess_series():
+    def sample(subject, ts):
+        return {"subject": subject, "metric": "views", "value": ts,
+                "sampled_at": datetime.fromtimestamp(ts, tz=timezone.utc)}
+
+    store = TrendStore(retention=100, max_points=3, max_series=2)
+    store.add("p", [sample("a", t) for t in range(0, 50, 10)])
+    assert store.series(("p", "a", "views")).window() == [(20, 20), (30, 30), (40, 40)]
+
+    store.add("p", [sample("b", 130)])      # newest is now 130: "a" keeps only t >= 30
+    assert store.series(("p", "a", "views")).window() == [(30, 30), (40, 40)]
+    store.add("p", [sample("c", 135)])      # third series: least recently updated "a" goes
+    assert store.series(("p", "a", "views")) is None and len(store) == 2
+    assert store.add("p", [sample("d", 10)]) == []    # already past retention